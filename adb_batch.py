@@ -0,0 +1,130 @@
+"""Пакетный сбор метрик: все команды тика за один проход через ADB"""
+import re
+
+# Заголовок секции в выводе пакетного скрипта
+SECTION_PREFIX = "<<<ADBMON:"
+SECTION_SUFFIX = ">>>"
+
+# Период опроса самых быстрых метрик, для которого заданы интервалы реестра
+DEFAULT_POLL_INTERVAL = 0.5
+
+# Реестр метрик: имя -> описание (команда на устройстве, интервал опроса в секундах)
+METRICS = {}
+
+
+def register_metric(name, command, interval=0.5):
+    """Добавление метрики в реестр пакетного сборщика"""
+    METRICS[name] = {'command': command, 'interval': interval}
+
+
+# Быстро меняющиеся показатели
+register_metric('cpu', "cat /proc/stat | grep '^cpu '", interval=0.5)
+register_metric('ram', "free -m", interval=1)
+
+# Строки cpuN из /proc/stat и частоты ядер; частоты читаются встроенной командой
+# read, поэтому процессов на ядро не запускается
+register_metric('cpu_cores',
+                "grep '^cpu[0-9]' /proc/stat; "
+                "for d in /sys/devices/system/cpu/cpu[0-9]*; do "
+                "c=${d##*/cpu}; cur=; max=; "
+                "read cur < $d/cpufreq/scaling_cur_freq; read max < $d/cpufreq/cpuinfo_max_freq; "
+                "echo freq $c ${cur:-0} ${max:-0}; done",
+                interval=1)
+
+# Счётчики ввода-вывода накопителя и сети (скорость считается по разнице)
+register_metric('diskstats', "cat /proc/diskstats", interval=1)
+register_metric('netdev', "cat /proc/net/dev", interval=1)
+
+# Батарея меняется медленно, а dumpsys заметно нагружает устройство
+register_metric('battery', "dumpsys battery", interval=2)
+
+# Все процессы одним проходом: stat и RSS из statm читаются встроенной командой read;
+# строка T - счётчики CPU системы для расчёта загрузки, P - размер страницы
+register_metric('processes',
+                "echo P $(getconf PAGESIZE); "
+                "read _ a b c d e f g h _ < /proc/stat; echo T $a $b $c $d $e $f $g $h; "
+                "for p in /proc/[0-9]*; do read s < $p/stat && read _ r _ < $p/statm && echo \"$s $r\"; done",
+                interval=2)
+
+# Почти статичные показатели
+register_metric('storage', "df /data | grep /data", interval=30)
+register_metric('display_size', "wm size", interval=10)
+register_metric('peak_refresh_rate', "settings get system peak_refresh_rate", interval=10)
+register_metric('miui_refresh_rate', "settings get system screen_refresh_rate", interval=10)
+
+# Активный режим дисплея: частота меняется на лету (адаптивные 60/90/120 Гц)
+register_metric('display_mode', "dumpsys display | grep -E 'mActiveSfDisplayMode|DisplayDeviceInfo'", interval=5)
+
+# Идентификатор загрузки: меняется после каждой перезагрузки
+register_metric('boot_id', "cat /proc/sys/kernel/random/boot_id", interval=5)
+
+# Полный дамп свойств, запрашивается только при промахе кэша
+register_metric('getprop', "getprop", interval=None)
+
+# Метрики, собираемые при опросе
+TICK_METRICS = ['boot_id', 'cpu', 'cpu_cores', 'ram', 'diskstats', 'netdev', 'storage', 'battery',
+                'display_size', 'peak_refresh_rate', 'miui_refresh_rate', 'display_mode', 'processes']
+
+
+def metric_intervals(names=None, base=DEFAULT_POLL_INTERVAL):
+    """Интервалы опроса {имя: секунды} для планировщика.
+
+    Интервалы реестра заданы для базового периода DEFAULT_POLL_INTERVAL;
+    при другом base они масштабируются пропорционально.
+    """
+    if names is None:
+        names = TICK_METRICS
+    scale = base / DEFAULT_POLL_INTERVAL
+    return {name: METRICS[name]['interval'] * scale for name in names}
+
+
+def build_batch_script(names):
+    """Сборка одного shell-скрипта для списка метрик"""
+    parts = []
+    for name in names:
+        command = METRICS[name]['command']
+        parts.append(f"echo '{SECTION_PREFIX}{name}{SECTION_SUFFIX}'")
+        parts.append(f"{{ {command}; }} 2>/dev/null")
+    return "; ".join(parts)
+
+
+def parse_batch_metrics(script):
+    """Имена метрик пакетного скрипта по заголовкам секций; для других команд - пустой список"""
+    return re.findall(r"echo '" + re.escape(SECTION_PREFIX) + r"(\w+)" + re.escape(SECTION_SUFFIX) + "'", script)
+
+
+def split_batch_output(output):
+    """Разбор вывода пакетного скрипта на секции {имя: текст}"""
+    sections = {}
+    name = None
+    lines = []
+    for line in output.split('\n'):
+        stripped = line.strip()
+        if stripped.startswith(SECTION_PREFIX) and stripped.endswith(SECTION_SUFFIX):
+            if name is not None:
+                sections[name] = '\n'.join(lines).strip()
+            name = stripped[len(SECTION_PREFIX):-len(SECTION_SUFFIX)]
+            lines = []
+        elif name is not None:
+            lines.append(line)
+    if name is not None:
+        sections[name] = '\n'.join(lines).strip()
+    return sections
+
+
+def collect_batch(run_shell, names=None, timeout=10):
+    """Сбор метрик одной командой.
+
+    run_shell(cmd, timeout) должна возвращать (output, error), как adb_command.
+    Возвращает ({имя: текст}, error).
+    """
+    if names is None:
+        names = TICK_METRICS
+    output, error = run_shell(build_batch_script(names), timeout)
+    if error:
+        return {}, error
+    sections = split_batch_output(output or "")
+    # Метрики без вывода всё равно присутствуют в результате
+    for name in names:
+        sections.setdefault(name, "")
+    return sections, None
@@ -0,0 +1,256 @@
+"""Клиент протокола ADB-сервера (TCP 5037) без запуска adb-процессов"""
+import os
+import socket
+import subprocess
+import threading
+
+from adb_session import parse_shell_command
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = int(os.environ.get('ANDROID_ADB_SERVER_PORT', 5037))
+
+
+class AdbProtocolError(Exception):
+    """Ответ FAIL от ADB-сервера или нарушение протокола"""
+
+
+def encode_request(payload):
+    """Запрос ADB-сервера: длина в 4 hex-символах + текст"""
+    data = payload.encode('utf-8')
+    return f"{len(data):04x}".encode('ascii') + data
+
+
+def read_exact(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise AdbProtocolError("Соединение с ADB-сервером закрыто")
+        data += chunk
+    return data
+
+
+def read_hex_block(sock):
+    """Блок данных с префиксом длины в 4 hex-символах"""
+    length = int(read_exact(sock, 4), 16)
+    return read_exact(sock, length).decode('utf-8', errors='ignore')
+
+
+def read_status(sock):
+    """Проверка ответа OKAY / FAIL"""
+    status = read_exact(sock, 4)
+    if status == b'OKAY':
+        return
+    if status == b'FAIL':
+        raise AdbProtocolError(read_hex_block(sock))
+    raise AdbProtocolError(f"Неожиданный ответ ADB-сервера: {status!r}")
+
+
+def read_until_close(sock):
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+
+def parse_device_list(text):
+    """Список устройств из ответа host:devices в формате (serial, state)"""
+    devices = []
+    for line in text.split('\n'):
+        parts = line.split()
+        if len(parts) >= 2:
+            devices.append((parts[0], parts[1]))
+    return devices
+
+
+class AdbServerClient:
+    """Прямые запросы к ADB-серверу; каждый запрос идёт по своему соединению"""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, adb_path=None):
+        self.host = host
+        self.port = port
+        self.adb_path = adb_path
+        self.server_started = False
+
+    def connect(self, timeout=5):
+        try:
+            return socket.create_connection((self.host, self.port), timeout=timeout)
+        except ConnectionRefusedError:
+            # Сервер не запущен: один раз поднимаем его через adb
+            if not self.adb_path or self.server_started:
+                raise
+            self.server_started = True
+            subprocess.run([self.adb_path, 'start-server'], capture_output=True, timeout=15)
+            return socket.create_connection((self.host, self.port), timeout=timeout)
+
+    def request(self, sock, payload):
+        sock.sendall(encode_request(payload))
+        read_status(sock)
+
+    def host_query(self, payload, timeout=5):
+        """Host-запрос с ответом в виде hex-блока (host:devices, host:version)"""
+        with self.connect(timeout) as sock:
+            self.request(sock, payload)
+            return read_hex_block(sock)
+
+    def devices(self, timeout=5):
+        return parse_device_list(self.host_query('host:devices', timeout))
+
+    def open_transport(self, serial, timeout=5):
+        """Соединение, переключённое на устройство"""
+        sock = self.connect(timeout)
+        try:
+            self.request(sock, f'host:transport:{serial}' if serial else 'host:transport-any')
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    def service(self, serial, service, timeout=5):
+        """Запуск сервиса устройства (shell:, reboot:) и чтение ответа до закрытия"""
+        with self.open_transport(serial, timeout) as sock:
+            self.request(sock, service)
+            return read_until_close(sock).decode('utf-8', errors='ignore')
+
+    def shell(self, serial, cmd, timeout=5):
+        # Как и при запуске adb-процесса, stderr устройства не попадает в вывод
+        output = self.service(serial, f'shell:{{ {cmd}; }} 2>/dev/null', timeout)
+        return output.replace('\r\n', '\n').strip()
+
+    def command(self, cmd, timeout=5, serial=None):
+        """Аналог adb_command для команд, которые сервер выполняет сам.
+
+        Возвращает (output, error) или None, если команду нужно выполнить через adb.
+        """
+        try:
+            shell_cmd = parse_shell_command(cmd)
+            if shell_cmd is not None:
+                return self.shell(serial, shell_cmd, timeout), None
+
+            args = cmd.split()
+            if args == ['devices']:
+                lines = ["List of devices attached"]
+                lines += [f"{device}\t{state}" for device, state in self.devices(timeout)]
+                return '\n'.join(lines), None
+            if args and args[0] == 'reboot' and len(args) <= 2:
+                target = args[1] if len(args) == 2 else ''
+                return self.service(serial, f'reboot:{target}', timeout).strip(), None
+            return None
+        except socket.timeout:
+            return None, "⏰ Таймаут команды"
+        except (OSError, AdbProtocolError) as e:
+            return None, f"❌ Ошибка ADB: {str(e)}"
+
+
+class DeviceTracker:
+    """Отслеживание подключения устройств через поток host:track-devices.
+
+    on_event(serial, old_state, new_state) вызывается из потока трекера;
+    old_state=None - устройство появилось, new_state=None - отключилось.
+    """
+
+    def __init__(self, client, on_event=None, retry_delay=1.0, max_retry_delay=10.0):
+        self.client = client
+        self.on_event = on_event
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.states = {}
+        self.connected = False
+        self.lock = threading.Lock()
+        # Номер изменения растёт с каждым событием; wait() сравнивает его с последним
+        # увиденным, поэтому событие между двумя вызовами wait() не теряется
+        self.changed = threading.Condition(self.lock)
+        self.generation = 0
+        self.seen_generation = 0
+        self.stopped = threading.Event()
+        self.sock = None
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True, name="adb-track-devices")
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        sock = self.sock
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    def snapshot(self):
+        """Текущие состояния {serial: state}"""
+        with self.lock:
+            return dict(self.states)
+
+    def online(self):
+        """Устройства, готовые к опросу"""
+        with self.lock:
+            return [serial for serial, state in self.states.items() if state == "device"]
+
+    def wait(self, timeout=None):
+        """Ожидание события после прошлого вызова wait() (True, если оно было)"""
+        with self.changed:
+            fired = self.changed.wait_for(lambda: self.generation != self.seen_generation, timeout)
+            self.seen_generation = self.generation
+            return fired
+
+    def _notify(self):
+        with self.changed:
+            self.generation += 1
+            self.changed.notify_all()
+
+    def _run(self):
+        delay = self.retry_delay
+        while not self.stopped.is_set():
+            try:
+                self.sock = self.client.connect()
+                # Поток событий бессрочный: таймаут только на подключение
+                self.sock.settimeout(None)
+                self.client.request(self.sock, 'host:track-devices')
+                delay = self.retry_delay
+                while not self.stopped.is_set():
+                    self._apply(dict(parse_device_list(read_hex_block(self.sock))))
+                    # Подключённым трекер считается только с первым списком устройств
+                    self.connected = True
+            except (OSError, AdbProtocolError):
+                pass
+            finally:
+                if self.sock is not None:
+                    try:
+                        self.sock.close()
+                    except OSError:
+                        pass
+                    self.sock = None
+
+            # Связь с сервером потеряна: все устройства считаются отключенными
+            self.connected = False
+            self._apply({})
+            self._notify()
+            self.stopped.wait(delay)
+            delay = min(delay * 2, self.max_retry_delay)
+
+    def _apply(self, states):
+        with self.lock:
+            previous, self.states = self.states, states
+        events = []
+        for serial, state in states.items():
+            if previous.get(serial) != state:
+                events.append((serial, previous.get(serial), state))
+        for serial, state in previous.items():
+            if serial not in states:
+                events.append((serial, state, None))
+        if not events:
+            return
+        self._notify()
+        if self.on_event:
+            for serial, old_state, new_state in events:
+                try:
+                    self.on_event(serial, old_state, new_state)
+                except Exception:
+                    pass
@@ -0,0 +1,187 @@
+"""Постоянные ADB shell-сессии: один долгоживущий `adb shell` на устройство"""
+import subprocess
+import threading
+import itertools
+import collections
+import queue
+import atexit
+import os
+import re
+import time
+
+# Маркер конца вывода команды. В самой команде он записан через printf с
+# пробелом вместо "_", поэтому эхо команды (PTY на старых устройствах)
+# никогда не совпадёт с маркером.
+MARKER_PREFIX = "__ADBMON"
+
+
+class AdbSession:
+    """Один процесс `adb shell`, команды пишутся в stdin, вывод режется маркерами"""
+
+    def __init__(self, adb_path, serial=None):
+        self.adb_path = adb_path
+        self.serial = serial
+        self.process = None
+        self.lines = None
+        self.stderr_tail = collections.deque(maxlen=20)
+        self.lock = threading.Lock()
+        self.counter = itertools.count(1)
+        self.token = os.urandom(4).hex()
+        self.starts = 0
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def _start(self):
+        """Запуск нового процесса adb shell"""
+        self.close()
+        args = [self.adb_path]
+        if self.serial:
+            args += ['-s', self.serial]
+        args.append('shell')
+
+        self.process = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=0
+        )
+        self.lines = queue.Queue()
+        self.stderr_tail.clear()
+        self.starts += 1
+
+        threading.Thread(target=self._read_stdout, args=(self.process, self.lines), daemon=True).start()
+        threading.Thread(target=self._read_stderr, args=(self.process,), daemon=True).start()
+
+    @staticmethod
+    def _read_stdout(process, lines):
+        for raw in iter(process.stdout.readline, b''):
+            lines.put(raw.decode('utf-8', errors='ignore').rstrip('\r\n'))
+        lines.put(None)
+
+    def _read_stderr(self, process):
+        for raw in iter(process.stderr.readline, b''):
+            self.stderr_tail.append(raw.decode('utf-8', errors='ignore').strip())
+
+    def close(self):
+        """Остановка процесса сессии"""
+        process, self.process = self.process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except Exception:
+            pass
+        try:
+            process.kill()
+            process.wait(timeout=1)
+        except Exception:
+            pass
+
+    def _closed_error(self):
+        # Даём stderr-потоку дочитать сообщение adb ("no devices/emulators found" и т.п.)
+        time.sleep(0.05)
+        details = " ".join(line for line in self.stderr_tail if line)
+        self.close()
+        if details:
+            return f"❌ Ошибка ADB: {details}"
+        return "❌ Сессия ADB закрыта"
+
+    def run(self, cmd, timeout=5):
+        """Выполнение команды в сессии, возвращает (output, error) как adb_command"""
+        with self.lock:
+            for attempt in range(2):
+                was_alive = self.is_alive()
+                try:
+                    if not was_alive:
+                        self._start()
+                    result = self._exchange(cmd, timeout)
+                except BrokenPipeError:
+                    # adb завершился сразу после запуска (нет устройства и т.п.)
+                    result = None, self._closed_error()
+                except OSError as e:
+                    result = None, f"❌ Ошибка ADB: {str(e)}"
+                    self.close()
+
+                output, error = result
+                # Переподключение только если упала уже работавшая сессия
+                if error is None or not was_alive or attempt:
+                    return result
+            return result
+
+    def _exchange(self, cmd, timeout):
+        number = next(self.counter)
+        marker = f"{MARKER_PREFIX}_{self.token}_{number}:"
+        script = (
+            f"{{ {cmd}\n}} 2>/dev/null < /dev/null; "
+            f"printf '\\n%s_%s_%s:%d\\n' {MARKER_PREFIX} {self.token} {number} $?\n"
+        )
+        self.process.stdin.write(script.encode('utf-8'))
+        self.process.stdin.flush()
+
+        output = []
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.close()
+                return None, "⏰ Таймаут команды"
+            try:
+                line = self.lines.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if line is None:
+                return None, self._closed_error()
+            if marker in line:
+                head = line[:line.index(marker)]
+                if head:
+                    output.append(head)
+                return '\n'.join(output).strip(), None
+            output.append(line)
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(adb_path, serial=None):
+    """Сессия для устройства (создаётся при первом обращении)"""
+    key = (adb_path, serial)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = AdbSession(adb_path, serial)
+            _sessions[key] = session
+        return session
+
+
+def close_session(serial=None):
+    """Закрытие сессий устройства (например, после отключения)"""
+    with _sessions_lock:
+        keys = [key for key in _sessions if key[1] == serial]
+        sessions = [_sessions.pop(key) for key in keys]
+    for session in sessions:
+        session.close()
+
+
+def close_all_sessions():
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+def parse_shell_command(cmd):
+    """Достаёт команду устройства из строки вида 'shell "..."', иначе None"""
+    match = re.match(r'^\s*shell\s+(.*)$', cmd, re.S)
+    if not match:
+        return None
+    shell_cmd = match.group(1).strip()
+    if len(shell_cmd) >= 2 and shell_cmd[0] == shell_cmd[-1] == '"':
+        shell_cmd = shell_cmd[1:-1]
+    return shell_cmd or None
+
+
+atexit.register(close_all_sessions)
@@ -0,0 +1,300 @@
+"""Правила оповещений по потоку метрик: агрегаты скользящего окна за O(1) на выборку и гистерезис"""
+import collections
+import re
+import threading
+
+from stats import percentile
+
+# Правила по умолчанию: загрузка держится, перегрев батареи, память почти заполнена
+DEFAULT_RULES = [
+    "cpu > 80 for 10s",
+    "battery_temp > 45",
+    "ram p95 > 90 over 60s",
+]
+
+# Порог снятия по умолчанию отстоит от порога срабатывания на эту долю
+DEFAULT_HYSTERESIS = 0.05
+
+# Меньше выборок в окне агрегат не оценивается (начало сбора, редкая метрика)
+MIN_WINDOW_SAMPLES = 3
+
+# метрика [агрегат] >|< порог [for N] [over N] [clear порог]; длительности в s или m
+RULE_PATTERN = re.compile(
+    r'^\s*(?P<metric>[\w:.]+)(?:\s+(?P<agg>avg|min|max|p\d{1,2}))?\s*(?P<op>[<>])\s*(?P<threshold>-?[\d.]+)'
+    r'(?:\s+for\s+(?P<hold>[\d.]+)(?P<hold_unit>[sm]?))?'
+    r'(?:\s+over\s+(?P<window>[\d.]+)(?P<window_unit>[sm]?))?'
+    r'(?:\s+clear\s+(?P<clear>-?[\d.]+))?\s*$')
+
+# Окно агрегата, если в правиле не указано "over", сек
+DEFAULT_WINDOW = 60.0
+
+
+def _seconds(value, unit):
+    return float(value) * (60 if unit == 'm' else 1) if value else 0.0
+
+
+def beyond(op, value, threshold):
+    return value > threshold if op == '>' else value < threshold
+
+
+class Rule:
+    """Условие на метрику: последнее значение или агрегат окна за порогом не меньше hold секунд.
+
+    Оповещение снимается, когда условие перестаёт выполняться для порога
+    clear (по умолчанию на 5% ближе к норме) - так значение, колеблющееся
+    около порога, не включает и не выключает его на каждой выборке.
+    """
+
+    def __init__(self, metric, op, threshold, agg=None, window=DEFAULT_WINDOW, hold=0.0, clear=None, text=None):
+        self.metric = metric
+        self.op = op
+        self.threshold = threshold
+        self.agg = agg
+        self.window = window
+        self.hold = hold
+        if clear is None:
+            margin = abs(threshold) * DEFAULT_HYSTERESIS
+            clear = threshold - margin if op == '>' else threshold + margin
+        self.clear = clear
+        self.text = text or f"{metric} {agg + ' ' if agg else ''}{op} {threshold:g}"
+
+    def make_aggregate(self):
+        if self.agg is None:
+            return LastValue()
+        if self.agg == 'avg':
+            return WindowMean(self.window)
+        if self.agg in ('min', 'max'):
+            return WindowExtreme(self.window, self.agg)
+        return WindowPercentile(self.window, int(self.agg[1:]), self.op, (self.threshold, self.clear))
+
+
+def parse_rule(text):
+    """Правило из строки вида "cpu > 80 for 10s" или "ram p95 > 90 over 1m clear 85"; ValueError при ошибке"""
+    match = RULE_PATTERN.match(text)
+    if not match:
+        raise ValueError(f"Не удалось разобрать правило: {text!r}")
+    groups = match.groupdict()
+    window = _seconds(groups['window'], groups['window_unit']) or DEFAULT_WINDOW
+    clear = float(groups['clear']) if groups['clear'] else None
+    threshold = float(groups['threshold'])
+    if clear is not None and beyond(groups['op'], clear, threshold):
+        # Порог снятия за порогом срабатывания: оповещение снималось бы сразу после срабатывания
+        side = "не больше" if groups['op'] == '>' else "не меньше"
+        raise ValueError(f"Порог снятия {clear:g} должен быть {side} порога {threshold:g}: {text!r}")
+    return Rule(groups['metric'], groups['op'], threshold, groups['agg'], window,
+                _seconds(groups['hold'], groups['hold_unit']), clear, text.strip())
+
+
+def parse_rules(texts):
+    return [parse_rule(text) for text in texts]
+
+
+class LastValue:
+    def __init__(self):
+        self.last = None
+
+    def add(self, t, value):
+        self.last = value
+
+    def value(self):
+        return self.last
+
+    def holds(self, op, threshold, index):
+        return self.last is not None and beyond(op, self.last, threshold)
+
+
+class WindowMean:
+    """Среднее за окно: сумма обновляется при добавлении и вытеснении"""
+
+    def __init__(self, window):
+        self.window = window
+        self.samples = collections.deque()
+        self.total = 0.0
+
+    def add(self, t, value):
+        self.samples.append((t, value))
+        self.total += value
+        since = t - self.window
+        while self.samples[0][0] <= since:
+            self.total -= self.samples.popleft()[1]
+
+    def value(self):
+        if len(self.samples) < MIN_WINDOW_SAMPLES:
+            return None
+        return self.total / len(self.samples)
+
+    def holds(self, op, threshold, index):
+        value = self.value()
+        return value is not None and beyond(op, value, threshold)
+
+
+class WindowExtreme:
+    """Минимум или максимум за окно: монотонная очередь, каждая выборка входит и выходит один раз"""
+
+    def __init__(self, window, kind):
+        self.window = window
+        self.sign = 1 if kind == 'max' else -1
+        self.samples = collections.deque()
+        self.candidates = collections.deque()
+
+    def add(self, t, value):
+        self.samples.append(t)
+        key = self.sign * value
+        while self.candidates and self.candidates[-1][1] <= key:
+            self.candidates.pop()
+        self.candidates.append((t, key))
+        since = t - self.window
+        while self.samples[0] <= since:
+            self.samples.popleft()
+        while self.candidates[0][0] <= since:
+            self.candidates.popleft()
+
+    def value(self):
+        if len(self.samples) < MIN_WINDOW_SAMPLES:
+            return None
+        return self.sign * self.candidates[0][1]
+
+    def holds(self, op, threshold, index):
+        value = self.value()
+        return value is not None and beyond(op, value, threshold)
+
+
+class WindowPercentile:
+    """Перцентиль за окно относительно заданных порогов.
+
+    "pQ > T" выполняется, когда доля выборок окна выше T больше 1 - Q/100
+    ("pQ < T" - когда доля ниже T больше Q/100). Поэтому хранятся только
+    счётчики выборок за каждым порогом, а сам перцентиль считается
+    сортировкой окна лишь для текста оповещения.
+    """
+
+    def __init__(self, window, q, op, thresholds):
+        self.window = window
+        self.op = op
+        self.thresholds = thresholds
+        self.share = 1 - q / 100.0 if op == '>' else q / 100.0
+        self.q = q
+        # Хвост в 1 - Q/100 выборок имеет смысл, только когда в нём есть хотя бы одна выборка
+        self.min_samples = max(MIN_WINDOW_SAMPLES, int(round(1 / self.share)) if self.share > 0 else 1)
+        self.samples = collections.deque()
+        self.counts = [0] * len(thresholds)
+
+    def add(self, t, value):
+        flags = tuple(beyond(self.op, value, threshold) for threshold in self.thresholds)
+        self.samples.append((t, value, flags))
+        for index, flag in enumerate(flags):
+            self.counts[index] += flag
+        since = t - self.window
+        while self.samples[0][0] <= since:
+            for index, flag in enumerate(self.samples.popleft()[2]):
+                self.counts[index] -= flag
+
+    def holds(self, op, threshold, index):
+        n = len(self.samples)
+        return n >= self.min_samples and self.counts[index] > self.share * n
+
+    def value(self):
+        if not self.samples:
+            return None
+        return percentile(sorted(sample[1] for sample in self.samples), self.q)
+
+
+class RuleState:
+    """Состояние одного правила на одном устройстве"""
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.aggregate = rule.make_aggregate()
+        self.active = False
+        self.pending_since = None
+        self.since = None
+
+    def update(self, t, value):
+        """'fired', 'cleared' или None"""
+        rule = self.rule
+        self.aggregate.add(t, value)
+        if self.active:
+            if not self.aggregate.holds(rule.op, rule.clear, 1):
+                self.active = False
+                self.pending_since = None
+                return 'cleared'
+            return None
+        if not self.aggregate.holds(rule.op, rule.threshold, 0):
+            self.pending_since = None
+            return None
+        if self.pending_since is None:
+            self.pending_since = t
+        if t - self.pending_since >= rule.hold:
+            self.active = True
+            self.since = t
+            return 'fired'
+        return None
+
+
+class AlertEngine:
+    """Правила для всех устройств; feed() вызывается на каждую новую выборку метрики.
+
+    Правила индексированы по метрике: выборка метрики без правил стоит
+    одного поиска в словаре, с правилами - O(1) на каждое правило.
+    События передаются в on_event(event) вне блокировки.
+    """
+
+    def __init__(self, rules=(), on_event=None):
+        self.on_event = on_event
+        self.lock = threading.Lock()
+        self.set_rules(rules)
+
+    def set_rules(self, rules):
+        by_metric = {}
+        for rule in rules:
+            by_metric.setdefault(rule.metric, []).append(rule)
+        with self.lock:
+            self.rules = list(rules)
+            self.by_metric = by_metric
+            self.states = {}
+
+    def feed(self, serial, metric, value, t):
+        rules = self.by_metric.get(metric)
+        if not rules:
+            return
+        events = []
+        with self.lock:
+            for rule in rules:
+                state = self.states.get((serial, rule))
+                if state is None:
+                    state = self.states[(serial, rule)] = RuleState(rule)
+                change = state.update(t, value)
+                if change:
+                    events.append({'ts': round(t, 3), 'serial': serial, 'rule': rule.text, 'metric': metric,
+                                   'state': change, 'value': state.aggregate.value(),
+                                   'threshold': rule.threshold if change == 'fired' else rule.clear})
+        if self.on_event:
+            for event in events:
+                self.on_event(event)
+
+    def active(self, serial=None):
+        """[(serial, правило, время срабатывания, текущее значение)] активных оповещений"""
+        with self.lock:
+            return [(key[0], state.rule, state.since, state.aggregate.value())
+                    for key, state in self.states.items()
+                    if state.active and (serial is None or key[0] == serial)]
+
+    def forget(self, serials):
+        """Сброс окон устройств, которых больше нет в списке"""
+        with self.lock:
+            for key in [key for key in self.states if key[0] not in serials]:
+                del self.states[key]
+
+
+def format_alert(event):
+    value = f"{event['value']:.1f}" if event.get('value') is not None else "-"
+    if event['state'] == 'fired':
+        return f"🚨 {event['serial']}: {event['rule']} (значение {value})"
+    return f"✅ {event['serial']}: снято {event['rule']} (значение {value})"
+
+
+def format_active_alerts(active):
+    if not active:
+        return "✅ Оповещений нет"
+    return "\n".join(f"🚨 {rule.text}" + (f" ({value:.1f})" if value is not None else "")
+                     for _, rule, _, value in active)
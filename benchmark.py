@@ -0,0 +1,244 @@
+"""Бенчмарк самого устройства: тесты выполняются на телефоне через ADB и могут быть прерваны"""
+import subprocess
+import threading
+
+from stats import percentile
+
+# Скрипт тестов на устройстве. Время берётся из /proc/uptime до и после
+# нагрузки, поэтому задержка ADB в результат не попадает.
+DEVICE_DIR = "/data/local/tmp"
+SCRIPT_PATH = f"{DEVICE_DIR}/adbmon_bench.sh"
+DATA_PATH = f"{DEVICE_DIR}/adbmon_bench.dat"
+
+BENCH_SCRIPT = r'''F=''' + DATA_PATH + r'''
+case "$1" in
+cpu_single)
+    read a _ < /proc/uptime
+    dd if=/dev/zero bs=1048576 count=$2 2>/dev/null | md5sum > /dev/null
+    read b _ < /proc/uptime
+    echo "RESULT $a $b $2" ;;
+cpu_multi)
+    n=$(grep -c ^processor /proc/cpuinfo)
+    [ "$n" -gt 0 ] 2>/dev/null || n=1
+    read a _ < /proc/uptime
+    i=0
+    while [ $i -lt $n ]; do
+        (dd if=/dev/zero bs=1048576 count=$2 2>/dev/null | md5sum > /dev/null) &
+        i=$((i + 1))
+    done
+    wait
+    read b _ < /proc/uptime
+    echo "RESULT $a $b $((n * $2))" ;;
+memory)
+    read a _ < /proc/uptime
+    dd if=/dev/zero of=/dev/null bs=1048576 count=$2 2>/dev/null
+    read b _ < /proc/uptime
+    echo "RESULT $a $b $2" ;;
+seq_write)
+    read a _ < /proc/uptime
+    dd if=/dev/zero of=$F bs=1048576 count=$2 conv=fsync 2>/dev/null
+    read b _ < /proc/uptime
+    echo "RESULT $a $b $2" ;;
+seq_read)
+    [ -f $F ] || dd if=/dev/zero of=$F bs=1048576 count=$2 conv=fsync 2>/dev/null
+    sync
+    # Файл только что записан и лежит в кэше: сброс кэша требует root, прямое чтение
+    # есть не во всех dd; если не вышло ни то ни другое, результат помечается как кэш
+    flag=
+    if (echo 3 > /proc/sys/vm/drop_caches) 2>/dev/null; then
+        mode=cold
+    elif dd if=$F of=/dev/null bs=1048576 count=1 iflag=direct 2>/dev/null; then
+        mode=direct; flag=iflag=direct
+    else
+        mode=cached
+    fi
+    read a _ < /proc/uptime
+    dd if=$F of=/dev/null bs=1048576 count=$2 $flag 2>/dev/null
+    read b _ < /proc/uptime
+    echo "RESULT $a $b $2 $mode" ;;
+rand_read|rand_write)
+    [ -f $F ] || dd if=/dev/zero of=$F bs=1048576 count=$3 conv=fsync 2>/dev/null
+    blocks=$(($3 * 256))
+    i=0
+    read a _ < /proc/uptime
+    while [ $i -lt $2 ]; do
+        if [ "$1" = rand_read ]; then
+            dd if=$F of=/dev/null bs=4096 count=1 skip=$((RANDOM % blocks)) 2>/dev/null
+        else
+            dd if=/dev/zero of=$F bs=4096 count=1 seek=$((RANDOM % blocks)) conv=notrunc,fsync 2>/dev/null
+        fi
+        i=$((i + 1))
+    done
+    read b _ < /proc/uptime
+    echo "RESULT $a $b $2" ;;
+cleanup)
+    rm -f $F ;;
+esac
+'''
+
+# Остановка: процессы скрипта и всё их дерево потомков (кроме самой этой оболочки,
+# в командной строке которой тоже есть имя скрипта)
+KILL_SCRIPT = (
+    "kill_tree() { for c in $(pgrep -P $1); do kill_tree $c; done; kill -9 $1; }; "
+    "for p in $(pgrep -f adbmon_bench.sh); do [ $p = $$ ] || kill_tree $p; done 2>/dev/null; "
+    f"rm -f {DATA_PATH} {SCRIPT_PATH}"
+)
+
+# Размер файла для тестов накопителя, МБ
+STORAGE_FILE_MB = 64
+
+# Случайный доступ: в оболочке устройства нет способа читать по разным смещениям в одном
+# процессе, поэтому каждая операция - отдельный запуск dd. Результат - время одной операции
+# вместе с запуском процесса, а не IOPS накопителя
+LATENCY_UNIT = "мс/оп"
+
+# (имя, подпись, аргументы скрипта, единица результата)
+TESTS = [
+    ('cpu_single', "🧮 CPU (1 ядро, md5)", [64], "МБ/с"),
+    ('cpu_multi', "🧮 CPU (все ядра, md5)", [64], "МБ/с"),
+    ('memory', "💾 Память (dd /dev/zero)", [1024], "МБ/с"),
+    ('seq_write', "📁 Запись последовательная", [STORAGE_FILE_MB], "МБ/с"),
+    ('seq_read', "📁 Чтение последовательное", [STORAGE_FILE_MB], "МБ/с"),
+    ('rand_read', "📁 Чтение 4K случайное (dd на операцию)", [200, STORAGE_FILE_MB], LATENCY_UNIT),
+    ('rand_write', "📁 Запись 4K случайная + fsync (dd на операцию)", [100, STORAGE_FILE_MB], LATENCY_UNIT),
+]
+
+
+def summarize(values):
+    """Медиана и перцентили серии замеров"""
+    return {
+        'median': percentile(values, 50),
+        'p10': percentile(values, 10),
+        'p90': percentile(values, 90),
+        'runs': list(values),
+    }
+
+
+def parse_result(output):
+    """Результат прогона: объём работы в секунду или None"""
+    for line in (output or "").split('\n'):
+        parts = line.split()
+        if len(parts) in (4, 5) and parts[0] == "RESULT":
+            try:
+                start, end, amount = float(parts[1]), float(parts[2]), float(parts[3])
+            except ValueError:
+                return None
+            # /proc/uptime идёт с шагом 10 мс
+            elapsed = max(end - start, 0.01)
+            return amount / elapsed
+    return None
+
+
+def parse_mode(output):
+    """Режим чтения, о котором сообщил тест (cold, direct, cached), или None"""
+    for line in (output or "").split('\n'):
+        parts = line.split()
+        if len(parts) == 5 and parts[0] == "RESULT":
+            return parts[4]
+    return None
+
+
+class BenchmarkCancelled(Exception):
+    """Бенчмарк остановлен пользователем"""
+
+
+class DeviceBenchmark:
+    """Набор тестов на устройстве с прогревом и повторами.
+
+    on_progress(text, fraction) вызывается из потока бенчмарка.
+    """
+
+    def __init__(self, adb_path, serial=None, warmup=1, repeats=5, tests=TESTS, on_progress=None, timeout=120):
+        self.adb_path = adb_path
+        self.serial = serial
+        self.warmup = warmup
+        self.repeats = repeats
+        self.tests = tests
+        self.on_progress = on_progress
+        self.timeout = timeout
+        self.cancelled = threading.Event()
+        self.process = None
+        self.lock = threading.Lock()
+
+    def adb_args(self, *args):
+        base = [self.adb_path]
+        if self.serial:
+            base += ['-s', self.serial]
+        return base + list(args)
+
+    def shell(self, cmd, stdin_data=None):
+        """Отдельный adb shell на каждый прогон, чтобы его можно было прервать"""
+        with self.lock:
+            if self.cancelled.is_set():
+                raise BenchmarkCancelled()
+            self.process = subprocess.Popen(
+                self.adb_args('shell', cmd),
+                stdin=subprocess.PIPE if stdin_data else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+        try:
+            output, _ = self.process.communicate(stdin_data.encode('utf-8') if stdin_data else None,
+                                                 timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            raise
+        finally:
+            self.process = None
+        if self.cancelled.is_set():
+            raise BenchmarkCancelled()
+        return output.decode('utf-8', errors='ignore')
+
+    def progress(self, text, fraction):
+        if self.on_progress:
+            self.on_progress(text, fraction)
+
+    def run(self):
+        """Все тесты по очереди: {имя: {'label', 'unit', 'median', 'p10', 'p90', 'runs'}}"""
+        results = {}
+        self.shell(f"cat > {SCRIPT_PATH}", stdin_data=BENCH_SCRIPT)
+        try:
+            total = len(self.tests) * (self.warmup + self.repeats)
+            done = 0
+            for name, label, args, unit in self.tests:
+                values = []
+                cached = False
+                command = f"sh {SCRIPT_PATH} {name} " + " ".join(str(arg) for arg in args)
+                for attempt in range(self.warmup + self.repeats):
+                    warmup = attempt < self.warmup
+                    stage = "прогрев" if warmup else f"замер {attempt - self.warmup + 1}/{self.repeats}"
+                    self.progress(f"🔄 {label}: {stage}", done / total)
+                    output = self.shell(command)
+                    value = parse_result(output)
+                    cached = cached or parse_mode(output) == 'cached'
+                    if value and unit == LATENCY_UNIT:
+                        value = 1000.0 / value
+                    done += 1
+                    if value is not None and not warmup:
+                        values.append(value)
+                if values:
+                    if cached:
+                        # Без root кэш не сбросить: это скорость чтения из памяти, а не с накопителя
+                        label += " (из кэша)"
+                    results[name] = dict(summarize(values), label=label, unit=unit)
+            self.progress("✅ Тест завершен", 1.0)
+        finally:
+            if not self.cancelled.is_set():
+                self.shell(f"sh {SCRIPT_PATH} cleanup; rm -f {SCRIPT_PATH}")
+        return results
+
+    def stop(self):
+        """Остановка: процесс adb на компьютере и процессы теста на устройстве"""
+        self.cancelled.set()
+        process = self.process
+        if process is not None:
+            try:
+                process.kill()
+            except Exception:
+                pass
+        try:
+            subprocess.run(self.adb_args('shell', KILL_SCRIPT),
+                           capture_output=True, timeout=15)
+        except Exception:
+            # Устройство не отвечает: остановить тест на нём нечем, но остановка не должна падать
+            pass
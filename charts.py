@@ -0,0 +1,143 @@
+"""Графики-спарклайны на Canvas с перерисовкой только при новых данных"""
+import time
+import tkinter as tk
+
+from history import TIERS
+
+
+class Sparkline:
+    """Линия среднего и полоса min/max за окно истории"""
+
+    def __init__(self, parent, title, unit, color, band_color, fixed_max=None, width=260, height=60):
+        self.title = title
+        self.unit = unit
+        self.fixed_max = fixed_max
+        self.width = width
+        self.height = height
+        self.shown = None
+
+        self.frame = tk.Frame(parent, bg='#2b2b2b')
+        self.label = tk.Label(self.frame, text=title, bg='#2b2b2b', fg='#ffffff', font=('Arial', 9), anchor='w')
+        self.label.pack(fill='x')
+        self.canvas = tk.Canvas(self.frame, width=width, height=height, bg='#1e1e1e', highlightthickness=0)
+        self.canvas.pack()
+
+        # Элементы создаются один раз, дальше меняются только их координаты
+        self.band = self.canvas.create_polygon(0, 0, 0, 0, 0, 0, fill=band_color, outline='', state='hidden')
+        self.line = self.canvas.create_line(0, 0, 0, 0, fill=color, width=2, state='hidden')
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def update(self, history, window):
+        """Перерисовка, если у истории появились новые значения или сменилось окно"""
+        key = (id(history), history.version if history else None, window)
+        if key == self.shown:
+            return
+        self.shown = key
+
+        series = history.window(window) if history else []
+        if len(series) < 2:
+            self.canvas.itemconfigure(self.line, state='hidden')
+            self.canvas.itemconfigure(self.band, state='hidden')
+            self.label.config(text=self.title)
+            return
+
+        bucket_seconds, size = TIERS[window]
+        span = bucket_seconds * size
+        start = time.time() - span
+        top = self.fixed_max or max(high for _, _, high, _ in series) or 1.0
+        scale_y = (self.height - 4) / top
+
+        def x(t):
+            return max(0.0, (t - start) / span * self.width)
+
+        def y(value):
+            return self.height - 2 - min(value, top) * scale_y
+
+        line = []
+        upper = []
+        lower = []
+        for t, low, high, avg in series:
+            px = x(t)
+            line += [px, y(avg)]
+            upper += [px, y(high)]
+            lower += [px, y(low)]
+        # Полоса: верхняя граница слева направо, нижняя - обратно
+        band = upper
+        for i in range(len(lower) - 2, -1, -2):
+            band += [lower[i], lower[i + 1]]
+
+        self.canvas.coords(self.line, *line)
+        self.canvas.coords(self.band, *band)
+        self.canvas.itemconfigure(self.line, state='normal')
+        self.canvas.itemconfigure(self.band, state='normal')
+
+        lows = min(low for _, low, _, _ in series)
+        highs = max(high for _, _, high, _ in series)
+        self.label.config(text=f"{self.title}: {history.latest():.1f}{self.unit} (мин {lows:.1f} / макс {highs:.1f})")
+
+
+def load_color(load):
+    """Цвет ячейки по загрузке: зелёный - жёлтый - красный"""
+    if load is None:
+        return '#3a3a3a'
+    share = min(max(load, 0.0), 100.0) / 100.0
+    if share < 0.5:
+        red, green = int(510 * share), 200
+    else:
+        red, green = 255, int(200 * (1 - share) * 2)
+    return f'#{red:02x}{green:02x}30'
+
+
+class CoreHeatmap:
+    """Строка ячеек по ядрам CPU: цвет - загрузка, подпись - частота"""
+
+    def __init__(self, parent, cell_width=64, height=46):
+        self.cell_width = cell_width
+        self.height = height
+        self.cells = []
+        self.shown = None
+
+        self.frame = tk.Frame(parent, bg='#2b2b2b')
+        self.label = tk.Label(self.frame, text="Ядра CPU", bg='#2b2b2b', fg='#ffffff', font=('Arial', 9), anchor='w')
+        self.label.pack(fill='x')
+        self.canvas = tk.Canvas(self.frame, width=cell_width, height=height, bg='#1e1e1e', highlightthickness=0)
+        self.canvas.pack(anchor='w')
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def resize(self, count):
+        """Ячейки создаются при смене числа ядер, дальше меняются только цвет и текст"""
+        self.canvas.delete('all')
+        self.cells = []
+        for core in range(count):
+            x = core * self.cell_width
+            rect = self.canvas.create_rectangle(x + 1, 1, x + self.cell_width - 1, self.height - 1,
+                                                fill=load_color(None), outline='')
+            text = self.canvas.create_text(x + self.cell_width / 2, self.height / 2, text="", fill='#000000',
+                                           font=('Arial', 8), justify='center')
+            self.cells.append((rect, text))
+        self.canvas.config(width=max(count, 1) * self.cell_width)
+
+    def update(self, loads, freqs):
+        """loads - [процент или None], freqs - [(текущая, максимальная) МГц или None]"""
+        loads = loads or []
+        freqs = freqs or []
+        key = (tuple(loads), tuple(freqs))
+        if key == self.shown:
+            return
+        self.shown = key
+
+        count = max(len(loads), len(freqs))
+        if count != len(self.cells):
+            self.resize(count)
+        for core, (rect, text) in enumerate(self.cells):
+            load = loads[core] if core < len(loads) else None
+            freq = freqs[core] if core < len(freqs) else None
+            caption = f"cpu{core}\n" + (f"{load:.0f}%" if load is not None else "выкл")
+            if freq:
+                caption += f"\n{freq[0] / 1000:.2f} ГГц"
+            self.canvas.itemconfigure(rect, fill=load_color(load))
+            self.canvas.itemconfigure(text, text=caption)
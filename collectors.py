@@ -0,0 +1,968 @@
+"""Сбор показателей устройств через ADB (без графического интерфейса)"""
+import atexit
+import subprocess
+import threading
+import time
+import re
+import os
+import platform
+import shlex
+
+from adb_session import get_session, close_session, parse_shell_command
+from adb_batch import collect_batch, metric_intervals, TICK_METRICS
+from adb_protocol import AdbServerClient, DeviceTracker
+from device_props import PropertyCache, parse_getprop
+from scheduler import MetricScheduler
+from history import HistoryStore
+from error_log import ErrorLog
+from alerts import AlertEngine, parse_rules, DEFAULT_RULES
+from session_record import SessionRecorder, SessionReplay
+from sampler import DeviceSampler
+from power import PowerProfiler
+from cpu_cores import CoreStats, parse_cores_output, core_frequencies
+from processes import ProcessTable, top_processes
+from frames import FrameMonitor
+from logcat import LogcatReader
+from io_rates import (CounterRates, parse_diskstats, parse_net_dev, disk_totals, format_disk_info,
+                      format_net_info)
+
+# Журнал ошибок: один файл с ротацией вместо файла на каждую ошибку
+error_log = ErrorLog()
+atexit.register(error_log.close)
+
+# Кэш пути к ADB, чтобы не обходить PATH на каждой команде
+adb_path_cache = None
+
+# История числовых показателей для графиков
+metric_history = HistoryStore()
+
+# Правила оповещений проверяются на каждом новом значении истории
+alert_engine = AlertEngine(parse_rules(DEFAULT_RULES))
+metric_history.listener = alert_engine.feed
+
+# Транспорт: "subprocess" (процесс adb и постоянные сессии) или "server" (протокол ADB-сервера)
+adb_transport = os.environ.get('ADB_MONITOR_TRANSPORT', 'subprocess')
+server_client = None
+
+# Запись сессии (все команды adb_command с выводом) и воспроизведение записи вместо устройств
+session_recorder = None
+session_replay = None
+
+# Трекер подключений (host:track-devices), запускается вместе с опросом
+device_tracker = None
+
+# Базовый период опроса; интервалы метрик масштабируются относительно него
+poll_interval = 0.5
+
+# Свойства устройств (getprop) живут до отключения или перезагрузки
+property_cache = PropertyCache()
+
+# Устройство, показанное на основной вкладке (выбирается в интерфейсе)
+current_serial = None
+
+# Состояние опроса по серийным номерам (прошлые значения счётчиков CPU и т.п.)
+device_states = {}
+device_states_lock = threading.Lock()
+
+# Высокочастотные сэмплеры на устройствах: serial -> DeviceSampler
+fast_samplers = {}
+fast_samplers_lock = threading.Lock()
+
+# Сэмплеры, завершившиеся сами (скрипт не работает на устройстве): serial -> [число сбоев, не раньше чем].
+# Повторный запуск - с растущей паузой, после SAMPLER_MAX_FAILURES подряд - не раньше переподключения;
+# всё это время CPU и RAM опрашиваются пакетом
+fast_sampler_failures = {}
+SAMPLER_RETRY_DELAY = 2.0
+SAMPLER_MAX_RETRY_DELAY = 60.0
+SAMPLER_MAX_FAILURES = 5
+
+# Метрики, которые при работающем сэмплере не опрашиваются пакетом
+FAST_METRICS = ('cpu', 'ram')
+
+# Профилировщики питания: serial -> PowerProfiler
+power_profilers = {}
+power_profilers_lock = threading.Lock()
+
+# Сбор кадров приложения: serial -> FrameMonitor
+frame_monitors = {}
+frame_monitors_lock = threading.Lock()
+
+# Чтение logcat: serial -> LogcatReader
+logcat_readers = {}
+logcat_readers_lock = threading.Lock()
+
+# Метрики, которые опрашиваются только по запросу (вкладка процессов, --top)
+OPTIONAL_METRICS = ('processes',)
+enabled_metrics = set()
+
+# Сколько процессов с наибольшей загрузкой сохранять
+top_process_count = 20
+
+# Поля результата get_stats_via_adb
+STATS_FIELDS = ('phone', 'version', 'bootloader', 'cpu', 'ram', 'storage', 'battery', 'display')
+
+# Пустой результат, пока устройство не подключено
+WAITING_STATS = ("📱 Ожидание устройства...", "❌ Подключите устройство", "", "", "", "", "", "")
+
+# Состояния adb, в которых устройство видно, но не опрашивается
+DEVICE_STATE_LABELS = {
+    "unauthorized": "🔐 Разрешите отладку по USB на устройстве",
+    "offline": "⚠️ Устройство offline",
+    "recovery": "🛠️ Режим Recovery",
+    "sideload": "📦 Режим Sideload",
+    "bootloader": "⚡ Режим загрузчика",
+}
+
+def find_adb():
+    """Автоматический поиск adb.exe в системе"""
+    possible_paths = []
+    
+    if platform.system() == "Windows":
+        possible_paths.extend([
+            os.path.join(os.environ.get('ProgramFiles', ''), 'Android', 'platform-tools', 'adb.exe'),
+            os.path.join(os.environ.get('ProgramFiles(x86)', ''), 'Android', 'platform-tools', 'adb.exe'),
+            os.path.join(os.environ.get('USERPROFILE', ''), 'AppData', 'Local', 'Android', 'Sdk', 'platform-tools', 'adb.exe'),
+            os.path.join(os.getcwd(), 'adb.exe'),
+            os.path.join(os.getcwd(), 'platform-tools', 'adb.exe'),
+        ])
+    else:
+        possible_paths.extend([
+            '/usr/bin/adb',
+            '/usr/local/bin/adb',
+            os.path.expanduser('~/Android/Sdk/platform-tools/adb'),
+            os.path.join(os.getcwd(), 'adb'),
+        ])
+    
+    # Проверяем PATH
+    for path_dir in os.environ.get('PATH', '').split(os.pathsep):
+        adb_path = os.path.join(path_dir, 'adb.exe' if platform.system() == "Windows" else 'adb')
+        if os.path.isfile(adb_path):
+            return adb_path
+    
+    # Проверяем возможные пути
+    for path in possible_paths:
+        if os.path.isfile(path):
+            return path
+    
+    return None
+
+def get_adb_path():
+    """Путь к ADB с кэшированием результата find_adb()"""
+    global adb_path_cache
+    if adb_path_cache is None:
+        adb_path_cache = find_adb()
+    return adb_path_cache
+
+def log_error(error_msg):
+    """Запись ошибки в журнал: повторы сворачиваются, на диск пишет фоновый поток"""
+    error_log.log(error_msg)
+
+def get_server_client():
+    """Клиент ADB-сервера для транспорта server"""
+    global server_client
+    if server_client is None:
+        server_client = AdbServerClient(adb_path=get_adb_path())
+    return server_client
+
+def adb_command(cmd, timeout=5, serial=None):
+    """Выполнение ADB команд с обработкой ошибок; при записи сессии команда и вывод сохраняются"""
+    if session_replay is not None:
+        return session_replay.command(cmd, serial)
+    if session_recorder is None:
+        return execute_adb_command(cmd, timeout, serial)
+    started = time.time()
+    output, error = execute_adb_command(cmd, timeout, serial)
+    session_recorder.record(serial, cmd, output, error, started, time.time() - started)
+    return output, error
+
+def quote_arg(value):
+    """Аргумент для командной строки с shell=True: cmd.exe в Windows понимает только двойные кавычки"""
+    if platform.system() == "Windows":
+        return f'"{value}"'
+    return shlex.quote(value)
+
+def execute_adb_command(cmd, timeout=5, serial=None):
+    """Выполнение ADB команды через выбранный транспорт"""
+    try:
+        # Команды, которые ADB-сервер выполняет сам, идут без запуска adb
+        if adb_transport == "server":
+            result = get_server_client().command(cmd, timeout, serial)
+            if result is not None:
+                return result
+
+        adb_path = get_adb_path()
+        if not adb_path:
+            return None, "❌ ADB не найден"
+
+        # Shell-команды идут через постоянную сессию устройства
+        shell_cmd = parse_shell_command(cmd)
+        if shell_cmd is not None:
+            return get_session(adb_path, serial).run(shell_cmd, timeout)
+
+        full_cmd = f'{quote_arg(adb_path)} -s {quote_arg(serial)} {cmd}' if serial else f'{quote_arg(adb_path)} {cmd}'
+        result = subprocess.run(
+            full_cmd,
+            shell=True,
+            capture_output=True,
+            text=True,
+            encoding='utf-8',
+            errors='ignore',
+            timeout=timeout
+        )
+        return result.stdout.strip(), None
+    except subprocess.TimeoutExpired:
+        return None, "⏰ Таймаут команды"
+    except Exception as e:
+        error_msg = f"❌ Ошибка ADB: {str(e)}"
+        log_error(error_msg)
+        return None, error_msg
+
+def run_shell(cmd, timeout=5, serial=None):
+    """ADB shell команда с контрактом (output, error)"""
+    return adb_command(f'shell "{cmd}"', timeout, serial)
+
+def adb_shell(cmd, serial=None):
+    """Универсальная функция для выполнения ADB shell команд"""
+    output, error = run_shell(cmd, serial=serial)
+    return output if output else error
+
+def parse_devices(output):
+    """Разбор `adb devices` в список (serial, state)"""
+    devices = []
+    for line in (output or "").split('\n')[1:]:
+        parts = line.split()
+        if len(parts) >= 2:
+            devices.append((parts[0], parts[1]))
+    return devices
+
+def start_device_tracker(on_event=None):
+    """Запуск трекера подключений через ADB-сервер"""
+    global device_tracker
+    if session_replay is not None:
+        # Список устройств берётся из записи
+        return None
+    device_tracker = DeviceTracker(get_server_client(), on_event).start()
+    return device_tracker
+
+def list_device_states():
+    """{serial: state} из трекера, а без связи с сервером - через `adb devices`"""
+    if device_tracker is not None and device_tracker.connected:
+        states = device_tracker.snapshot()
+        if session_recorder is not None:
+            # Для воспроизведения список устройств нужен в записи, как от `adb devices`
+            output = "List of devices attached\n" + "".join(f"{serial}\t{state}\n" for serial, state in states.items())
+            session_recorder.record(None, "devices", output.strip(), None, time.time(), 0.0)
+        return states
+    output, error = adb_command("devices")
+    if error:
+        return {}
+    return dict(parse_devices(output))
+
+def wait_next_tick(has_devices, idle_timeout=None):
+    """Пауза между тиками опроса; событие трекера будит цикл сразу"""
+    if device_tracker is not None and device_tracker.connected:
+        # Без онлайн-устройств опроса нет до следующего события
+        device_tracker.wait(poll_interval if has_devices else idle_timeout)
+    else:
+        time.sleep(poll_interval)
+
+def list_online_devices():
+    """Серийные номера всех устройств в состоянии device"""
+    return [serial for serial, state in list_device_states().items() if state == "device"]
+
+def device_state_stats(state):
+    """Показатели для основной вкладки, когда устройство нельзя опросить"""
+    if state is None:
+        return WAITING_STATS
+    label = DEVICE_STATE_LABELS.get(state, f"❓ Состояние: {state}")
+    return ("📱 Ожидание устройства...", label, "", "", "", "", "", "")
+
+def get_device_state(serial):
+    """Состояние опроса устройства (создаётся при первом обращении)"""
+    with device_states_lock:
+        state = device_states.get(serial)
+        if state is None:
+            state = device_states[serial] = {
+                'scheduler': MetricScheduler(metric_intervals(base=poll_interval)),
+                'cores': CoreStats(),
+                'processes': ProcessTable(),
+                'disk_rates': CounterRates(),
+                'net_rates': CounterRates(),
+                'sections': {},
+                'info': {},
+                'values': {},
+            }
+        return state
+
+def forget_devices(serials):
+    """Сброс состояния и сессий устройств, которых больше нет в списке"""
+    property_cache.retain(serials)
+    with device_states_lock:
+        gone = [serial for serial in device_states if serial not in serials]
+        for serial in gone:
+            del device_states[serial]
+    for serial in gone:
+        close_session(serial)
+    if gone:
+        alert_engine.forget(serials)
+    metric_history.forget(serials)
+    with fast_samplers_lock:
+        stale = [serial for serial in fast_samplers if serial not in serials]
+        for serial in [serial for serial in fast_sampler_failures if serial not in serials]:
+            del fast_sampler_failures[serial]
+    for serial in stale:
+        stop_fast_sampler(serial)
+    with power_profilers_lock:
+        stale = [serial for serial in power_profilers if serial not in serials]
+    for serial in stale:
+        stop_power_profiler(serial)
+    with frame_monitors_lock:
+        stale = [serial for serial in frame_monitors if serial not in serials]
+    for serial in stale:
+        stop_frame_monitor(serial)
+    with logcat_readers_lock:
+        stale = [serial for serial in logcat_readers if serial not in serials]
+    for serial in stale:
+        stop_logcat_reader(serial)
+
+def load_device_props(serial, boot_id=None):
+    """Свойства устройства одним дампом getprop с сохранением в кэш"""
+    if boot_id is None:
+        boot_id = adb_shell("cat /proc/sys/kernel/random/boot_id", serial) or ""
+    output, error = run_shell("getprop", serial=serial)
+    if error or not output:
+        return {}
+    props = parse_getprop(output)
+    property_cache.store(serial, boot_id, props)
+    return props
+
+def get_device_props(serial=None):
+    """Свойства текущего устройства из кэша (заполняется при промахе)"""
+    if serial is None:
+        serial = current_serial
+    props = property_cache.peek(serial)
+    if props is None:
+        props = load_device_props(serial)
+    return props
+
+# Маппинг версий SDK на Android версии
+ANDROID_VERSIONS = {
+    35: "Android 15",
+    34: "Android 14",
+    33: "Android 13", 
+    32: "Android 12L",
+    31: "Android 12",
+    30: "Android 11",
+    29: "Android 10",
+    28: "Android 9",
+    27: "Android 8.1",
+    26: "Android 8.0",
+    25: "Android 7.1",
+    24: "Android 7.0",
+    23: "Android 6.0",
+    22: "Android 5.1",
+    21: "Android 5.0"
+}
+
+def parse_android_version(sdk_version, release_version=None):
+    """Человеко-читаемая версия Android из ro.build.version.sdk / release"""
+    if sdk_version and sdk_version.isdigit():
+        sdk = int(sdk_version)
+        return ANDROID_VERSIONS.get(sdk, f"Android (SDK {sdk})")
+    
+    # Если не получилось через SDK, пробуем через версию релиза
+    if release_version:
+        # Пытаемся извлечь основную версию (14, 15, etc)
+        version_match = re.search(r'^(\d+)', release_version)
+        if version_match:
+            version_num = version_match.group(1)
+            return f"Android {version_num}"
+        return f"Android {release_version}"
+    
+    return "Android Unknown"
+
+def get_android_version():
+    """Получение человеко-читаемой версии Android"""
+    try:
+        props = get_device_props()
+        return parse_android_version(props.get("ro.build.version.sdk"), props.get("ro.build.version.release"))
+    except Exception as e:
+        return "Android Unknown"
+
+def parse_bootloader(brand, manufacturer, bootloader_status, verified_boot):
+    """Состояние загрузчика Xiaomi по свойствам устройства"""
+    xiaomi_brands = ["xiaomi", "redmi", "poco", "black shark", "blackshark"]
+    is_xiaomi = any(name.lower() in xiaomi_brands for name in [brand or "", manufacturer or ""])
+    
+    if not is_xiaomi:
+        return "🔓 Загрузчик: Не Xiaomi устройство"
+    
+    if bootloader_status:
+        if bootloader_status == "0":
+            return "🔓 Загрузчик: РАЗБЛОКИРОВАН"
+        elif bootloader_status == "1":
+            return "🔒 Загрузчик: ЗАБЛОКИРОВАН"
+        else:
+            return f"🔐 Загрузчик: Неизвестно ({bootloader_status})"
+    
+    if verified_boot:
+        if verified_boot == "orange":
+            return "🔓 Загрузчик: РАЗБЛОКИРОВАН (Orange State)"
+        elif verified_boot == "green":
+            return "🔒 Загрузчик: ЗАБЛОКИРОВАН (Green State)"
+    
+    return "🔐 Загрузчик: Не удалось определить"
+
+def parse_props_bootloader(props):
+    """Состояние загрузчика из словаря свойств getprop"""
+    return parse_bootloader(props.get("ro.product.brand"), props.get("ro.product.manufacturer"),
+                            props.get("ro.boot.flash.locked"), props.get("ro.boot.verifiedbootstate"))
+
+def check_xiaomi_bootloader():
+    """Проверка состояния загрузчика для Xiaomi устройств"""
+    try:
+        props = get_device_props()
+        return parse_props_bootloader(props)
+        
+    except Exception as e:
+        return f"🔐 Загрузчик: Ошибка проверки"
+
+def parse_storage_values(storage_info):
+    """(всего, занято, свободно) в КБ из строки `df /data`"""
+    if storage_info and "Ошибка" not in storage_info:
+        parts = storage_info.split()
+        if len(parts) >= 5:
+            return int(parts[1]), int(parts[2]), int(parts[3])
+    return None
+
+def parse_storage_info(storage_info):
+    """Разбор строки `df /data` в текст для интерфейса"""
+    values = parse_storage_values(storage_info)
+    if values:
+        total_kb, used_kb, free_kb = values
+        total_gb = total_kb / 1024 / 1024
+        used_gb = used_kb / 1024 / 1024
+        free_gb = free_kb / 1024 / 1024
+        
+        return f"💾 Память: {used_gb:.1f}/{total_gb:.1f}GB свободно {free_gb:.1f}GB"
+    
+    return "💾 Память: Ошибка чтения"
+
+def get_real_storage():
+    """Проверка реальной памяти устройства"""
+    try:
+        return parse_storage_info(adb_shell("df /data | grep /data"))
+    except Exception as e:
+        return f"💾 Память: Ошибка - {str(e)}"
+
+def parse_active_refresh_rate(display_output):
+    """Частота активного режима дисплея из `dumpsys display` или None"""
+    if not display_output or "Ошибка" in display_output:
+        return None
+    # Android 12+: режим, выбранный SurfaceFlinger
+    match = re.search(r'mActiveSfDisplayMode=[^{]*\{[^}]*?(?:refreshRate|fps)=([\d.]+)', display_output)
+    if match:
+        return float(match.group(1))
+    # Android 6+: номер режима и список поддерживаемых режимов встроенного дисплея
+    mode_match = re.search(r'modeId (\d+)', display_output)
+    if mode_match:
+        modes = dict(re.findall(r'\{id=(\d+), width=\d+, height=\d+, fps=([\d.]+)', display_output))
+        if mode_match.group(1) in modes:
+            return float(modes[mode_match.group(1)])
+    return None
+
+def parse_refresh_rate(current_rate, miui_rate=None, active_rate=None):
+    """Частота обновления: активный режим дисплея, иначе настройки peak_refresh_rate / screen_refresh_rate"""
+    # Настройки задают только верхнюю границу, MIUI хранит её в своём ключе
+    peak = None
+    for value in (current_rate, miui_rate):
+        if value and value != "null" and "Ошибка" not in value:
+            try:
+                rate = float(value)
+                if rate > 1:
+                    peak = rate
+                    break
+            except:
+                pass
+
+    if active_rate:
+        if peak and round(peak) != round(active_rate):
+            return f"{active_rate:.0f}Hz (до {peak:.0f}Hz)"
+        return f"{active_rate:.0f}Hz"
+    if peak:
+        return f"до {peak:.0f}Hz"
+    return "Частота неизвестна"
+
+def get_display_refresh_rate(serial=None):
+    """Получение текущей частоты обновления дисплея"""
+    try:
+        display_output = adb_shell("dumpsys display | grep -E 'mActiveSfDisplayMode|DisplayDeviceInfo'", serial)
+        current_rate = adb_shell("settings get system peak_refresh_rate", serial)
+        miui_rate = adb_shell("settings get system screen_refresh_rate", serial)
+        return parse_refresh_rate(current_rate, miui_rate, parse_active_refresh_rate(display_output))
+        
+    except Exception as e:
+        return "Частота неизвестна"
+
+def parse_phone_info(brand, model, market_name):
+    """Название устройства для заголовка"""
+    if market_name and market_name != "Unknown":
+        return f"{market_name}"
+    elif brand and model:
+        return f"{brand} {model}"
+    return "Unknown Device"
+
+def parse_cpu_usage(stat_output, state):
+    """Загрузка CPU в процентах по разнице со значениями /proc/stat прошлого тика"""
+    cpu_usage = None
+    if stat_output and "Ошибка" not in stat_output:
+        parts = stat_output.split()
+        if len(parts) >= 8:
+            total_time = sum(int(x) for x in parts[1:8])
+            idle_time = int(parts[4])
+            if 'prev_total' in state and 'prev_idle' in state:
+                total_diff = total_time - state['prev_total']
+                idle_diff = idle_time - state['prev_idle']
+                if total_diff > 0:
+                    cpu_usage = 100 * (total_diff - idle_diff) / total_diff
+            
+            state['prev_total'] = total_time
+            state['prev_idle'] = idle_time
+    return cpu_usage
+
+def parse_cpu_info(stat_output, state):
+    """Загрузка CPU по разнице со значениями /proc/stat прошлого тика"""
+    cpu_usage = parse_cpu_usage(stat_output, state)
+    state['cpu_usage'] = cpu_usage
+    return format_cpu_info(cpu_usage)
+
+def format_cpu_info(cpu_usage):
+    """Строка загрузки CPU с цветным индикатором"""
+    cpu = f"{cpu_usage:.1f}" if cpu_usage is not None else "0"
+    
+    # Цвет индикатора CPU
+    cpu_color = "🟢"
+    if float(cpu) > 80:
+        cpu_color = "🔴"
+    elif float(cpu) > 40:
+        cpu_color = "🟡"
+        
+    return f"{cpu_color} CPU: {cpu}%"
+
+def parse_ram_values(ram_output):
+    """(использовано, всего) в МБ из вывода `free -m`"""
+    if ram_output and "Ошибка" not in ram_output:
+        for line in ram_output.split('\n'):
+            if 'Mem:' in line:
+                parts = line.split()
+                if len(parts) >= 4:
+                    return int(parts[2]), int(parts[1])
+                break
+    return None
+
+def parse_ram_info(ram_output):
+    """Разбор вывода `free -m`"""
+    ram_info = "💾 RAM: Ошибка чтения"
+    
+    values = parse_ram_values(ram_output)
+    if values:
+        ram_info = format_ram_info(*values)
+    return ram_info
+
+def format_ram_info(ram_used, ram_total):
+    """Строка занятой памяти в МБ и процентах"""
+    ram_percent = f"{(ram_used/ram_total)*100:.1f}%" if ram_total else "0%"
+    return f"💾 RAM: {ram_used}/{ram_total}MB ({ram_percent})"
+
+def parse_battery_fields(battery_output):
+    """Поля `dumpsys battery` в виде словаря {ключ: значение}"""
+    fields = {}
+    if battery_output and "Ошибка" not in battery_output:
+        for line in battery_output.split('\n'):
+            if ':' in line:
+                key, value = line.split(':', 1)
+                fields[key.strip()] = value.strip()
+    return fields
+
+def parse_battery_info(battery_output):
+    """Разбор вывода `dumpsys battery`"""
+    battery_info = "🔋 Battery: Ошибка чтения"
+    
+    fields = parse_battery_fields(battery_output)
+    if fields:
+        battery_level = "N/A"
+        battery_status = "N/A"
+        battery_temp = "N/A"
+        
+        if fields.get('level', '').isdigit():
+            battery_level = f"{fields['level']}%"
+        if 'status' in fields:
+            status_map = {"2": "Заряжается", "3": "Разряжается", "5": "Полный"}
+            battery_status = status_map.get(fields['status'], fields['status'])
+        if fields.get('temperature', '').isdigit():
+            temp_c = int(fields['temperature']) / 10.0
+            battery_temp = f"{temp_c:.1f}°C"
+        
+        battery_info = f"🔋 Батарея: {battery_level} | {battery_status} | {battery_temp}"
+    return battery_info
+
+def parse_display_info(size_output, refresh_rate):
+    """Разрешение из `wm size` и частота обновления"""
+    if size_output and "Ошибка" not in size_output and "Physical size" in size_output:
+        resolution = size_output.split(":")[1].strip()
+        return f"📱 Дисплей: {resolution} | {refresh_rate}"
+    return "📱 Дисплей: Ошибка чтения"
+
+def get_stats_via_adb(serial=None, metrics=None):
+    """Показатели устройства; без serial берётся первое подключенное.
+
+    metrics - метрики для опроса (по умолчанию все); для остальных
+    возвращаются значения прошлого опроса.
+    """
+    global current_serial
+    try:
+        if serial is None:
+            # Проверка подключения
+            serials = list_online_devices()
+            forget_devices(serials)
+            if not serials:
+                return WAITING_STATS
+            serial = current_serial = serials[0]
+        if metrics is None:
+            metrics = TICK_METRICS
+
+        # Все метрики тика одной командой
+        sections, error = collect_batch(lambda cmd, timeout: run_shell(cmd, timeout, serial), metrics)
+        if error:
+            return "📱 Ожидание устройства...", error, "", "", "", "", "", ""
+
+        state = get_device_state(serial)
+        merged = state['sections']
+        merged.update(sections)
+        info = state['info']
+
+        # Свойства устройства меняются только после перезагрузки
+        if 'boot_id' in sections or 'phone' not in info:
+            boot_id = merged.get('boot_id', "")
+            props = property_cache.get(serial, boot_id)
+            if props is None:
+                props = load_device_props(serial, boot_id)
+
+            # Информация о телефоне
+            info['phone'] = parse_phone_info(props.get("ro.product.brand"), props.get("ro.product.model"),
+                                             props.get("ro.product.marketname"))
+
+            # Версия Android отдельно
+            android_version = parse_android_version(props.get("ro.build.version.sdk"),
+                                                    props.get("ro.build.version.release"))
+            info['version'] = f"📱 {android_version}"
+
+            # Проверка загрузчика для Xiaomi
+            info['bootloader'] = parse_props_bootloader(props)
+
+        now = time.time()
+        tick = time.monotonic()
+        if session_replay is not None:
+            # Скорости и история считаются по времени записи
+            now = tick = session_replay.now()
+        values = state['values']
+
+        def record(name, value, history=True):
+            values[name] = value
+            if history:
+                metric_history.add(serial, name, value, now)
+
+        if 'cpu' in sections:
+            info['cpu'] = parse_cpu_info(sections['cpu'], state)
+            record('cpu', state['cpu_usage'])
+        if 'cpu_cores' in sections:
+            core_stats, core_freqs = parse_cores_output(sections['cpu_cores'])
+            loads = state['cores'].update(core_stats)
+            # Выключенные ядра есть в cpufreq, но отсутствуют в /proc/stat
+            count = max(len(loads), max(core_freqs) + 1 if core_freqs else 0)
+            loads += [None] * (count - len(loads))
+            record('core_loads', loads, history=False)
+            record('core_freqs_mhz', core_frequencies(core_freqs, count), history=False)
+            for core, load in enumerate(loads):
+                if load is not None:
+                    metric_history.add(serial, f'cpu{core}', load, now)
+        if 'ram' in sections:
+            info['ram'] = parse_ram_info(sections['ram'])
+            ram_values = parse_ram_values(sections['ram'])
+            if ram_values and ram_values[1]:
+                record('ram_used_mb', ram_values[0], history=False)
+                record('ram_total_mb', ram_values[1], history=False)
+                record('ram', 100 * ram_values[0] / ram_values[1])
+        if 'diskstats' in sections:
+            totals = disk_totals(state['disk_rates'].update(parse_diskstats(sections['diskstats']),
+                                                            tick))
+            info['disk_io'] = format_disk_info(totals)
+            if totals:
+                record('disk_read_mb_s', totals[0])
+                record('disk_write_mb_s', totals[1])
+                record('disk_read_iops', totals[2], history=False)
+                record('disk_write_iops', totals[3], history=False)
+        if 'netdev' in sections:
+            net_rates = state['net_rates'].update(parse_net_dev(sections['netdev']), tick)
+            info['net_io'] = format_net_info(net_rates)
+            known = [rate for rate in net_rates.values() if rate is not None]
+            if known:
+                record('net_rx_kb_s', sum(rate[0] for rate in known) / 1024)
+                record('net_tx_kb_s', sum(rate[1] for rate in known) / 1024)
+        if 'storage' in sections:
+            info['storage'] = parse_storage_info(sections['storage'])
+            storage_values = parse_storage_values(sections['storage'])
+            if storage_values:
+                record('storage_total_kb', storage_values[0], history=False)
+                record('storage_used_kb', storage_values[1], history=False)
+        if 'battery' in sections:
+            info['battery'] = parse_battery_info(sections['battery'])
+            battery_fields = parse_battery_fields(sections['battery'])
+            if battery_fields.get('level', '').isdigit():
+                record('battery_level', int(battery_fields['level']))
+            if battery_fields.get('temperature', '').isdigit():
+                record('battery_temp', int(battery_fields['temperature']) / 10.0)
+
+        if 'processes' in sections:
+            rows, count = state['processes'].update(sections['processes'])
+            record('process_count', count, history=False)
+            record('top_processes', [
+                {'pid': pid, 'name': name, 'state': proc_state,
+                 'cpu': round(cpu, 1) if cpu is not None else None, 'rss_mb': round(rss_mb, 1)}
+                for cpu, pid, name, proc_state, rss_mb in top_processes(rows, top_process_count)
+            ], history=False)
+
+        if {'display_size', 'peak_refresh_rate', 'miui_refresh_rate', 'display_mode'} & set(sections):
+            active_rate = parse_active_refresh_rate(merged.get('display_mode'))
+            if 'display_mode' in sections and active_rate:
+                record('refresh_rate', active_rate)
+            refresh_rate = parse_refresh_rate(merged.get('peak_refresh_rate'), merged.get('miui_refresh_rate'),
+                                              active_rate)
+            info['display'] = parse_display_info(merged.get('display_size'), refresh_rate)
+
+        return device_stats(serial)
+
+    except Exception as e:
+        error_msg = f"❌ Системная ошибка: {str(e)}"
+        log_error(error_msg)
+        return "📱 Ошибка", error_msg, "", "", "", "", "", ""
+
+def device_stats(serial):
+    """Последние показатели устройства в формате результата get_stats_via_adb"""
+    info = get_device_state(serial)['info']
+    return tuple(info.get(field, "") for field in STATS_FIELDS)
+
+def poll_device(serial):
+    """Опрос только тех метрик устройства, которым подошёл срок"""
+    scheduler = get_device_state(serial)['scheduler']
+    metrics = scheduler.due()
+    if not metrics:
+        return None
+    skipped = [name for name in OPTIONAL_METRICS if name not in enabled_metrics]
+    if is_fast_sampling(serial):
+        # CPU и RAM уже приходят из сэмплера
+        skipped += FAST_METRICS
+    polled = [name for name in metrics if name not in skipped]
+    if len(polled) < len(metrics):
+        # Не опрошенные метрики не должны выглядеть выполненными в отчёте о частоте
+        scheduler.postpone([name for name in metrics if name in skipped])
+    if not polled:
+        return None
+    stats = get_stats_via_adb(serial, polled)
+    if stats[0] == WAITING_STATS[0]:
+        delay = scheduler.failed()
+        log_error(f"Устройство {serial} не отвечает, повтор через {delay:.0f} сек: {stats[1]}")
+    else:
+        scheduler.completed(polled)
+    return stats
+
+def collect_sample(serial):
+    """Опрос устройства с результатом в виде записи для выгрузки (None - нечего опрашивать)"""
+    stats = poll_device(serial)
+    if stats is None:
+        return None
+    now = session_replay.now() if session_replay is not None else time.time()
+    sample = {'ts': round(now, 3), 'serial': serial}
+    if stats[0] == WAITING_STATS[0]:
+        sample['error'] = stats[1]
+        return sample
+    sample.update(get_device_state(serial)['values'])
+    sample['phone'] = stats[0]
+    return sample
+
+def start_session_recording(path):
+    """Запись всех команд adb_command с выводом в файл сессии (дозапись, если файл есть)"""
+    global session_recorder
+    session_recorder = SessionRecorder(path)
+    atexit.register(session_recorder.close)
+    return session_recorder
+
+def start_session_replay(path, speed=1.0):
+    """Ответы на команды из файла сессии вместо устройств; speed=0 - без ожидания"""
+    global session_replay
+    session_replay = SessionReplay(path, speed)
+    return session_replay
+
+def replay_batches(on_sample=None):
+    """Прогон всех пакетных опросов записи через get_stats_via_adb без ожидания (speed=0).
+
+    Возвращает {'batches', 'seconds', 'batches_per_s', 'mb_per_s'} - пропускную
+    способность разбора без устройства и ADB.
+    """
+    replay = session_replay
+    started = time.perf_counter()
+    for serial, metrics in replay.batches:
+        stats = get_stats_via_adb(serial, metrics)
+        if on_sample is not None and stats[0] != WAITING_STATS[0]:
+            sample = {'ts': round(replay.now(), 3), 'serial': serial}
+            sample.update(get_device_state(serial)['values'])
+            sample['phone'] = stats[0]
+            on_sample(serial, sample)
+    elapsed = time.perf_counter() - started
+    return {
+        'batches': len(replay.batches),
+        'entries': replay.entries,
+        'seconds': elapsed,
+        'batches_per_s': len(replay.batches) / elapsed if elapsed > 0 else None,
+        'mb_per_s': replay.output_bytes / (1024 * 1024) / elapsed if elapsed > 0 else None,
+    }
+
+def apply_fast_sample(serial, sample):
+    """Выборка сэмплера в состояние устройства и историю (вместо пакетных cpu/ram)"""
+    state = get_device_state(serial)
+    info = state['info']
+    values = state['values']
+    t = sample['ts']
+    if sample['cpu'] is not None:
+        state['cpu_usage'] = values['cpu'] = sample['cpu']
+        metric_history.add(serial, 'cpu', sample['cpu'], t)
+        info['cpu'] = format_cpu_info(sample['cpu'])
+    if sample['ram'] is not None:
+        values['ram_used_mb'] = sample['ram_used_mb']
+        values['ram_total_mb'] = sample['ram_total_mb']
+        values['ram'] = sample['ram']
+        metric_history.add(serial, 'ram', sample['ram'], t)
+        info['ram'] = format_ram_info(sample['ram_used_mb'], sample['ram_total_mb'])
+    for zone, temp in sample.get('thermal', {}).items():
+        metric_history.add(serial, f'thermal:{zone}', temp, t)
+
+def start_fast_sampler(serial, rate_hz=20, on_sample=None):
+    """Запуск цикла сэмплера на устройстве; on_sample(serial, sample) - после учёта выборки.
+
+    None - ADB не найден или сэмплер на этом устройстве недавно завершился сбоем
+    и пауза перед повтором ещё не прошла.
+    """
+    adb_path = get_adb_path()
+    if not adb_path:
+        return None
+    with fast_samplers_lock:
+        failure = fast_sampler_failures.get(serial)
+    if failure is not None and (failure[0] >= SAMPLER_MAX_FAILURES or time.monotonic() < failure[1]):
+        return None
+    stop_fast_sampler(serial)
+    working = [False]
+
+    def handle(serial, sample):
+        if not working[0]:
+            # Сэмплер работает: прошлые сбои больше не в счёт
+            working[0] = True
+            with fast_samplers_lock:
+                fast_sampler_failures.pop(serial, None)
+        apply_fast_sample(serial, sample)
+        if on_sample:
+            on_sample(serial, sample)
+
+    sampler = DeviceSampler(adb_path, serial, rate_hz, handle).start()
+    with fast_samplers_lock:
+        fast_samplers[serial] = sampler
+    return sampler
+
+def stop_fast_sampler(serial):
+    with fast_samplers_lock:
+        sampler = fast_samplers.pop(serial, None)
+    if sampler is not None:
+        sampler.stop()
+
+def is_fast_sampling(serial):
+    """Сэмплер работает; завершившийся сам убирается из реестра и считается сбоем"""
+    with fast_samplers_lock:
+        sampler = fast_samplers.get(serial)
+        if sampler is None:
+            return False
+        if sampler.is_alive():
+            return True
+        del fast_samplers[serial]
+        failure = fast_sampler_failures.setdefault(serial, [0, 0.0])
+        failure[0] += 1
+        failure[1] = time.monotonic() + min(SAMPLER_RETRY_DELAY * 2 ** (failure[0] - 1), SAMPLER_MAX_RETRY_DELAY)
+        count = failure[0]
+    log_error(f"Сэмплер на {serial} завершился ({count} раз подряд), CPU и RAM опрашиваются пакетом")
+    return False
+
+def start_power_profiler(serial, rate_hz=10, on_sample=None):
+    """Новая сессия профилировщика питания; on_sample(serial, sample) после учёта выборки"""
+    adb_path = get_adb_path()
+    if not adb_path:
+        return None
+    stop_power_profiler(serial)
+
+    def handle(serial, sample):
+        metric_history.add(serial, 'power_mw', sample['power_mw'], sample['ts'])
+        if on_sample:
+            on_sample(serial, sample)
+
+    profiler = PowerProfiler(adb_path, serial, rate_hz, handle).start()
+    with power_profilers_lock:
+        power_profilers[serial] = profiler
+    return profiler
+
+def stop_power_profiler(serial):
+    """Остановка профилировщика; сессия остаётся доступной в возвращённом объекте"""
+    with power_profilers_lock:
+        profiler = power_profilers.pop(serial, None)
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+def start_logcat_reader(serial, buffer, on_lines=None):
+    """Чтение logcat устройства в buffer; если в буфере уже есть записи, чтение продолжается с последней"""
+    adb_path = get_adb_path()
+    if not adb_path:
+        return None
+    stop_logcat_reader(serial)
+    reader = LogcatReader(adb_path, serial, buffer, on_lines).start()
+    with logcat_readers_lock:
+        logcat_readers[serial] = reader
+    return reader
+
+def stop_logcat_reader(serial):
+    with logcat_readers_lock:
+        reader = logcat_readers.pop(serial, None)
+    if reader is not None:
+        reader.stop()
+    return reader
+
+def start_frame_monitor(serial, source='gfxinfo', package=None, on_update=None, interval=1.0):
+    """Сбор кадров приложения на устройстве; on_update(serial, monitor, summary) после каждого прохода"""
+    stop_frame_monitor(serial)
+
+    def handle(monitor, added):
+        summary = monitor.stats.summary()
+        if added:
+            metric_history.add(serial, 'fps', summary.get('fps'))
+            metric_history.add(serial, 'frame_p95_ms', summary.get('p95_ms'))
+        if on_update:
+            on_update(serial, monitor, summary)
+
+    monitor = FrameMonitor(lambda cmd, timeout: run_shell(cmd, timeout, serial), source, package,
+                           interval, handle).start()
+    with frame_monitors_lock:
+        frame_monitors[serial] = monitor
+    return monitor
+
+def stop_frame_monitor(serial):
+    with frame_monitors_lock:
+        monitor = frame_monitors.pop(serial, None)
+    if monitor is not None:
+        monitor.stop()
+    return monitor
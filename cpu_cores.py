@@ -0,0 +1,71 @@
+"""Загрузка и частота каждого ядра CPU: разбор /proc/stat и cpufreq, расчёт по разнице счётчиков"""
+from array import array
+
+# Нет данных по ядру (выключено или первый опрос)
+OFFLINE = -1
+
+
+def parse_cores_output(output):
+    """({ядро: (всего, простой)}, {ядро: (текущая, максимальная частота в кГц)})"""
+    stats = {}
+    freqs = {}
+    for line in (output or "").split('\n'):
+        parts = line.split()
+        if not parts:
+            continue
+        try:
+            if parts[0].startswith('cpu') and parts[0][3:].isdigit() and len(parts) >= 8:
+                counters = [int(x) for x in parts[1:8]]
+                # Как и для общей загрузки: всего - первые 7 счётчиков, простой - idle
+                stats[int(parts[0][3:])] = (sum(counters), counters[3])
+            elif parts[0] == 'freq' and len(parts) >= 4:
+                freqs[int(parts[1])] = (int(parts[2]), int(parts[3]))
+        except ValueError:
+            continue
+    return stats, freqs
+
+
+class CoreStats:
+    """Счётчики ядер одного устройства в колонках array.
+
+    Разница считается сразу по всем ядрам одним проходом по колонкам; ядро,
+    которого не было в прошлом или текущем опросе (hotplug), даёт None.
+    """
+
+    def __init__(self):
+        self.totals = array('q')
+        self.idles = array('q')
+
+    def resize(self, count):
+        missing = count - len(self.totals)
+        if missing > 0:
+            self.totals.extend([OFFLINE] * missing)
+            self.idles.extend([OFFLINE] * missing)
+
+    def update(self, stats):
+        """Загрузка ядер в процентах по разнице с прошлым опросом: [процент или None]"""
+        count = max(stats) + 1 if stats else 0
+        self.resize(count)
+        totals = array('q', [OFFLINE]) * len(self.totals)
+        idles = array('q', [OFFLINE]) * len(self.totals)
+        for core, (total, idle) in stats.items():
+            totals[core] = total
+            idles[core] = idle
+
+        loads = [
+            100 * ((total - prev_total) - (idle - prev_idle)) / (total - prev_total)
+            if prev_total != OFFLINE and total != OFFLINE and total > prev_total else None
+            for total, idle, prev_total, prev_idle in zip(totals, idles, self.totals, self.idles)
+        ]
+        self.totals = totals
+        self.idles = idles
+        return loads[:count]
+
+
+def core_frequencies(freqs, count):
+    """[(текущая, максимальная) частота в МГц или None] по номерам ядер"""
+    result = []
+    for core in range(count):
+        cur, top = freqs.get(core, (0, 0))
+        result.append((cur // 1000, top // 1000) if cur else None)
+    return result
@@ -0,0 +1,45 @@
+"""Параллельный опрос нескольких устройств ограниченным пулом потоков"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Больше потоков не ускоряет опрос: каждый ждёт свой adb-процесс
+MAX_WORKERS = 32
+
+
+class DevicePoller:
+    """Опрос устройств по серийным номерам, не более одного запроса на устройство"""
+
+    def __init__(self, collect, max_workers=MAX_WORKERS):
+        self.collect = collect
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="adb-poll")
+        self.in_flight = set()
+        self.lock = threading.Lock()
+
+    def poll(self, serials, on_result):
+        """Запуск опроса; on_result(serial, result) вызывается из потока пула.
+
+        Устройство, чей прошлый запрос ещё не завершился, пропускается,
+        чтобы медленное устройство не копило очередь.
+        """
+        submitted = []
+        for serial in serials:
+            with self.lock:
+                if serial in self.in_flight:
+                    continue
+                self.in_flight.add(serial)
+            future = self.executor.submit(self.collect, serial)
+            future.add_done_callback(lambda f, s=serial: self._done(s, f, on_result))
+            submitted.append(future)
+        return submitted
+
+    def _done(self, serial, future, on_result):
+        with self.lock:
+            self.in_flight.discard(serial)
+        try:
+            result = future.result()
+        except Exception as e:
+            result = e
+        on_result(serial, result)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,56 @@
+"""Кэш статических свойств устройства (getprop) по серийному номеру и boot id"""
+import re
+import threading
+
+GETPROP_LINE = re.compile(r'^\[(.+?)\]: \[(.*)\]$')
+
+
+def parse_getprop(output):
+    """Разбор полного вывода `getprop` в словарь"""
+    props = {}
+    for line in (output or "").split('\n'):
+        match = GETPROP_LINE.match(line.strip())
+        if match:
+            props[match.group(1)] = match.group(2)
+    return props
+
+
+class PropertyCache:
+    """Свойства устройств, сбрасываются при отключении, смене серийника или перезагрузке"""
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, serial, boot_id):
+        """Свойства из кэша или None, если устройство перезагружалось"""
+        with self.lock:
+            entry = self.entries.get(serial)
+            if entry is None or entry['boot_id'] != boot_id:
+                return None
+            return entry['props']
+
+    def peek(self, serial):
+        """Свойства из кэша без проверки boot id"""
+        with self.lock:
+            entry = self.entries.get(serial)
+            return entry['props'] if entry else None
+
+    def store(self, serial, boot_id, props):
+        with self.lock:
+            self.entries[serial] = {'boot_id': boot_id, 'props': props}
+
+    def invalidate(self, serial=None):
+        """Сброс записи устройства (или всего кэша)"""
+        with self.lock:
+            if serial is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(serial, None)
+
+    def retain(self, serials):
+        """Оставляет в кэше только подключенные устройства"""
+        with self.lock:
+            for serial in list(self.entries):
+                if serial not in serials:
+                    del self.entries[serial]
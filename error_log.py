@@ -0,0 +1,143 @@
+"""Журнал ошибок в JSON Lines: повторы сворачиваются в счётчики за окно, запись в фоне с ротацией по размеру"""
+import json
+import os
+import platform
+import threading
+import time
+
+# Файл журнала по умолчанию (рядом с приложением, как раньше error-*.txt)
+DEFAULT_PATH = "adb_monitor_errors.jsonl"
+
+# Размер файла до ротации и число старых файлов (.1 - самый свежий)
+MAX_BYTES = 1024 * 1024
+BACKUPS = 3
+
+# Окно свёртки повторов, сек: первая ошибка пишется сразу, повторы - одной записью в конце окна
+WINDOW = 60.0
+
+# Как часто фоновый поток сбрасывает накопленное на диск, сек
+FLUSH_INTERVAL = 1.0
+
+# Разных сообщений за окно; остальные только считаются
+MAX_KEYS = 1000
+
+
+class ErrorLog:
+    """Журнал ошибок, запись которого почти ничего не стоит вызывающему потоку.
+
+    log() только обновляет счётчик под блокировкой; строки формирует и пишет
+    фоновый поток. Одинаковые сообщения внутри окна дают две записи: первую
+    (count=1) и итог повторов (count - сколько раз сообщение повторилось
+    после первой, first/last - время первого и последнего повтора).
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_bytes=MAX_BYTES, backups=BACKUPS, window=WINDOW,
+                 flush_interval=FLUSH_INTERVAL, max_keys=MAX_KEYS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.window = window
+        self.flush_interval = flush_interval
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        self.pending = []
+        self.repeats = {}
+        self.dropped = 0
+        self.window_start = time.time()
+        self.file = None
+        self.size = 0
+        self.write_lock = threading.Lock()
+        self.thread = None
+
+    def log(self, message):
+        now = time.time()
+        with self.lock:
+            entry = self.repeats.get(message)
+            if entry is not None:
+                if entry[0] == 0:
+                    entry[1] = now
+                entry[0] += 1
+                entry[2] = now
+            elif len(self.repeats) < self.max_keys:
+                self.repeats[message] = [0, now, now]
+                self.pending.append({'ts': round(now, 3), 'message': message, 'count': 1})
+            else:
+                self.dropped += 1
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+
+    def _collect(self, now, close_window):
+        """Записи к выводу; при закрытии окна - итоги повторов и пропущенных"""
+        with self.lock:
+            records = self.pending
+            self.pending = []
+            if close_window:
+                for message, (count, first, last) in self.repeats.items():
+                    if count:
+                        records.append({'ts': round(now, 3), 'message': message, 'count': count,
+                                        'first': round(first, 3), 'last': round(last, 3), 'repeated': True})
+                if self.dropped:
+                    records.append({'ts': round(now, 3), 'message': "другие ошибки (превышен лимит сообщений за окно)",
+                                    'count': self.dropped, 'repeated': True})
+                self.repeats = {}
+                self.dropped = 0
+                self.window_start = now
+        return records
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self, close_window=False):
+        now = time.time()
+        records = self._collect(now, close_window or now - self.window_start >= self.window)
+        if not records:
+            return
+        try:
+            with self.write_lock:
+                for record in records:
+                    self._write(json.dumps(record, ensure_ascii=False) + '\n')
+                self.file.flush()
+        except Exception as e:
+            print(f"Не удалось записать лог: {e}")
+
+    def _open(self):
+        self.file = open(self.path, 'a', encoding='utf-8', newline='')
+        self.size = self.file.tell()
+        if self.size == 0:
+            header = {'ts': round(time.time(), 3), 'event': 'start', 'platform': platform.system(),
+                      'python': platform.python_version(), 'pid': os.getpid()}
+            self.file.write(json.dumps(header) + '\n')
+            self.size = self.file.tell()
+
+    def _rotate(self):
+        self.file.close()
+        self.file = None
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def _write(self, text):
+        if self.file is None:
+            self._open()
+        data_size = len(text.encode('utf-8'))
+        if self.size + data_size > self.max_bytes and self.size > 0:
+            self._rotate()
+            self._open()
+        self.file.write(text)
+        self.size += data_size
+
+    def close(self):
+        """Сброс всего накопленного, включая незакрытое окно повторов"""
+        self.flush(close_window=True)
+        with self.write_lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
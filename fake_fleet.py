@@ -0,0 +1,413 @@
+"""Имитация парка устройств: ADB-сервер на TCP с N виртуальными устройствами для нагрузочных тестов.
+
+Сервер отвечает на запросы протокола ADB-сервера (host:devices, host:track-devices,
+host:transport, shell:, reboot:), поэтому подключается к монитору транспортом server:
+    python fake_fleet.py --devices 50 --port 5038
+    ANDROID_ADB_SERVER_PORT=5038 python ADB_Monitor.py --transport server
+Вывод команд строится моделью устройства, а не shell на компьютере: пакетный скрипт
+разбирается на метрики, и каждая секция генерируется из меняющегося состояния.
+"""
+import argparse
+import math
+import random
+import re
+import socketserver
+import sys
+import threading
+import time
+import uuid
+
+from adb_batch import METRICS, SECTION_PREFIX, SECTION_SUFFIX, parse_batch_metrics
+
+# Модели устройств: марка, модель, торговое название, производитель
+MODELS = [
+    ("Xiaomi", "2201116SG", "Redmi Note 11 Pro 5G", "Xiaomi"),
+    ("samsung", "SM-S911B", "Galaxy S23", "samsung"),
+    ("google", "Pixel 7", "", "Google"),
+    ("OnePlus", "CPH2449", "OnePlus 11", "OnePlus"),
+    ("POCO", "22101320G", "POCO X5 Pro 5G", "Xiaomi"),
+]
+
+# SDK и версия Android
+ANDROID_VERSIONS = [(29, "10"), (30, "11"), (31, "12"), (33, "13"), (34, "14")]
+
+# Имена процессов для /proc/[pid]/stat
+PROCESS_NAMES = ["init", "zygote64", "system_server", "surfaceflinger", "com.android.systemui",
+                 "com.google.android.gms", "logd", "servicemanager", "audioserver", "cameraserver",
+                 "com.android.phone", "com.android.launcher3", "kworker/u16:2", "ksoftirqd/0", "adbd",
+                 "media.codec", "com.whatsapp", "com.android.chrome", "netd", "vold"]
+
+# Тиков /proc/stat в секунду (USER_HZ)
+USER_HZ = 100
+
+# Обёртка, которую AdbServerClient.shell добавляет вокруг команды
+SHELL_WRAPPER = re.compile(r'^\{ (.*); \} 2>/dev/null$', re.S)
+
+
+class VirtualDevice:
+    """Состояние одного виртуального устройства; счётчики растут с реальным временем"""
+
+    def __init__(self, serial, seed=0):
+        self.serial = serial
+        self.rng = random.Random(f"{seed}:{serial}")
+        rng = self.rng
+        self.lock = threading.Lock()
+        self.state = "device"
+        self.offline_until = 0.0
+        self.brand, self.model, self.marketname, self.manufacturer = rng.choice(MODELS)
+        self.sdk, self.release = rng.choice(ANDROID_VERSIONS)
+        self.cores = rng.choice([4, 6, 8])
+        self.max_freqs = [rng.choice([1800000, 2000000]) if core < self.cores // 2 else
+                          rng.choice([2400000, 2850000, 3200000]) for core in range(self.cores)]
+        self.loads = [rng.uniform(0.05, 0.4) for _ in range(self.cores)]
+        # user, nice, system, idle, iowait, irq, softirq на ядро
+        self.core_counters = [[rng.randint(10000, 50000), 0, rng.randint(5000, 20000), rng.randint(100000, 900000),
+                               rng.randint(100, 2000), 0, rng.randint(10, 500)] for _ in range(self.cores)]
+        self.mem_total_mb = rng.choice([3800, 5800, 7700, 11600])
+        self.mem_used = rng.uniform(0.4, 0.7)
+        self.battery_level = rng.uniform(30, 100)
+        self.battery_temp = rng.uniform(27, 34)
+        self.storage_total_kb = rng.choice([53000000, 110000000, 230000000])
+        self.storage_used_kb = int(self.storage_total_kb * rng.uniform(0.2, 0.8))
+        self.disk = [rng.randint(10000, 90000), rng.randint(10 ** 6, 10 ** 7),
+                     rng.randint(10000, 90000), rng.randint(10 ** 6, 10 ** 7)]
+        self.net = [rng.randint(10 ** 7, 10 ** 9), rng.randint(10 ** 6, 10 ** 8)]
+        self.refresh_rate = rng.choice([60.0, 90.0, 120.0])
+        self.width, self.height = rng.choice([(1080, 2400), (1440, 3200), (1080, 2340)])
+        self.boot_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        self.processes = [[pid, name, rng.randint(0, 5000), rng.randint(0, 100000), rng.randint(500, 60000),
+                           rng.uniform(0, 0.05)]
+                          for pid, name in zip(sorted(rng.sample(range(1, 30000), len(PROCESS_NAMES))), PROCESS_NAMES)]
+        self.last_update = time.monotonic()
+
+    def advance(self):
+        """Рост счётчиков за прошедшее время: загрузка ядер - случайное блуждание с возвратом к среднему"""
+        now = time.monotonic()
+        dt = now - self.last_update
+        if dt <= 0:
+            return
+        self.last_update = now
+        rng = self.rng
+        step = math.sqrt(dt)
+        burst = rng.random() < 0.02 * dt
+        for core in range(self.cores):
+            load = self.loads[core] + rng.gauss(0, 0.08) * step + (0.25 - self.loads[core]) * min(dt * 0.2, 1)
+            if burst:
+                load += rng.uniform(0.3, 0.6)
+            load = self.loads[core] = min(max(load, 0.01), 1.0)
+            ticks = USER_HZ * dt
+            counters = self.core_counters[core]
+            counters[0] += int(ticks * load * 0.7 + rng.random())
+            counters[2] += int(ticks * load * 0.25 + rng.random())
+            counters[6] += int(ticks * load * 0.05 + rng.random())
+            counters[3] += int(ticks * (1 - load) + rng.random())
+            counters[4] += int(ticks * 0.01 + rng.random() * 0.5)
+        busy = sum(self.loads) / self.cores
+        self.mem_used = min(max(self.mem_used + rng.gauss(0, 0.01) * step, 0.25), 0.97)
+        self.battery_level = max(self.battery_level - dt * (0.0005 + busy * 0.003), 1.0)
+        self.battery_temp += ((27 + busy * 20) - self.battery_temp) * min(dt * 0.05, 1) + rng.gauss(0, 0.05) * step
+        self.disk[0] += int(dt * rng.uniform(0, 50))
+        self.disk[1] += int(dt * rng.uniform(0, 8000))
+        self.disk[2] += int(dt * rng.uniform(0, 30))
+        self.disk[3] += int(dt * rng.uniform(0, 4000))
+        self.net[0] += int(dt * rng.expovariate(1 / 50000.0))
+        self.net[1] += int(dt * rng.expovariate(1 / 10000.0))
+        for process in self.processes:
+            process[2] += int(USER_HZ * dt * process[5] * self.cores + rng.random())
+
+    def counters_line(self, name, counters):
+        return f"{name} " + " ".join(str(value) for value in counters) + " 0 0 0"
+
+    def total_counters(self):
+        return [sum(core[i] for core in self.core_counters) for i in range(7)]
+
+    def section(self, name):
+        """Вывод команды метрики пакетного скрипта"""
+        if name == 'cpu':
+            return self.counters_line("cpu ", self.total_counters())
+        if name == 'cpu_cores':
+            lines = [self.counters_line(f"cpu{core}", counters) for core, counters in enumerate(self.core_counters)]
+            for core in range(self.cores):
+                cur = int(self.max_freqs[core] * (0.3 + 0.7 * self.loads[core])) // 1000 * 1000
+                lines.append(f"freq {core} {cur} {self.max_freqs[core]}")
+            return '\n'.join(lines)
+        if name == 'ram':
+            used = int(self.mem_total_mb * self.mem_used)
+            free = int((self.mem_total_mb - used) * 0.2)
+            cache = self.mem_total_mb - used - free
+            return ("               total        used        free      shared     buffers\n"
+                    f"Mem:           {self.mem_total_mb}        {used}        {free}          12        {cache}\n"
+                    "-/+ buffers/cache:\n"
+                    "Swap:           2047         310        1737")
+        if name == 'diskstats':
+            reads, read_sectors, writes, write_sectors = self.disk
+            return (f" 259       0 sda {reads} 120 {read_sectors} 9300 {writes} 800 {write_sectors} 21000 0 14000 30300\n"
+                    f" 259       1 sda1 {reads // 3} 10 {read_sectors // 3} 3000 {writes // 3} 80 {write_sectors // 3} 7000 0 5000 10000")
+        if name == 'netdev':
+            rx, tx = self.net
+            return ("Inter-|   Receive                                                |  Transmit\n"
+                    " face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n"
+                    "    lo:  123456     800    0    0    0     0          0         0   123456     800    0    0    0     0       0          0\n"
+                    f" wlan0: {rx} {rx // 1200} 0 0 0 0 0 0 {tx} {tx // 900} 0 0 0 0 0 0")
+        if name == 'storage':
+            free = self.storage_total_kb - self.storage_used_kb
+            percent = 100 * self.storage_used_kb // self.storage_total_kb
+            return f"/dev/block/dm-8  {self.storage_total_kb} {self.storage_used_kb} {free} {percent}% /data"
+        if name == 'battery':
+            return ("Current Battery Service state:\n  AC powered: false\n  USB powered: true\n"
+                    "  Wireless powered: false\n  status: 2\n  health: 2\n  present: true\n"
+                    f"  level: {int(self.battery_level)}\n  scale: 100\n  voltage: {3600 + int(self.battery_level * 6)}\n"
+                    f"  temperature: {int(self.battery_temp * 10)}\n  technology: Li-ion")
+        if name == 'display_size':
+            return f"Physical size: {self.width}x{self.height}"
+        if name == 'peak_refresh_rate':
+            return f"{self.refresh_rate:.1f}"
+        if name == 'miui_refresh_rate':
+            return "null" if self.brand not in ("Xiaomi", "POCO") else f"{int(self.refresh_rate)}"
+        if name == 'display_mode':
+            return (f"  mActiveSfDisplayMode=DisplayMode{{id=0, width={self.width}, height={self.height}, "
+                    f"xDpi=400.0, yDpi=400.0, refreshRate={self.refresh_rate:.1f}, appVsyncOffsetNanos=0}}")
+        if name == 'boot_id':
+            return self.boot_id
+        if name == 'processes':
+            lines = ["P 4096", self.counters_line("T", self.total_counters())]
+            for pid, name_, ticks, start, rss, _ in self.processes:
+                lines.append(f"{pid} ({name_}) S 1 {pid} 0 0 -1 4194560 500 0 0 0 {ticks * 2 // 3} {ticks // 3} "
+                             f"0 0 20 0 12 0 {start} {rss * 4096 * 3} {rss} {rss}")
+            return '\n'.join(lines)
+        if name == 'getprop':
+            return self.getprop()
+        return ""
+
+    def getprop(self):
+        props = {
+            'ro.product.brand': self.brand,
+            'ro.product.model': self.model,
+            'ro.product.marketname': self.marketname,
+            'ro.product.manufacturer': self.manufacturer,
+            'ro.build.version.sdk': str(self.sdk),
+            'ro.build.version.release': self.release,
+            'ro.boot.flash.locked': '1',
+            'ro.boot.verifiedbootstate': 'green',
+            'ro.serialno': self.serial,
+        }
+        return '\n'.join(f"[{key}]: [{value}]" for key, value in props.items())
+
+    def shell(self, cmd):
+        """Вывод shell-команды: пакетный скрипт по секциям, известные команды метрик - целиком"""
+        with self.lock:
+            self.advance()
+            metrics = parse_batch_metrics(cmd)
+            if metrics:
+                return '\n'.join(f"{SECTION_PREFIX}{name}{SECTION_SUFFIX}\n{self.section(name)}" for name in metrics)
+            match = SHELL_WRAPPER.match(cmd)
+            cmd = (match.group(1) if match else cmd).strip()
+            for name, spec in METRICS.items():
+                if spec['command'] == cmd:
+                    return self.section(name)
+            return ""
+
+
+class Fleet:
+    """Виртуальные устройства, их подключение и параметры задержек и сбоев"""
+
+    def __init__(self, count, seed=0, latency_ms=10.0, jitter_ms=5.0, fail_rate=0.0, drop_rate=0.0,
+                 hang_rate=0.0, hang_seconds=30.0, flap_rate=0.0, flap_seconds=5.0):
+        self.devices = {}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.fail_rate = fail_rate
+        self.drop_rate = drop_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.flap_rate = flap_rate
+        self.flap_seconds = flap_seconds
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.changed = threading.Condition()
+        self.version = 0
+        for index in range(count):
+            serial = f"FLEET{index + 1:04d}"
+            self.devices[serial] = VirtualDevice(serial, seed)
+
+    def random(self):
+        with self.rng_lock:
+            return self.rng.random()
+
+    def delay(self):
+        with self.rng_lock:
+            jitter = self.rng.expovariate(1.0 / self.jitter_ms) if self.jitter_ms > 0 else 0.0
+        return (self.latency_ms + jitter) / 1000.0
+
+    def device_list(self):
+        return ''.join(f"{serial}\t{device.state}\n" for serial, device in self.devices.items())
+
+    def notify(self):
+        with self.changed:
+            self.version += 1
+            self.changed.notify_all()
+
+    def tick(self, dt):
+        """Отключение и возврат устройств (flap_rate - вероятность отключения в секунду)"""
+        now = time.monotonic()
+        changed = False
+        for device in self.devices.values():
+            if device.state == "offline" and now >= device.offline_until:
+                device.state = "device"
+                changed = True
+            elif device.state == "device" and self.flap_rate and self.random() < self.flap_rate * dt:
+                device.state = "offline"
+                device.offline_until = now + self.flap_seconds
+                changed = True
+        if changed:
+            self.notify()
+
+    def run_ticker(self, interval=0.5):
+        while True:
+            time.sleep(interval)
+            self.tick(interval)
+
+
+def encode_block(text):
+    data = text.encode('utf-8')
+    return f"{len(data):04x}".encode('ascii') + data
+
+
+class FleetRequestHandler(socketserver.BaseRequestHandler):
+    """Одно соединение клиента ADB-сервера"""
+
+    def read_exact(self, size):
+        data = b''
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("closed")
+            data += chunk
+        return data
+
+    def read_request(self):
+        length = int(self.read_exact(4), 16)
+        return self.read_exact(length).decode('utf-8', errors='ignore')
+
+    def fail(self, message):
+        self.request.sendall(b'FAIL' + encode_block(message))
+
+    def handle(self):
+        fleet = self.server.fleet
+        try:
+            payload = self.read_request()
+            if payload == 'host:version':
+                self.request.sendall(b'OKAY' + encode_block("0029"))
+            elif payload in ('host:devices', 'host:devices-l'):
+                self.request.sendall(b'OKAY' + encode_block(fleet.device_list()))
+            elif payload == 'host:track-devices':
+                self.track_devices(fleet)
+            elif payload.startswith('host:transport'):
+                self.transport(fleet, payload)
+            else:
+                self.fail(f"unknown host service '{payload}'")
+        except (ConnectionError, OSError, ValueError):
+            pass
+
+    def track_devices(self, fleet):
+        self.request.sendall(b'OKAY')
+        version = None
+        while True:
+            with fleet.changed:
+                while version == fleet.version:
+                    fleet.changed.wait()
+                version = fleet.version
+            self.request.sendall(encode_block(fleet.device_list()))
+
+    def transport(self, fleet, payload):
+        if payload == 'host:transport-any':
+            device = next((d for d in fleet.devices.values() if d.state == "device"), None)
+            if device is None:
+                self.fail("no devices/emulators found")
+                return
+        else:
+            serial = payload[len('host:transport:'):]
+            device = fleet.devices.get(serial)
+            if device is None:
+                self.fail(f"device '{serial}' not found")
+                return
+        if device.state != "device" or fleet.random() < fleet.fail_rate:
+            self.fail("device offline")
+            return
+        self.request.sendall(b'OKAY')
+        service = self.read_request()
+
+        # Сбои: соединение обрывается или устройство "зависает" дольше таймаута клиента
+        if fleet.random() < fleet.drop_rate:
+            return
+        if fleet.random() < fleet.hang_rate:
+            time.sleep(fleet.hang_seconds)
+            return
+        time.sleep(fleet.delay())
+
+        if service.startswith('shell:'):
+            output = device.shell(service[len('shell:'):])
+            self.request.sendall(b'OKAY' + (output + '\n').encode('utf-8'))
+        elif service.startswith('reboot:'):
+            self.request.sendall(b'OKAY')
+            device.state = "offline"
+            device.offline_until = time.monotonic() + fleet.flap_seconds
+            device.boot_id = str(uuid.uuid4())
+            fleet.notify()
+        else:
+            self.fail(f"unknown service '{service}'")
+
+
+class FleetServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    def __init__(self, fleet, host="127.0.0.1", port=0):
+        self.fleet = fleet
+        super().__init__((host, port), FleetRequestHandler)
+
+
+def start_fleet_server(fleet, host="127.0.0.1", port=0):
+    """Запуск сервера в фоновом потоке; (server, фактический порт)"""
+    server = FleetServer(fleet, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True, name="fleet-server").start()
+    threading.Thread(target=fleet.run_ticker, daemon=True, name="fleet-ticker").start()
+    return server, server.server_address[1]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Имитация ADB-сервера с парком виртуальных устройств")
+    parser.add_argument('--devices', type=int, default=10, help="число виртуальных устройств")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=5038, help="порт сервера, 0 - любой свободный")
+    parser.add_argument('--seed', type=int, default=0, help="зерно генератора для повторяемых моделей устройств")
+    parser.add_argument('--latency-ms', type=float, default=10.0, help="задержка ответа на команду, мс")
+    parser.add_argument('--jitter-ms', type=float, default=5.0, help="средний разброс задержки (экспоненциальный), мс")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="доля запросов с ответом FAIL (device offline)")
+    parser.add_argument('--drop-rate', type=float, default=0.0, help="доля команд с обрывом соединения без ответа")
+    parser.add_argument('--hang-rate', type=float, default=0.0, help="доля команд, зависающих на --hang-seconds")
+    parser.add_argument('--hang-seconds', type=float, default=30.0)
+    parser.add_argument('--flap-rate', type=float, default=0.0,
+                        help="вероятность отключения устройства в секунду (переподключение через --flap-seconds)")
+    parser.add_argument('--flap-seconds', type=float, default=5.0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    fleet = Fleet(args.devices, args.seed, args.latency_ms, args.jitter_ms, args.fail_rate, args.drop_rate,
+                  args.hang_rate, args.hang_seconds, args.flap_rate, args.flap_seconds)
+    server, port = start_fleet_server(fleet, args.host, args.port)
+    # Первая строка вывода - порт: по ней нагрузочный тест понимает, что сервер готов
+    print(f"PORT {port}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
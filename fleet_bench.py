@@ -0,0 +1,171 @@
+"""Нагрузочный тест опроса: растущий парк виртуальных устройств, CPU и память компьютера, фактическая частота выборок"""
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import collectors
+from collectors import list_device_states, forget_devices, collect_sample, start_device_tracker, wait_next_tick
+from adb_protocol import AdbServerClient
+from device_pool import DevicePoller
+from stats import percentile
+
+# Формат файла результатов; увеличивается при несовместимых изменениях
+RESULTS_FORMAT = 1
+
+# Размеры парка по умолчанию
+DEFAULT_SIZES = [1, 5, 10, 25, 50]
+
+# Начало каждого шага не учитывается: первые опросы читают getprop и заполняют кэши
+WARMUP_SECONDS = 3.0
+
+FLEET_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_fleet.py")
+
+
+def current_rss_mb():
+    """Занятая процессом память (RSS) в МБ; None, если узнать нельзя"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        # Пиковое значение: в Linux в КБ, в macOS в байтах
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        return None
+
+
+def start_fleet(devices, server_args=()):
+    """Сервер fake_fleet.py отдельным процессом, чтобы его CPU не попадал в замер; (процесс, порт)"""
+    process = subprocess.Popen([sys.executable, FLEET_SCRIPT, '--devices', str(devices), '--port', '0',
+                                *server_args], stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith('PORT '):
+        process.kill()
+        raise RuntimeError("Сервер виртуальных устройств не запустился")
+    return process, int(line.split()[1])
+
+
+def run_step(devices, seconds, interval, server_args=()):
+    """Опрос парка из devices устройств в течение seconds секунд"""
+    process, port = start_fleet(devices, server_args)
+    collectors.adb_transport = 'server'
+    collectors.server_client = AdbServerClient(port=port)
+    tracker = start_device_tracker()
+    poller = DevicePoller(collect_sample)
+    counts = {'samples': 0, 'errors': 0}
+    latencies = []
+    measuring = [False]
+
+    def timed_collect(serial):
+        started = time.perf_counter()
+        sample = collect_sample(serial)
+        if sample is not None and measuring[0]:
+            latencies.append((time.perf_counter() - started) * 1000)
+        return sample
+
+    def on_sample(serial, sample):
+        if not measuring[0] or sample is None:
+            return
+        if isinstance(sample, Exception) or 'error' in sample:
+            counts['errors'] += 1
+        else:
+            counts['samples'] += 1
+
+    poller.collect = timed_collect
+    online = []
+    try:
+        started = time.monotonic()
+        measure_from = started + min(WARMUP_SECONDS, seconds / 4)
+        cpu_start = wall_start = None
+        while time.monotonic() < started + seconds:
+            if not measuring[0] and time.monotonic() >= measure_from:
+                measuring[0] = True
+                cpu_start = time.process_time()
+                wall_start = time.monotonic()
+            states = list_device_states()
+            online = [serial for serial, state in states.items() if state == "device"]
+            forget_devices(online)
+            if online:
+                poller.poll(online, on_sample)
+            wait_next_tick(bool(online), idle_timeout=interval)
+        # Один тик мог перешагнуть и начало замера, и конец шага: тогда замера нет
+        wall = time.monotonic() - wall_start if wall_start is not None else 0.0
+        cpu = time.process_time() - cpu_start if cpu_start is not None else 0.0
+    finally:
+        tracker.stop()
+        poller.shutdown()
+        process.kill()
+        process.wait()
+        forget_devices([])
+
+    ordered = sorted(latencies)
+    rss = current_rss_mb()
+    if wall <= 0:
+        return {
+            'devices': devices,
+            'online': len(online),
+            'seconds': 0.0,
+            'error': "нет окна замера: шаг закончился раньше, чем прогрев",
+            'rss_mb': round(rss, 1) if rss is not None else None,
+        }
+    return {
+        'devices': devices,
+        'online': len(online),
+        'seconds': round(wall, 2),
+        'samples': counts['samples'],
+        'errors': counts['errors'],
+        'samples_per_s': round(counts['samples'] / wall, 2),
+        'per_device_hz': round(counts['samples'] / wall / devices, 3),
+        'target_hz': round(1 / interval, 3),
+        'cpu_percent': round(100 * cpu / wall, 1),
+        'rss_mb': round(rss, 1) if rss is not None else None,
+        'poll_p50_ms': round(percentile(ordered, 50), 2) if ordered else None,
+        'poll_p95_ms': round(percentile(ordered, 95), 2) if ordered else None,
+    }
+
+
+def format_step(step):
+    if 'error' in step:
+        return f"📱 {step['devices']:>4} устр. | ❌ {step['error']}"
+    rss = f"{step['rss_mb']:.0f} МБ" if step['rss_mb'] is not None else "-"
+    return (f"📱 {step['devices']:>4} устр. | {step['samples_per_s']:>7.1f} выб/с "
+            f"({step['per_device_hz']:.2f} из {step['target_hz']:.2f} Гц на устр.) | "
+            f"CPU {step['cpu_percent']:>5.1f}% | RSS {rss} | ошибок {step['errors']} | "
+            f"опрос p50 {step['poll_p50_ms']} / p95 {step['poll_p95_ms']} мс")
+
+
+def run_fleet_bench(out=None, sizes=None, seconds=20, interval=0.5, server_args=()):
+    """Шаги с растущим числом виртуальных устройств; отчёт JSON в out, таблица - в stderr"""
+    collectors.poll_interval = interval
+    report = {
+        'format': RESULTS_FORMAT,
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'host': platform.node(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'interval': interval,
+        'step_seconds': seconds,
+        'server_args': list(server_args),
+        'steps': [],
+    }
+    for devices in sizes or DEFAULT_SIZES:
+        print(f"🔄 Парк из {devices} устройств, {seconds} с", file=sys.stderr)
+        step = run_step(devices, seconds, interval, server_args)
+        report['steps'].append(step)
+        print(format_step(step), file=sys.stderr)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if out in (None, '-'):
+        print(text)
+    else:
+        with open(out, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    return report
@@ -0,0 +1,261 @@
+"""Время кадров приложения: gfxinfo framestats или SurfaceFlinger --latency, FPS, перцентили и jank"""
+import re
+import threading
+import time
+from array import array
+
+from stats import percentile
+
+# Время кадров и метки SurfaceFlinger приходят в наносекундах
+NS_PER_MS = 1000000.0
+NS_PER_S = 1000000000.0
+
+# Метка ещё не показанного кадра в выводе --latency
+PENDING_FENCE = (1 << 63) - 1
+
+# Граница секции framestats в выводе gfxinfo
+PROFILEDATA = "---PROFILEDATA---"
+
+# Пауза между кадрами длиннее этой считается простоем приложения, а не рывком
+IDLE_GAP_MS = 250
+
+# Кадров в истории
+FRAME_HISTORY = 4096
+
+# Окно для FPS и перцентилей, сек
+SUMMARY_WINDOW = 5.0
+
+FOCUS_LINE = re.compile(r'mCurrentFocus=Window\{\S+ \S+ ([^/\s}]+)')
+
+
+def parse_focused_package(output):
+    """Пакет окна в фокусе из `dumpsys window`"""
+    match = FOCUS_LINE.search(output or "")
+    return match.group(1) if match else None
+
+
+def parse_latency_period(output):
+    """Период обновления в нс из первой строки `dumpsys SurfaceFlinger --latency`"""
+    for line in (output or "").split('\n'):
+        line = line.strip()
+        if line:
+            return int(line) if line.isdigit() and int(line) > 0 else None
+    return None
+
+
+def parse_sf_latency(output):
+    """(период в нс, [(время показа, длительность кадра) в нс]) из `--latency <слой>`.
+
+    Строки: желаемое время показа, фактическое время показа, готовность кадра.
+    Длительность кадра - интервал между фактическими показами соседних кадров.
+    """
+    lines = (output or "").split('\n')
+    period = parse_latency_period(output)
+    presents = []
+    for line in lines[1:]:
+        parts = line.split()
+        if len(parts) != 3:
+            continue
+        try:
+            actual = int(parts[1])
+        except ValueError:
+            continue
+        if 0 < actual < PENDING_FENCE:
+            presents.append(actual)
+    presents.sort()
+    frames = [(end, end - start) for start, end in zip(presents, presents[1:]) if end > start]
+    return period, frames
+
+
+def parse_gfxinfo_framestats(output):
+    """[(время завершения, длительность кадра) в нс] из `dumpsys gfxinfo <пакет> framestats`.
+
+    Длительность - от IntendedVsync до FrameCompleted; кадры с ненулевыми
+    Flags (первый кадр окна, пропущенные) не учитываются, как и в самом gfxinfo.
+    """
+    frames = []
+    columns = None
+    inside = False
+    for line in (output or "").split('\n'):
+        line = line.strip()
+        if line == PROFILEDATA:
+            inside = not inside
+            columns = None
+            continue
+        if not inside or not line:
+            continue
+        parts = line.rstrip(',').split(',')
+        if parts[0] == 'Flags':
+            columns = {name: index for index, name in enumerate(parts)}
+            continue
+        if columns is None or 'IntendedVsync' not in columns or 'FrameCompleted' not in columns:
+            continue
+        try:
+            if int(parts[columns['Flags']]) != 0:
+                continue
+            start = int(parts[columns['IntendedVsync']])
+            end = int(parts[columns['FrameCompleted']])
+        except (ValueError, IndexError):
+            continue
+        if end > start:
+            frames.append((end, end - start))
+    return frames
+
+
+def pick_layer(layers_output, package):
+    """Слой приложения из `dumpsys SurfaceFlinger --list`: SurfaceView (игры, видео) или окно активности"""
+    candidates = [line.strip() for line in (layers_output or "").split('\n') if package and package in line]
+    for prefix in ('SurfaceView', ''):
+        for layer in candidates:
+            if layer.startswith(prefix) and 'Background' not in layer:
+                return layer
+    return None
+
+
+class FrameStats:
+    """Кольцевая история кадров: время завершения (нс) и длительность (мс) в колонках array"""
+
+    def __init__(self, size=FRAME_HISTORY):
+        self.size = size
+        self.ends = array('q', [0]) * size
+        self.durations = array('d', [0.0]) * size
+        self.count = 0
+        self.last_end = 0
+        self.period_ms = None
+
+    def add_frames(self, frames):
+        """Новые кадры (уже виденные отбрасываются по времени завершения); число добавленных"""
+        added = 0
+        for end, duration in sorted(frames):
+            if end <= self.last_end:
+                continue
+            slot = self.count % self.size
+            self.ends[slot] = end
+            self.durations[slot] = duration / NS_PER_MS
+            self.count += 1
+            self.last_end = end
+            added += 1
+        return added
+
+    def recent(self, window=SUMMARY_WINDOW):
+        """(времена завершения, длительности в мс) кадров за последние window секунд"""
+        n = min(self.count, self.size)
+        if not n:
+            return [], []
+        since = self.last_end - window * NS_PER_S
+        ends = []
+        durations = []
+        for i in range(self.count - n, self.count):
+            slot = i % self.size
+            if self.ends[slot] >= since:
+                ends.append(self.ends[slot])
+                durations.append(self.durations[slot])
+        return ends, durations
+
+    def summary(self, window=SUMMARY_WINDOW):
+        """FPS, перцентили времени кадра и число рывков за окно"""
+        ends, durations = self.recent(window)
+        result = {'frames': len(durations), 'period_ms': self.period_ms}
+        if len(ends) < 2:
+            return result
+        span = (ends[-1] - ends[0]) / NS_PER_S
+        result['fps'] = (len(ends) - 1) / span if span > 0 else None
+        ordered = sorted(durations)
+        for q in (50, 90, 95, 99):
+            result[f'p{q}_ms'] = percentile(ordered, q)
+        result['max_ms'] = ordered[-1]
+        # Рывок - кадр дольше полутора периодов (пропущен хотя бы один vsync),
+        # сильный рывок - дольше трёх; паузы простоя не считаются
+        period = self.period_ms or 1000.0 / 60
+        busy = [d for d in durations if d <= IDLE_GAP_MS]
+        result['jank'] = sum(1 for d in busy if d > period * 1.5)
+        result['big_jank'] = sum(1 for d in busy if d > period * 3)
+        result['jank_percent'] = 100.0 * result['jank'] / len(busy) if busy else 0.0
+        return result
+
+
+class FrameMonitor:
+    """Периодический сбор кадров приложения в фоне.
+
+    run_shell(cmd, timeout) возвращает (output, error), как adb_command;
+    source - 'gfxinfo' (приложения на HWUI) или 'surfaceflinger' (любой слой,
+    в том числе игры и SurfaceView). package=None - приложение в фокусе.
+    """
+
+    def __init__(self, run_shell, source='gfxinfo', package=None, interval=1.0, on_update=None):
+        self.run_shell = run_shell
+        self.source = source
+        self.package = package
+        self.interval = interval
+        self.on_update = on_update
+        self.stats = FrameStats()
+        self.current_package = None
+        self.layer = None
+        self.error = None
+        self.running = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.running.set()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running.clear()
+
+    def is_running(self):
+        return self.running.is_set()
+
+    def resolve_package(self):
+        if self.package:
+            return self.package
+        output, error = self.run_shell("dumpsys window | grep mCurrentFocus", 5)
+        return None if error else parse_focused_package(output)
+
+    def poll(self):
+        """Один проход сбора; (новых кадров, ошибка)"""
+        package = self.resolve_package()
+        if not package:
+            return 0, "❌ Нет приложения в фокусе"
+        if package != self.current_package:
+            # Другое приложение: история начинается заново
+            self.current_package = package
+            self.layer = None
+            self.stats = FrameStats()
+
+        if self.source == 'surfaceflinger':
+            if self.layer is None:
+                output, error = self.run_shell("dumpsys SurfaceFlinger --list", 5)
+                if error:
+                    return 0, error
+                self.layer = pick_layer(output, package)
+                if self.layer is None:
+                    return 0, f"❌ Слой {package} не найден"
+            output, error = self.run_shell(f"dumpsys SurfaceFlinger --latency '{self.layer}'", 5)
+            if error:
+                return 0, error
+            period, frames = parse_sf_latency(output)
+            if not frames:
+                # Слой мог смениться (новая активность): ищем заново
+                self.layer = None
+        else:
+            output, error = self.run_shell(f"dumpsys SurfaceFlinger --latency; dumpsys gfxinfo {package} framestats", 5)
+            if error:
+                return 0, error
+            period = parse_latency_period(output)
+            frames = parse_gfxinfo_framestats(output)
+        if period:
+            self.stats.period_ms = period / NS_PER_MS
+        return self.stats.add_frames(frames), None
+
+    def _run(self):
+        while self.running.is_set():
+            started = time.monotonic()
+            try:
+                added, self.error = self.poll()
+            except Exception as e:
+                added, self.error = 0, f"❌ Ошибка: {str(e)}"
+            if self.on_update:
+                self.on_update(self, added)
+            time.sleep(max(0.0, self.interval - (time.monotonic() - started)))
@@ -0,0 +1,875 @@
+"""Графический интерфейс Android Diagnostic Board"""
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import threading
+import time
+import collections
+
+import collectors
+from collectors import (adb_command, log_error, list_device_states, forget_devices, get_device_state,
+                        poll_device, start_device_tracker, wait_next_tick, device_state_stats,
+                        metric_history, DEVICE_STATE_LABELS, device_stats, start_fast_sampler,
+                        stop_fast_sampler, is_fast_sampling, start_frame_monitor, start_power_profiler,
+                        stop_power_profiler, start_logcat_reader, stop_logcat_reader, stop_frame_monitor)
+from device_pool import DevicePoller
+from scheduler import format_rate_report
+from ui_updates import UiUpdates, WidgetCache, FRAME_MS
+from charts import Sparkline, CoreHeatmap
+from benchmark import DeviceBenchmark, BenchmarkCancelled
+from power import format_power_summary
+from alerts import format_active_alerts
+from logcat import LogBuffer, LogFilter, FilteredView, LEVELS, TIME, PID, TID, LEVEL, TAG, MESSAGE
+
+# Текущий бенчмарк на устройстве (None, если не запущен) и его результаты
+current_benchmark = None
+benchmark_results = {}
+
+# Устройство, на котором запущен высокочастотный сэмплер
+fast_serial = None
+
+# Logcat выбранного устройства: буфер, выборка под фильтр и первая видимая строка
+logcat_buffer = LogBuffer()
+logcat_view = FilteredView(logcat_buffer)
+logcat_reader = None
+logcat_offset = 0
+logcat_follow = True
+
+# Сбор кадров приложения (None, если остановлен)
+frame_monitor = None
+frame_serial = None
+
+# События оповещений от движка правил, ещё не показанные в таблице
+pending_alert_events = collections.deque()
+
+# Строк в таблице оповещений
+ALERT_ROWS = 500
+
+# Профилировщик питания: работающий или последний остановленный (его сессию можно выгрузить)
+power_profiler = None
+
+# Строк в окне logcat: отрисовываются только они
+LOGCAT_ROWS = 30
+
+# Обновления интерфейса из фоновых потоков применяются в главном потоке Tk
+ui_updates = UiUpdates(on_error=lambda key, e: log_error(f"UI update error ({key}): {str(e)}"))
+widget_cache = WidgetCache()
+
+def reboot_device():
+    """Перезагрузка устройства"""
+    result = messagebox.askyesno("Перезагрузка", "Вы уверены что хотите перезагрузить устройство?")
+    if result:
+        output, error = adb_command("reboot", serial=collectors.current_serial)
+        if error:
+            messagebox.showerror("Ошибка", f"Не удалось перезагрузить: {error}")
+        else:
+            messagebox.showinfo("Успех", "Устройство перезагружается...")
+
+def shutdown_device():
+    """Выключение устройства"""
+    result = messagebox.askyesno("Выключение", "Вы уверены что хотите выключить устройство?")
+    if result:
+        output, error = adb_command("shell reboot -p", serial=collectors.current_serial)
+        if error:
+            messagebox.showerror("Ошибка", f"Не удалось выключить: {error}")
+        else:
+            messagebox.showinfo("Успех", "Устройство выключается...")
+
+def run_benchmark():
+    """Запуск бенчмарка на выбранном устройстве"""
+    global current_benchmark, benchmark_results
+    
+    if current_benchmark is not None:
+        return
+    
+    adb_path = collectors.get_adb_path()
+    if not adb_path:
+        messagebox.showerror("Ошибка", "ADB не найден")
+        return
+    
+    bench = DeviceBenchmark(adb_path, collectors.current_serial, on_progress=show_benchmark_progress)
+    current_benchmark = bench
+    benchmark_results = {}
+    
+    def benchmark_thread():
+        global current_benchmark, benchmark_results
+        status = "✅ Тест завершен"
+        try:
+            benchmark_results = bench.run()
+        except BenchmarkCancelled:
+            status = "⏹️ Тест остановлен"
+        except Exception as e:
+            log_error(f"Benchmark error: {str(e)}")
+            status = f"❌ Ошибка теста: {str(e)}"
+        finally:
+            current_benchmark = None
+        
+        # Обновляем интерфейс в основном потоке
+        ui_updates.post('benchmark', update_benchmark_results, status)
+    
+    threading.Thread(target=benchmark_thread, daemon=True).start()
+    benchmark_status_label.config(text="🔄 Тест выполняется...")
+
+def stop_benchmark():
+    """Остановка бенчмарка вместе с процессами на устройстве"""
+    bench = current_benchmark
+    if bench is None:
+        return
+    benchmark_status_label.config(text="⏹️ Остановка теста...")
+    threading.Thread(target=bench.stop, daemon=True).start()
+
+def show_benchmark_progress(text, fraction):
+    """Ход теста из потока бенчмарка"""
+    ui_updates.post('benchmark_progress', set_label_text, benchmark_status_label,
+                    f"{text} ({fraction * 100:.0f}%)")
+
+def update_benchmark_results(status):
+    """Обновление результатов бенчмарка"""
+    # Статус мог быть обновлён прогрессом в этом же кадре
+    ui_updates.post('benchmark_progress', set_label_text, benchmark_status_label, status)
+    if not benchmark_results:
+        return
+    
+    lines = ["⚡ РЕЗУЛЬТАТЫ БЕНЧМАРКА (медиана, p10-p90):", ""]
+    for name, result in benchmark_results.items():
+        lines.append(f"• {result['label']}: {result['median']:.1f} {result['unit']} "
+                     f"({result['p10']:.1f}-{result['p90']:.1f})")
+    cpu = benchmark_results.get('cpu_single')
+    if cpu:
+        lines += ["", "💡 Оценка:", get_performance_rating(cpu['median'])]
+    benchmark_result_label.config(text="\n".join(lines))
+
+def get_performance_rating(score):
+    """Оценка производительности по скорости md5 на одном ядре, МБ/с"""
+    if score > 500:
+        return "🚀 Отличная производительность!"
+    elif score > 300:
+        return "👍 Хорошая производительность"
+    elif score > 150:
+        return "⚠️ Средняя производительность"
+    else:
+        return "🐌 Низкая производительность"
+
+def set_label_text(label, text):
+    """Смена текста метки, только если он изменился"""
+    if widget_cache.changed(str(label), text):
+        label.config(text=text)
+
+def show_main_stats(stats):
+    """Вывод показателей выбранного устройства на основную вкладку"""
+    phone, version, bootloader, cpu, ram, storage, battery, display = stats
+    set_label_text(phone_label, phone)
+    set_label_text(version_label, version)
+    set_label_text(bootloader_label, bootloader)
+    set_label_text(cpu_label, cpu)
+    set_label_text(ram_label, ram)
+    set_label_text(storage_label, storage)
+    set_label_text(battery_label, battery)
+    set_label_text(display_label, display)
+
+def set_device_row(serial, values):
+    """Смена строки таблицы устройств, только если она изменилась"""
+    if devices_tree.exists(serial) and widget_cache.changed(('row', serial), values):
+        devices_tree.item(serial, values=values)
+
+def apply_device_stats(serial, stats):
+    set_device_row(serial, (serial,) + tuple(stats))
+    if serial == collectors.current_serial:
+        show_main_stats(stats)
+        update_charts()
+        update_processes_tree()
+
+def update_charts():
+    """Графики выбранного устройства (перерисовываются только при новых данных)"""
+    window = chart_window.get()
+    for metric, chart in charts.items():
+        chart.update(metric_history.get(collectors.current_serial, metric), window)
+    state = collectors.device_states.get(collectors.current_serial, {})
+    values = state.get('values', {})
+    core_heatmap.update(values.get('core_loads'), values.get('core_freqs_mhz'))
+    info = state.get('info', {})
+    set_label_text(disk_io_label, info.get('disk_io', ""))
+    set_label_text(net_io_label, info.get('net_io', ""))
+    set_label_text(alerts_label, format_active_alerts(collectors.alert_engine.active(collectors.current_serial)))
+
+def on_alert_event(event):
+    """Срабатывание или снятие оповещения (из потока, добавившего значение метрики)"""
+    pending_alert_events.append(event)
+    ui_updates.post('alerts', show_alert_events)
+
+def show_alert_events():
+    """Новые события - в начало таблицы оповещений"""
+    while pending_alert_events:
+        event = pending_alert_events.popleft()
+        value = f"{event['value']:.1f}" if event.get('value') is not None else "-"
+        state = "🚨 сработало" if event['state'] == 'fired' else "✅ снято"
+        alerts_tree.insert('', 0, values=(time.strftime('%H:%M:%S', time.localtime(event['ts'])),
+                                          event['serial'], event['rule'], state, value))
+    children = alerts_tree.get_children()
+    if len(children) > ALERT_ROWS:
+        alerts_tree.delete(*children[ALERT_ROWS:])
+    set_label_text(alerts_label, format_active_alerts(collectors.alert_engine.active(collectors.current_serial)))
+
+def update_processes_tree():
+    """Таблица процессов выбранного устройства: строки переиспользуются по позиции"""
+    values = collectors.device_states.get(collectors.current_serial, {}).get('values', {})
+    rows = values.get('top_processes') or []
+    if not widget_cache.changed('processes', rows):
+        return
+    children = processes_tree.get_children()
+    for i, row in enumerate(rows):
+        cpu = f"{row['cpu']:.1f}" if row['cpu'] is not None else "-"
+        row_values = (row['pid'], row['name'], row['state'], cpu, f"{row['rss_mb']:.1f}")
+        if i < len(children):
+            processes_tree.item(children[i], values=row_values)
+        else:
+            processes_tree.insert('', 'end', values=row_values)
+    if len(children) > len(rows):
+        processes_tree.delete(*children[len(rows):])
+    set_label_text(processes_count_label, f"📋 Процессов: {values.get('process_count', 0)}")
+
+def on_tab_changed(event=None):
+    """Процессы опрашиваются, только пока открыта их вкладка; logcat запускается при первом открытии"""
+    if notebook.select() == str(processes_tab):
+        collectors.enabled_metrics.add('processes')
+    else:
+        collectors.enabled_metrics.discard('processes')
+    if notebook.select() == str(logcat_tab):
+        sync_logcat_reader()
+        refresh_logcat()
+
+def sync_logcat_reader():
+    """Logcat читается с выбранного устройства; при смене устройства буфер начинается заново,
+    а перезапуск чтения того же устройства продолжает буфер без повторов"""
+    global logcat_reader
+    serial = collectors.current_serial
+    if logcat_reader is not None and logcat_reader.serial == serial and logcat_reader.is_alive():
+        return
+    if logcat_reader is not None:
+        stop_logcat_reader(logcat_reader.serial)
+        if logcat_reader.serial != serial:
+            logcat_buffer.clear()
+        logcat_reader = None
+    if serial:
+        logcat_reader = start_logcat_reader(serial, logcat_buffer, on_logcat_lines)
+
+def on_logcat_lines():
+    """Новые строки (из потока чтения): отрисовка не чаще раза в кадр"""
+    ui_updates.post('logcat', refresh_logcat)
+
+def apply_logcat_filter(event=None):
+    """Новый фильтр строится по индексам буфера, без перебора всех записей"""
+    global logcat_follow
+    pid = logcat_pid.get().strip()
+    logcat_view.set_filter(LogFilter(tag=logcat_tag.get().strip(), pid=int(pid) if pid.isdigit() else None,
+                                     min_level=logcat_level.get(), text=logcat_text.get().strip()))
+    logcat_follow = True
+    widget_cache.forget('logcat')
+    refresh_logcat()
+
+def clear_logcat():
+    logcat_buffer.clear()
+    widget_cache.forget('logcat')
+    refresh_logcat()
+
+def refresh_logcat():
+    """Перерисовка видимого окна logcat, если вкладка открыта"""
+    global logcat_offset
+    logcat_view.refresh()
+    if notebook.select() != str(logcat_tab):
+        return
+    total = len(logcat_view)
+    if logcat_follow and not logcat_paused.get():
+        logcat_offset = max(0, total - LOGCAT_ROWS)
+    logcat_offset = max(0, min(logcat_offset, total - LOGCAT_ROWS))
+    records = logcat_view.window(logcat_offset, LOGCAT_ROWS)
+
+    key = tuple(record[0] for record in records)
+    if widget_cache.changed('logcat', key):
+        logcat_text_widget.config(state='normal')
+        logcat_text_widget.delete('1.0', 'end')
+        for record in records:
+            line = (f"{record[TIME]} {record[PID]:>5} {record[TID]:>5} {record[LEVEL]} "
+                    f"{record[TAG]}: {record[MESSAGE]}\n")
+            logcat_text_widget.insert('end', line, record[LEVEL])
+        logcat_text_widget.config(state='disabled')
+    if total:
+        logcat_scroll.set(logcat_offset / total, min(1.0, (logcat_offset + LOGCAT_ROWS) / total))
+    else:
+        logcat_scroll.set(0.0, 1.0)
+    set_label_text(logcat_count_label, f"📜 Строк: {total} из {logcat_buffer.next_seq - logcat_buffer.first_seq}")
+
+def scroll_logcat_to(offset):
+    global logcat_offset, logcat_follow
+    total = len(logcat_view)
+    logcat_offset = max(0, min(int(offset), total - LOGCAT_ROWS))
+    # Прокрутка до конца снова включает слежение за новыми строками
+    logcat_follow = logcat_offset >= total - LOGCAT_ROWS
+    refresh_logcat()
+
+def on_logcat_scroll(action, amount, unit=None):
+    """Полоса прокрутки управляет номером первой видимой строки, а не содержимым Text"""
+    if action == 'moveto':
+        scroll_logcat_to(float(amount) * len(logcat_view))
+    elif action == 'scroll':
+        step = LOGCAT_ROWS if unit == 'pages' else 1
+        scroll_logcat_to(logcat_offset + int(amount) * step)
+
+def on_logcat_wheel(event):
+    if getattr(event, 'num', None) in (4, 5):
+        direction = -1 if event.num == 4 else 1
+    else:
+        direction = -1 if event.delta > 0 else 1
+    scroll_logcat_to(logcat_offset + direction * 3)
+    return 'break'
+
+def toggle_frame_monitor():
+    """Старт/стоп сбора кадров приложения на выбранном устройстве"""
+    global frame_monitor, frame_serial
+    if frame_monitor is not None and frame_monitor.is_running():
+        stop_frame_monitor(frame_serial)
+        frame_monitor = frame_serial = None
+        set_label_text(frames_button, "▶️ Старт")
+        return
+    if not collectors.current_serial:
+        messagebox.showerror("Ошибка", "Устройство не выбрано")
+        return
+    frame_serial = collectors.current_serial
+    frame_monitor = start_frame_monitor(frame_serial, frames_source.get(),
+                                        frames_package.get().strip() or None, on_frame_update)
+    set_label_text(frames_button, "⏹️ Стоп")
+    set_label_text(frames_label, "🔄 Сбор кадров...")
+
+def sync_frames_button():
+    """Сбор кадров отключившегося устройства останавливает forget_devices: кнопка - по фактическому состоянию"""
+    global frame_monitor, frame_serial
+    if frame_monitor is not None and not frame_monitor.is_running():
+        frame_monitor = frame_serial = None
+    set_label_text(frames_button, "⏹️ Стоп" if frame_monitor is not None else "▶️ Старт")
+
+def on_frame_update(serial, monitor, summary):
+    """Итог прохода сбора кадров (из потока монитора)"""
+    ui_updates.post('frames', show_frame_summary, serial, monitor.current_package, monitor.error, summary)
+
+def show_frame_summary(serial, package, error, summary):
+    if frame_monitor is None:
+        return
+    if error:
+        set_label_text(frames_label, error)
+        return
+    if 'fps' not in summary:
+        set_label_text(frames_label, f"📱 {package}: нет новых кадров (приложение не рисует)")
+    else:
+        period = f"{1000 / summary['period_ms']:.0f} Гц" if summary.get('period_ms') else "?"
+        fps = f"{summary['fps']:.1f}" if summary['fps'] is not None else "-"
+        set_label_text(frames_label, f"""📱 {package} | дисплей {period}
+🎞️ FPS: {fps} (кадров за окно: {summary['frames']})
+⏱️ Время кадра: p50 {summary['p50_ms']:.1f} | p90 {summary['p90_ms']:.1f} | p95 {summary['p95_ms']:.1f} | p99 {summary['p99_ms']:.1f} | макс {summary['max_ms']:.1f} мс
+⚠️ Рывки: {summary['jank']} ({summary['jank_percent']:.1f}%), сильные: {summary['big_jank']}""")
+    window = chart_window.get()
+    for metric, chart in frame_charts.items():
+        chart.update(metric_history.get(serial, metric), window)
+
+def toggle_power_profiler():
+    """Старт новой сессии профилировщика питания или её остановка"""
+    global power_profiler
+    if is_power_profiling():
+        stop_power_profiler(power_profiler.serial)
+        set_label_text(power_button, "▶️ Старт")
+        show_power_summary(power_profiler.serial)
+        return
+    if not collectors.current_serial:
+        messagebox.showerror("Ошибка", "Устройство не выбрано")
+        return
+    try:
+        rate_hz = float(power_rate.get())
+    except ValueError:
+        rate_hz = 10
+    power_profiler = start_power_profiler(collectors.current_serial, rate_hz, on_power_sample)
+    if power_profiler is None:
+        messagebox.showerror("Ошибка", "ADB не найден")
+        return
+    set_label_text(power_button, "⏹️ Стоп")
+    set_label_text(power_label, "🔄 Ожидание данных о токе батареи...")
+
+def is_power_profiling():
+    """Сессия идёт, пока профилировщик в реестре: при отключении устройства его убирает forget_devices"""
+    return power_profiler is not None and collectors.power_profilers.get(power_profiler.serial) is power_profiler
+
+def sync_power_button():
+    set_label_text(power_button, "⏹️ Стоп" if is_power_profiling() else "▶️ Старт")
+
+def on_power_sample(serial, sample):
+    """Выборка профилировщика (из потока чтения); итог перерисовывается не чаще кадра"""
+    ui_updates.post('power', show_power_summary, serial)
+
+def show_power_summary(serial):
+    if power_profiler is None or power_profiler.serial != serial:
+        return
+    summary = power_profiler.session.summary()
+    text = format_power_summary(summary, power_profiler.source)
+    if power_profiler.is_alive():
+        text += f"\n📶 Частота: {power_profiler.achieved_rate():.1f} Гц"
+    set_label_text(power_label, text)
+    power_chart.update(metric_history.get(serial, 'power_mw'), chart_window.get())
+
+def export_power_trace():
+    """Выгрузка трассы текущей или последней сессии"""
+    if power_profiler is None or not power_profiler.session.samples:
+        messagebox.showerror("Ошибка", "Нет данных для выгрузки")
+        return
+    path = filedialog.asksaveasfilename(title="Сохранить трассу питания", defaultextension=".csv",
+                                        filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")])
+    if not path:
+        return
+    try:
+        count = power_profiler.session.export(path)
+    except Exception as e:
+        messagebox.showerror("Ошибка", f"Не удалось сохранить: {str(e)}")
+        return
+    messagebox.showinfo("Успех", f"Сохранено выборок: {count}")
+
+def show_device_stats(serial, stats):
+    """Результат опроса одного устройства (вызывается из пула потоков)"""
+    if isinstance(stats, Exception):
+        log_error(f"Update error ({serial}): {str(stats)}")
+        return
+    if stats is None:
+        return
+    ui_updates.post(('device', serial), apply_device_stats, serial, stats)
+
+def sync_devices_tree(states):
+    """Строка в таблице устройств на каждое видимое устройство"""
+    for serial in devices_tree.get_children():
+        if serial not in states:
+            devices_tree.delete(serial)
+            widget_cache.forget(('row', serial))
+    for serial, state in states.items():
+        if not devices_tree.exists(serial):
+            devices_tree.insert('', 'end', iid=serial, values=(serial,))
+        if state != "device":
+            set_device_row(serial, (serial, DEVICE_STATE_LABELS.get(state, state)))
+
+def process_ui_updates():
+    """Применение накопленных обновлений раз в кадр"""
+    try:
+        ui_updates.drain()
+    except Exception as e:
+        log_error(f"UI update error: {str(e)}")
+    root.after(FRAME_MS, process_ui_updates)
+
+def on_device_select(event=None):
+    """Выбор устройства для основной вкладки"""
+    selection = devices_tree.selection()
+    if selection:
+        collectors.current_serial = selection[0]
+        update_charts()
+        sync_fast_sampler()
+        if logcat_reader is not None:
+            sync_logcat_reader()
+
+def on_fast_sample(serial, sample):
+    """Выборка сэмплера (из его потока чтения): показатели обновятся в ближайшем кадре"""
+    ui_updates.post(('device', serial), apply_device_stats, serial, device_stats(serial))
+
+def sync_fast_sampler():
+    """Сэмплер работает только на выбранном устройстве и только во включённом режиме"""
+    global fast_serial
+    serial = collectors.current_serial if fast_mode.get() else None
+    if fast_serial and (fast_serial != serial or not is_fast_sampling(fast_serial)):
+        stop_fast_sampler(fast_serial)
+        fast_serial = None
+    if serial and fast_serial is None:
+        if start_fast_sampler(serial, int(fast_rate.get()), on_fast_sample):
+            fast_serial = serial
+
+def restart_fast_sampler(event=None):
+    """Новая частота применяется перезапуском цикла на устройстве"""
+    global fast_serial
+    if fast_serial:
+        stop_fast_sampler(fast_serial)
+        fast_serial = None
+    sync_fast_sampler()
+
+def update_stats():
+    while True:
+        serials = []
+        try:
+            states = list_device_states()
+            serials = [serial for serial, state in states.items() if state == "device"]
+            forget_devices(serials)
+            selected = collectors.current_serial
+            if selected not in states or (selected not in serials and serials):
+                selected = collectors.current_serial = serials[0] if serials else next(iter(states), None)
+            ui_updates.post('devices_tree', sync_devices_tree, states)
+            ui_updates.post('frames_button', sync_frames_button)
+            ui_updates.post('power_button', sync_power_button)
+            
+            if serials:
+                device_poller.poll(serials, show_device_stats)
+            if selected not in serials:
+                ui_updates.post('main', show_main_stats, device_state_stats(states.get(selected)))
+            else:
+                rate_text = "⏱️ " + format_rate_report(get_device_state(selected)['scheduler'].report())
+                sampler = collectors.fast_samplers.get(selected)
+                if sampler is not None and sampler.is_alive():
+                    rate_text += f" | ⚡ сэмплер: {sampler.achieved_rate():.0f}/{sampler.rate_hz} Гц"
+                ui_updates.post('fast_sampler', sync_fast_sampler)
+                ui_updates.post('rate', set_label_text, rate_label, rate_text)
+            
+        except Exception as e:
+            log_error(f"Update error: {str(e)}")
+        
+        wait_next_tick(bool(serials))
+
+def toggle_fullscreen(event=None):
+    root.attributes('-fullscreen', not root.attributes('-fullscreen'))
+
+def exit_fullscreen(event=None):
+    root.attributes('-fullscreen', False)
+
+# Создание GUI
+root = tk.Tk()
+root.title("📊 Android Diagnostic Board")
+root.geometry("900x800")
+root.configure(bg='#2b2b2b')
+
+# Настройки полноэкранного режима
+root.attributes('-fullscreen', False)
+root.bind('<F11>', toggle_fullscreen)
+root.bind('<Escape>', exit_fullscreen)
+
+# Notebook для вкладок
+notebook = ttk.Notebook(root)
+notebook.pack(fill='both', expand=True, padx=20, pady=10)
+
+# Стиль для меток
+style = ttk.Style()
+style.configure("Custom.TLabel", 
+                background='#2b2b2b',
+                foreground='#ffffff',
+                font=('Arial', 11),
+                padding=6)
+
+style.configure("Title.TLabel",
+                background='#2b2b2b',
+                foreground='#4fc3f7',
+                font=('Arial', 14, 'bold'),
+                padding=10)
+
+# Вкладка 1: Основная информация
+main_tab = ttk.Frame(notebook, style="Custom.TLabel")
+notebook.add(main_tab, text="📊 Основная информация")
+
+phone_label = ttk.Label(main_tab, text="🔍 Поиск ADB...", style="Title.TLabel")
+phone_label.pack(pady=10)
+
+separator = ttk.Separator(main_tab, orient='horizontal')
+separator.pack(fill='x', pady=8)
+
+version_label = ttk.Label(main_tab, text="", style="Custom.TLabel")
+version_label.pack(pady=4, anchor='w')
+
+bootloader_label = ttk.Label(main_tab, text="", style="Custom.TLabel")
+bootloader_label.pack(pady=4, anchor='w')
+
+cpu_label = ttk.Label(main_tab, text="", style="Custom.TLabel")
+cpu_label.pack(pady=4, anchor='w')
+
+ram_label = ttk.Label(main_tab, text="", style="Custom.TLabel")
+ram_label.pack(pady=4, anchor='w')
+
+storage_label = ttk.Label(main_tab, text="", style="Custom.TLabel")
+storage_label.pack(pady=4, anchor='w')
+
+battery_label = ttk.Label(main_tab, text="", style="Custom.TLabel")
+battery_label.pack(pady=4, anchor='w')
+
+display_label = ttk.Label(main_tab, text="", style="Custom.TLabel")
+display_label.pack(pady=4, anchor='w')
+
+disk_io_label = ttk.Label(main_tab, text="", style="Custom.TLabel")
+disk_io_label.pack(pady=4, anchor='w')
+
+net_io_label = ttk.Label(main_tab, text="", style="Custom.TLabel")
+net_io_label.pack(pady=4, anchor='w')
+
+alerts_label = ttk.Label(main_tab, text="", style="Custom.TLabel", justify='left')
+alerts_label.pack(pady=4, anchor='w')
+
+# Графики истории
+charts_frame = tk.Frame(main_tab, bg='#2b2b2b')
+charts_frame.pack(fill='x', pady=6)
+
+charts = {
+    'cpu': Sparkline(charts_frame, "CPU", "%", '#4fc3f7', '#1f3f4f', fixed_max=100),
+    'ram': Sparkline(charts_frame, "RAM", "%", '#81c784', '#253f27', fixed_max=100),
+    'battery_temp': Sparkline(charts_frame, "Температура батареи", "°C", '#ffb74d', '#4a3a1f'),
+}
+for chart in charts.values():
+    chart.pack(side='left', padx=5)
+
+# Загрузка и частота по ядрам
+core_heatmap = CoreHeatmap(main_tab)
+core_heatmap.pack(anchor='w', padx=5, pady=(0, 6))
+
+chart_window_frame = tk.Frame(main_tab, bg='#2b2b2b')
+chart_window_frame.pack(anchor='w')
+chart_window = tk.StringVar(value='1m')
+for value, text in (('1m', "1 мин"), ('1h', "1 час"), ('24h', "24 часа")):
+    tk.Radiobutton(chart_window_frame, text=text, value=value, variable=chart_window, command=update_charts,
+                   bg='#2b2b2b', fg='#ffffff', selectcolor='#1e1e1e', activebackground='#2b2b2b').pack(side='left', padx=5)
+
+# Высокочастотный режим: CPU/RAM/температуры читаются циклом на самом устройстве
+fast_mode = tk.BooleanVar(value=False)
+tk.Checkbutton(chart_window_frame, text="⚡ Высокая частота", variable=fast_mode, command=sync_fast_sampler,
+               bg='#2b2b2b', fg='#ffffff', selectcolor='#1e1e1e', activebackground='#2b2b2b').pack(side='left', padx=(20, 5))
+fast_rate = tk.StringVar(value='20')
+fast_rate_box = ttk.Combobox(chart_window_frame, textvariable=fast_rate, values=['10', '20', '50', '100'],
+                             width=4, state='readonly')
+fast_rate_box.pack(side='left')
+fast_rate_box.bind('<<ComboboxSelected>>', restart_fast_sampler)
+tk.Label(chart_window_frame, text="Гц", bg='#2b2b2b', fg='#ffffff').pack(side='left', padx=2)
+
+# Кнопки управления в основной вкладке
+main_button_frame = tk.Frame(main_tab, bg='#2b2b2b')
+main_button_frame.pack(fill='x', pady=15)
+
+reboot_btn = tk.Button(main_button_frame, text="🔄 Перезагрузить", command=reboot_device,
+                      bg='#4fc3f7', fg='black', font=('Arial', 10, 'bold'), padx=15, pady=8)
+reboot_btn.pack(side='left', padx=5)
+
+shutdown_btn = tk.Button(main_button_frame, text="⏻ Выключить", command=shutdown_device,
+                        bg='#ff6b6b', fg='black', font=('Arial', 10, 'bold'), padx=15, pady=8)
+shutdown_btn.pack(side='left', padx=5)
+
+# Вкладка 2: Все устройства
+devices_tab = ttk.Frame(notebook, style="Custom.TLabel")
+notebook.add(devices_tab, text="📱 Устройства")
+
+devices_title = ttk.Label(devices_tab, text="📱 Подключенные устройства", style="Title.TLabel")
+devices_title.pack(pady=10)
+
+device_columns = {
+    'serial': ("Серийный номер", 130),
+    'phone': ("Устройство", 150),
+    'version': ("Android", 100),
+    'bootloader': ("Загрузчик", 150),
+    'cpu': ("CPU", 90),
+    'ram': ("RAM", 170),
+    'storage': ("Память", 200),
+    'battery': ("Батарея", 220),
+    'display': ("Дисплей", 200),
+}
+devices_tree = ttk.Treeview(devices_tab, columns=list(device_columns), show='headings', selectmode='browse')
+for column, (heading, width) in device_columns.items():
+    devices_tree.heading(column, text=heading)
+    devices_tree.column(column, width=width, anchor='w')
+devices_tree.bind('<<TreeviewSelect>>', on_device_select)
+
+devices_scroll = ttk.Scrollbar(devices_tab, orient='horizontal', command=devices_tree.xview)
+devices_tree.configure(xscrollcommand=devices_scroll.set)
+devices_tree.pack(fill='both', expand=True, padx=10)
+devices_scroll.pack(fill='x', padx=10)
+
+devices_hint = ttk.Label(devices_tab, text="Выберите устройство, чтобы показать его на основной вкладке", style="Custom.TLabel")
+devices_hint.pack(pady=6)
+
+rate_label = ttk.Label(devices_tab, text="", style="Custom.TLabel", wraplength=820, justify='left')
+rate_label.pack(pady=6, anchor='w')
+
+# Вкладка 3: Бенчмарк
+benchmark_tab = ttk.Frame(notebook, style="Custom.TLabel")
+notebook.add(benchmark_tab, text="⚡ Бенчмарк")
+
+benchmark_title = ttk.Label(benchmark_tab, text="⚡ Тест производительности", style="Title.TLabel")
+benchmark_title.pack(pady=15)
+
+benchmark_info = ttk.Label(benchmark_tab, text="Тесты CPU, памяти и накопителя выполняются на самом устройстве", style="Custom.TLabel")
+benchmark_info.pack(pady=10)
+
+# Кнопки бенчмарка
+benchmark_button_frame = tk.Frame(benchmark_tab, bg='#2b2b2b')
+benchmark_button_frame.pack(pady=15)
+
+start_benchmark_btn = tk.Button(benchmark_button_frame, text="▶️ Начать тест", command=run_benchmark,
+                              bg='#4fc3f7', fg='black', font=('Arial', 10, 'bold'), padx=15, pady=8)
+start_benchmark_btn.pack(side='left', padx=5)
+
+stop_benchmark_btn = tk.Button(benchmark_button_frame, text="⏹️ Остановить", command=stop_benchmark,
+                             bg='#ff6b6b', fg='black', font=('Arial', 10, 'bold'), padx=15, pady=8)
+stop_benchmark_btn.pack(side='left', padx=5)
+
+# Статус бенчмарка
+benchmark_status_label = ttk.Label(benchmark_tab, text="⏳ Готов к тестированию", style="Custom.TLabel")
+benchmark_status_label.pack(pady=10)
+
+# Результаты бенчмарка
+benchmark_result_label = ttk.Label(benchmark_tab, text="Здесь появятся результаты теста...", style="Custom.TLabel", justify='left')
+benchmark_result_label.pack(pady=10, fill='both', expand=True)
+
+# Вкладка 4: Процессы
+processes_tab = ttk.Frame(notebook, style="Custom.TLabel")
+notebook.add(processes_tab, text="📋 Процессы")
+
+processes_title = ttk.Label(processes_tab, text="📋 Процессы с наибольшей загрузкой CPU", style="Title.TLabel")
+processes_title.pack(pady=10)
+
+process_columns = {
+    'pid': ("PID", 70),
+    'name': ("Процесс", 260),
+    'state': ("Состояние", 90),
+    'cpu': ("CPU %", 90),
+    'rss': ("RSS, МБ", 100),
+}
+processes_tree = ttk.Treeview(processes_tab, columns=list(process_columns), show='headings', selectmode='none')
+for column, (heading, width) in process_columns.items():
+    processes_tree.heading(column, text=heading)
+    processes_tree.column(column, width=width, anchor='w')
+processes_tree.pack(fill='both', expand=True, padx=10)
+
+processes_count_label = ttk.Label(processes_tab, text="", style="Custom.TLabel")
+processes_count_label.pack(pady=6, anchor='w')
+
+# Вкладка 5: Кадры
+frames_tab = ttk.Frame(notebook, style="Custom.TLabel")
+notebook.add(frames_tab, text="🎞️ Кадры")
+
+frames_title = ttk.Label(frames_tab, text="🎞️ Плавность приложения: FPS, время кадра, рывки", style="Title.TLabel")
+frames_title.pack(pady=10)
+
+frames_controls = tk.Frame(frames_tab, bg='#2b2b2b')
+frames_controls.pack(fill='x', padx=10, pady=6)
+frames_package = tk.StringVar()
+frames_source = tk.StringVar(value='gfxinfo')
+tk.Label(frames_controls, text="Пакет (пусто - в фокусе):", bg='#2b2b2b', fg='#ffffff').pack(side='left', padx=(0, 4))
+tk.Entry(frames_controls, textvariable=frames_package, width=30).pack(side='left')
+tk.Label(frames_controls, text="Источник:", bg='#2b2b2b', fg='#ffffff').pack(side='left', padx=(10, 4))
+ttk.Combobox(frames_controls, textvariable=frames_source, values=['gfxinfo', 'surfaceflinger'],
+             width=14, state='readonly').pack(side='left')
+frames_button = tk.Button(frames_controls, text="▶️ Старт", command=toggle_frame_monitor,
+                          bg='#4caf50', fg='white', font=('Arial', 10, 'bold'), padx=15)
+frames_button.pack(side='left', padx=10)
+
+frames_label = ttk.Label(frames_tab, text="Выберите приложение и нажмите «Старт»", style="Custom.TLabel", justify='left')
+frames_label.pack(pady=10, padx=10, anchor='w')
+
+frames_charts_frame = tk.Frame(frames_tab, bg='#2b2b2b')
+frames_charts_frame.pack(fill='x', padx=10)
+frame_charts = {
+    'fps': Sparkline(frames_charts_frame, "FPS", "", '#4fc3f7', '#1f3f4f'),
+    'frame_p95_ms': Sparkline(frames_charts_frame, "p95 время кадра", " мс", '#ef9a9a', '#4a2a2a'),
+}
+for chart in frame_charts.values():
+    chart.pack(side='left', padx=5)
+
+# Вкладка 6: Logcat
+logcat_tab = ttk.Frame(notebook, style="Custom.TLabel")
+notebook.add(logcat_tab, text="📜 Logcat")
+
+logcat_filter_frame = tk.Frame(logcat_tab, bg='#2b2b2b')
+logcat_filter_frame.pack(fill='x', padx=10, pady=6)
+
+logcat_tag = tk.StringVar()
+logcat_pid = tk.StringVar()
+logcat_level = tk.StringVar(value='V')
+logcat_text = tk.StringVar()
+logcat_paused = tk.BooleanVar(value=False)
+for caption, variable, width in (("Тег:", logcat_tag, 18), ("PID:", logcat_pid, 7), ("Текст:", logcat_text, 24)):
+    tk.Label(logcat_filter_frame, text=caption, bg='#2b2b2b', fg='#ffffff').pack(side='left', padx=(6, 2))
+    entry = tk.Entry(logcat_filter_frame, textvariable=variable, width=width)
+    entry.pack(side='left')
+    entry.bind('<Return>', apply_logcat_filter)
+tk.Label(logcat_filter_frame, text="Уровень:", bg='#2b2b2b', fg='#ffffff').pack(side='left', padx=(6, 2))
+logcat_level_box = ttk.Combobox(logcat_filter_frame, textvariable=logcat_level, values=list(LEVELS),
+                                width=3, state='readonly')
+logcat_level_box.pack(side='left')
+logcat_level_box.bind('<<ComboboxSelected>>', apply_logcat_filter)
+tk.Button(logcat_filter_frame, text="🔍 Применить", command=apply_logcat_filter).pack(side='left', padx=6)
+tk.Checkbutton(logcat_filter_frame, text="⏸ Пауза", variable=logcat_paused, command=refresh_logcat,
+               bg='#2b2b2b', fg='#ffffff', selectcolor='#1e1e1e', activebackground='#2b2b2b').pack(side='left', padx=6)
+tk.Button(logcat_filter_frame, text="🧹 Очистить", command=clear_logcat).pack(side='left', padx=6)
+
+logcat_body = tk.Frame(logcat_tab, bg='#2b2b2b')
+logcat_body.pack(fill='both', expand=True, padx=10)
+logcat_text_widget = tk.Text(logcat_body, height=LOGCAT_ROWS, wrap='none', bg='#1e1e1e', fg='#d0d0d0',
+                             font=('Consolas', 9), state='disabled')
+logcat_scroll = ttk.Scrollbar(logcat_body, orient='vertical', command=on_logcat_scroll)
+logcat_scroll.pack(side='right', fill='y')
+logcat_text_widget.pack(side='left', fill='both', expand=True)
+for level, color in (('V', '#9e9e9e'), ('D', '#90caf9'), ('I', '#a5d6a7'), ('W', '#ffcc80'),
+                     ('E', '#ef9a9a'), ('F', '#ff5252')):
+    logcat_text_widget.tag_configure(level, foreground=color)
+for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+    logcat_text_widget.bind(sequence, on_logcat_wheel)
+
+logcat_count_label = ttk.Label(logcat_tab, text="", style="Custom.TLabel")
+logcat_count_label.pack(pady=4, anchor='w', padx=10)
+
+# Вкладка 7: Питание
+power_tab = ttk.Frame(notebook, style="Custom.TLabel")
+notebook.add(power_tab, text="🔋 Питание")
+
+power_title = ttk.Label(power_tab, text="🔋 Расход батареи: ток, мощность, энергия за сессию", style="Title.TLabel")
+power_title.pack(pady=10)
+
+power_controls = tk.Frame(power_tab, bg='#2b2b2b')
+power_controls.pack(fill='x', padx=10, pady=6)
+power_rate = tk.StringVar(value='10')
+tk.Label(power_controls, text="Частота:", bg='#2b2b2b', fg='#ffffff').pack(side='left', padx=(0, 4))
+ttk.Combobox(power_controls, textvariable=power_rate, values=['1', '5', '10', '20', '50'],
+             width=4, state='readonly').pack(side='left')
+tk.Label(power_controls, text="Гц", bg='#2b2b2b', fg='#ffffff').pack(side='left', padx=2)
+power_button = tk.Button(power_controls, text="▶️ Старт", command=toggle_power_profiler,
+                         bg='#4caf50', fg='white', font=('Arial', 10, 'bold'), padx=15)
+power_button.pack(side='left', padx=10)
+tk.Button(power_controls, text="💾 Сохранить трассу", command=export_power_trace).pack(side='left', padx=6)
+
+power_label = ttk.Label(power_tab, text="Отключите зарядку и нажмите «Старт»", style="Custom.TLabel", justify='left')
+power_label.pack(pady=10, padx=10, anchor='w')
+
+power_chart = Sparkline(power_tab, "Мощность", " мВт", '#ffd54f', '#4a421f')
+power_chart.pack(padx=10, anchor='w')
+
+# Вкладка 8: Оповещения
+alerts_tab = ttk.Frame(notebook, style="Custom.TLabel")
+notebook.add(alerts_tab, text="🚨 Оповещения")
+
+alerts_title = ttk.Label(alerts_tab, text="🚨 Оповещения по правилам", style="Title.TLabel")
+alerts_title.pack(pady=10)
+
+alerts_rules_label = ttk.Label(alerts_tab, text="Правила: " + " | ".join(rule.text for rule in collectors.alert_engine.rules),
+                               style="Custom.TLabel", wraplength=820, justify='left')
+alerts_rules_label.pack(pady=4, padx=10, anchor='w')
+
+alert_columns = {
+    'time': ("Время", 80),
+    'serial': ("Устройство", 160),
+    'rule': ("Правило", 260),
+    'state': ("Состояние", 120),
+    'value': ("Значение", 90),
+}
+alerts_tree = ttk.Treeview(alerts_tab, columns=list(alert_columns), show='headings', selectmode='none')
+for column, (heading, width) in alert_columns.items():
+    alerts_tree.heading(column, text=heading)
+    alerts_tree.column(column, width=width, anchor='w')
+alerts_tree.pack(fill='both', expand=True, padx=10)
+
+collectors.alert_engine.on_event = on_alert_event
+
+notebook.bind('<<NotebookTabChanged>>', on_tab_changed)
+
+# Статус бар
+status_bar = ttk.Label(root, text="🟢 ADB Diagnostic Board | F11 - Полный экран | ESC - Выход", style="Custom.TLabel")
+status_bar.pack(side='bottom', pady=10)
+
+def run():
+    """Запуск опроса устройств и главного цикла Tk"""
+    global device_poller
+    device_poller = DevicePoller(poll_device)
+    start_device_tracker()
+    process_ui_updates()
+    thread = threading.Thread(target=update_stats, daemon=True)
+    thread.start()
+
+    root.eval('tk::PlaceWindow . center')
+    root.mainloop()
@@ -0,0 +1,190 @@
+"""Сбор показателей без графического интерфейса с выгрузкой в JSON Lines / CSV"""
+import csv
+import json
+import sys
+import threading
+import time
+
+import collectors
+from collectors import (list_device_states, forget_devices, collect_sample, start_device_tracker, wait_next_tick,
+                        log_error, start_fast_sampler, stop_fast_sampler, is_fast_sampling, start_frame_monitor,
+                        start_power_profiler, stop_power_profiler)
+from device_pool import DevicePoller
+
+# Колонки CSV (в JSON Lines попадают все поля записи)
+CSV_FIELDS = ['ts', 'serial', 'phone', 'cpu', 'ram', 'ram_used_mb', 'ram_total_mb',
+              'storage_used_kb', 'storage_total_kb', 'battery_level', 'battery_temp', 'error', 'source',
+              'disk_read_mb_s', 'disk_write_mb_s', 'disk_read_iops', 'disk_write_iops', 'net_rx_kb_s', 'net_tx_kb_s',
+              'current_ma', 'voltage_v', 'power_mw', 'rule', 'alert', 'value']
+
+# Как часто сбрасывать буфер файла на диск, сек
+FLUSH_INTERVAL = 1.0
+
+
+class SampleWriter:
+    """Буферизованная запись показателей в JSON Lines или CSV"""
+
+    def __init__(self, path=None, fmt='jsonl'):
+        self.to_stdout = path in (None, '-')
+        self.file = sys.stdout if self.to_stdout else open(path, 'a', encoding='utf-8', newline='', buffering=1 << 16)
+        self.fmt = fmt
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        self.count = 0
+        if fmt == 'csv':
+            self.writer = csv.DictWriter(self.file, CSV_FIELDS, extrasaction='ignore')
+            if self.to_stdout or self.file.tell() == 0:
+                self.writer.writeheader()
+
+    def write(self, sample):
+        with self.lock:
+            if self.fmt == 'csv':
+                self.writer.writerow(sample)
+            else:
+                self.file.write(json.dumps(sample, ensure_ascii=False) + '\n')
+            self.count += 1
+            now = time.monotonic()
+            if now - self.last_flush >= FLUSH_INTERVAL:
+                self.file.flush()
+                self.last_flush = now
+
+    def close(self):
+        with self.lock:
+            self.file.flush()
+            if not self.to_stdout:
+                self.file.close()
+
+
+def guess_format(path):
+    """Формат по расширению файла: .csv - CSV, иначе JSON Lines"""
+    return 'csv' if path and path.lower().endswith('.csv') else 'jsonl'
+
+
+def run_headless(interval=0.5, out=None, fmt=None, duration=0, serials=None, sample_hz=0,
+                 frames=None, frames_source='gfxinfo', power_hz=0, alert_rules=None):
+    """Опрос всех (или выбранных) устройств до истечения duration секунд или Ctrl+C.
+
+    sample_hz > 0 дополнительно запускает сэмплер на каждом устройстве: его
+    выборки CPU/RAM/температур пишутся отдельными записями с source=sampler.
+    frames - пакет (или 'auto' - приложение в фокусе) для записи FPS и
+    времени кадров раз в секунду с source=frames.
+    power_hz > 0 записывает ток, напряжение и мощность батареи (source=power),
+    а при отключении устройства и при завершении - итог его сессии питания
+    (source=power_summary).
+    alert_rules - правила оповещений вместо правил по умолчанию; срабатывания
+    и снятия пишутся с source=alert.
+    """
+    collectors.poll_interval = interval
+    writer = SampleWriter(out, fmt or guess_format(out))
+
+    def on_sample(serial, sample):
+        if isinstance(sample, Exception):
+            log_error(f"Headless error ({serial}): {str(sample)}")
+        elif sample is not None:
+            writer.write(sample)
+
+    def on_fast_sample(serial, sample):
+        record = {'ts': sample['ts'], 'serial': serial, 'source': 'sampler'}
+        for key in ('cpu', 'ram', 'ram_used_mb', 'ram_total_mb', 'thermal'):
+            if sample.get(key) is not None:
+                record[key] = sample[key]
+        writer.write(record)
+
+    def on_frames(serial, monitor, summary):
+        record = {'ts': round(time.time(), 3), 'serial': serial, 'source': 'frames',
+                  'package': monitor.current_package}
+        if monitor.error:
+            record['error'] = monitor.error
+        else:
+            record.update(summary)
+        writer.write(record)
+
+    def on_power_sample(serial, sample):
+        record = {'ts': sample['ts'], 'serial': serial, 'source': 'power'}
+        for key in ('current_ma', 'voltage_v', 'power_mw', 'charge_counter_mah', 'status'):
+            if sample.get(key) is not None:
+                record[key] = sample[key]
+        writer.write(record)
+
+    def write_power_summary(serial, profiler):
+        record = {'ts': round(time.time(), 3), 'serial': serial, 'source': 'power_summary'}
+        record.update(profiler.session.summary())
+        writer.write(record)
+
+    def on_alert(event):
+        record = dict(event)
+        record['alert'] = record.pop('state')
+        record['source'] = 'alert'
+        writer.write(record)
+
+    if alert_rules is not None:
+        collectors.alert_engine.set_rules(alert_rules)
+    collectors.alert_engine.on_event = on_alert
+
+    poller = DevicePoller(collect_sample)
+    sampled = set()
+    frame_monitors = {}
+    # Профилировщики, чей итог ещё не записан: при отключении устройства forget_devices
+    # останавливает и забывает профилировщик, но сессия остаётся в объекте
+    profilers = {}
+    start_device_tracker()
+    deadline = time.monotonic() + duration if duration else None
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            if collectors.session_replay is not None and collectors.session_replay.finished():
+                break
+            states = list_device_states()
+            online = [serial for serial, state in states.items() if state == "device"]
+            forget_devices(online)
+            if serials:
+                online = [serial for serial in online if serial in serials]
+            if sample_hz:
+                for serial in online:
+                    # После сбоя сэмплера повтор идёт с паузой, а до него CPU и RAM опрашиваются пакетом
+                    if not is_fast_sampling(serial) and start_fast_sampler(serial, sample_hz, on_fast_sample):
+                        sampled.add(serial)
+            if power_hz:
+                for serial in [serial for serial in profilers if serial not in collectors.power_profilers]:
+                    write_power_summary(serial, profilers.pop(serial))
+                for serial in online:
+                    if serial not in collectors.power_profilers:
+                        profiler = start_power_profiler(serial, power_hz, on_power_sample)
+                        if profiler is not None:
+                            profilers[serial] = profiler
+            if frames:
+                # Монитор отключившегося устройства опрашивал бы его впустую и не дал бы
+                # запустить новый после переподключения
+                for serial in [serial for serial in frame_monitors if serial not in online]:
+                    frame_monitors.pop(serial).stop()
+                for serial in online:
+                    if serial not in frame_monitors:
+                        frame_monitors[serial] = start_frame_monitor(
+                            serial, frames_source, None if frames == 'auto' else frames, on_frames)
+            if online:
+                poller.poll(online, on_sample)
+            wait_next_tick(bool(online), idle_timeout=1.0 if deadline else None)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for serial in sampled:
+            stop_fast_sampler(serial)
+        for monitor in frame_monitors.values():
+            monitor.stop()
+        for serial, profiler in profilers.items():
+            stop_power_profiler(serial)
+            write_power_summary(serial, profiler)
+        poller.shutdown()
+        collectors.alert_engine.on_event = None
+        writer.close()
+    return writer.count
+
+
+def run_replay(out=None, fmt=None):
+    """Прогон записанной сессии через разбор без ожидания: показатели в out, пропускная способность в stderr"""
+    writer = SampleWriter(out, fmt or guess_format(out))
+    try:
+        report = collectors.replay_batches(lambda serial, sample: writer.write(sample))
+    finally:
+        writer.close()
+    print(json.dumps(report, ensure_ascii=False), file=sys.stderr)
+    return report
@@ -0,0 +1,139 @@
+"""История метрик фиксированного размера: кольцевые буферы на array и агрегаты min/max/avg"""
+import threading
+import time
+from array import array
+
+# Последние сырые значения
+RAW_SIZE = 240
+
+# Уровни прореживания: (секунд в корзине, число корзин)
+TIERS = {
+    '1m': (1, 60),
+    '1h': (15, 240),
+    '24h': (300, 288),
+}
+
+
+class Tier:
+    """Кольцевой буфер корзин с min/max/сумма/количество"""
+
+    def __init__(self, bucket_seconds, size):
+        self.bucket_seconds = bucket_seconds
+        self.size = size
+        self.bucket_ids = array('q', [-1]) * size
+        self.mins = array('d', [0.0]) * size
+        self.maxs = array('d', [0.0]) * size
+        self.sums = array('d', [0.0]) * size
+        self.counts = array('L', [0]) * size
+
+    def add(self, t, value):
+        bucket = int(t // self.bucket_seconds)
+        slot = bucket % self.size
+        if self.bucket_ids[slot] != bucket:
+            # Корзина устарела: начинаем её заново
+            self.bucket_ids[slot] = bucket
+            self.mins[slot] = value
+            self.maxs[slot] = value
+            self.sums[slot] = value
+            self.counts[slot] = 1
+            return
+        if value < self.mins[slot]:
+            self.mins[slot] = value
+        if value > self.maxs[slot]:
+            self.maxs[slot] = value
+        self.sums[slot] += value
+        self.counts[slot] += 1
+
+    def series(self, now):
+        """[(время начала корзины, min, max, avg)] за окно уровня по порядку"""
+        last = int(now // self.bucket_seconds)
+        result = []
+        for bucket in range(last - self.size + 1, last + 1):
+            slot = bucket % self.size
+            if self.bucket_ids[slot] == bucket and self.counts[slot]:
+                result.append((bucket * self.bucket_seconds, self.mins[slot], self.maxs[slot],
+                               self.sums[slot] / self.counts[slot]))
+        return result
+
+
+class MetricHistory:
+    """История одной метрики: сырые значения и прореженные уровни"""
+
+    def __init__(self, raw_size=RAW_SIZE, tiers=TIERS):
+        self.times = array('d', [0.0]) * raw_size
+        self.values = array('d', [0.0]) * raw_size
+        self.raw_size = raw_size
+        self.count = 0
+        self.tiers = {name: Tier(*spec) for name, spec in tiers.items()}
+        # Растёт с каждым значением: по нему график понимает, что пора перерисоваться
+        self.version = 0
+
+    def add(self, t, value):
+        slot = self.count % self.raw_size
+        self.times[slot] = t
+        self.values[slot] = value
+        self.count += 1
+        for tier in self.tiers.values():
+            tier.add(t, value)
+        self.version += 1
+
+    def latest(self):
+        if not self.count:
+            return None
+        return self.values[(self.count - 1) % self.raw_size]
+
+    def raw(self, since=None):
+        """[(время, значение)] из кольцевого буфера по порядку"""
+        n = min(self.count, self.raw_size)
+        start = self.count - n
+        result = []
+        for i in range(start, self.count):
+            slot = i % self.raw_size
+            if since is None or self.times[slot] >= since:
+                result.append((self.times[slot], self.values[slot]))
+        return result
+
+    def window(self, name, now=None):
+        """Серия агрегатов для окна графика ('1m', '1h', '24h')"""
+        now = time.time() if now is None else now
+        return self.tiers[name].series(now)
+
+
+class HistoryStore:
+    """История всех метрик всех устройств"""
+
+    def __init__(self):
+        self.series = {}
+        # Устройства, у которых есть хотя бы одна серия
+        self.serials = set()
+        self.lock = threading.Lock()
+        # listener(serial, metric, value, t) - после каждого значения, вне блокировки
+        self.listener = None
+
+    def add(self, serial, metric, value, t=None):
+        if value is None:
+            return
+        t = time.time() if t is None else t
+        value = float(value)
+        with self.lock:
+            history = self.series.get((serial, metric))
+            if history is None:
+                history = self.series[(serial, metric)] = MetricHistory()
+                self.serials.add(serial)
+            history.add(t, value)
+        if self.listener is not None:
+            self.listener(serial, metric, value, t)
+
+    def get(self, serial, metric):
+        with self.lock:
+            return self.series.get((serial, metric))
+
+    def forget(self, serials):
+        """Удаление серий устройств, которых больше нет в списке"""
+        with self.lock:
+            gone = self.serials.difference(serials)
+            if not gone:
+                return
+            for key in [key for key in self.series if key[0] in gone]:
+                del self.series[key]
+            self.serials -= gone
@@ -0,0 +1,106 @@
+"""Скорость ввода-вывода накопителя и сети по разнице счётчиков /proc/diskstats и /proc/net/dev"""
+import re
+
+# Целые диски без разделов: разделы дублировали бы те же операции
+WHOLE_DISK = re.compile(r'^(sd[a-z]+|mmcblk\d+|nvme\d+n\d+|vd[a-z]+)$')
+
+# Размер сектора в /proc/diskstats не зависит от устройства
+SECTOR_BYTES = 512
+
+# Интерфейсы, трафик которых не уходит с устройства
+SKIP_INTERFACES = ('lo',)
+
+
+def parse_diskstats(output):
+    """{диск: (операций чтения, секторов прочитано, операций записи, секторов записано)}"""
+    disks = {}
+    for line in (output or "").split('\n'):
+        parts = line.split()
+        if len(parts) < 10 or not WHOLE_DISK.match(parts[2]):
+            continue
+        try:
+            disks[parts[2]] = (int(parts[3]), int(parts[5]), int(parts[7]), int(parts[9]))
+        except ValueError:
+            continue
+    return disks
+
+
+def parse_net_dev(output):
+    """{интерфейс: (байт принято, байт отправлено)}"""
+    interfaces = {}
+    for line in (output or "").split('\n'):
+        if ':' not in line:
+            continue
+        name, _, counters = line.partition(':')
+        name = name.strip()
+        parts = counters.split()
+        if not name or name in SKIP_INTERFACES or len(parts) < 9:
+            continue
+        try:
+            interfaces[name] = (int(parts[0]), int(parts[8]))
+        except ValueError:
+            continue
+    return interfaces
+
+
+class CounterRates:
+    """Скорость роста счётчиков в секунду по разнице с прошлым опросом.
+
+    Новый ключ и сброс счётчика (интерфейс пересоздан, диск переподключён)
+    дают None до следующего опроса.
+    """
+
+    def __init__(self):
+        self.prev = {}
+        self.prev_time = None
+
+    def update(self, counters, now):
+        """{ключ: кортеж скоростей или None}"""
+        elapsed = now - self.prev_time if self.prev_time is not None else 0
+        rates = {}
+        for key, values in counters.items():
+            before = self.prev.get(key)
+            if before is None or elapsed <= 0 or len(before) != len(values):
+                rates[key] = None
+                continue
+            deltas = [value - old for value, old in zip(values, before)]
+            rates[key] = None if min(deltas) < 0 else tuple(delta / elapsed for delta in deltas)
+        self.prev = counters
+        self.prev_time = now
+        return rates
+
+
+def disk_totals(rates):
+    """(МБ/с чтения, МБ/с записи, IOPS чтения, IOPS записи) по всем дискам или None"""
+    known = [rate for rate in rates.values() if rate is not None]
+    if not known:
+        return None
+    read_ops = sum(rate[0] for rate in known)
+    read_mb = sum(rate[1] for rate in known) * SECTOR_BYTES / (1024 * 1024)
+    write_ops = sum(rate[2] for rate in known)
+    write_mb = sum(rate[3] for rate in known) * SECTOR_BYTES / (1024 * 1024)
+    return read_mb, write_mb, read_ops, write_ops
+
+
+def format_speed(bytes_per_second):
+    if bytes_per_second >= 1024 * 1024:
+        return f"{bytes_per_second / (1024 * 1024):.1f} МБ/с"
+    return f"{bytes_per_second / 1024:.1f} КБ/с"
+
+
+def format_disk_info(totals):
+    if totals is None:
+        return "💽 Диск: ожидание данных..."
+    read_mb, write_mb, read_ops, write_ops = totals
+    return (f"💽 Диск: чтение {read_mb:.1f} МБ/с ({read_ops:.0f} IOPS) | "
+            f"запись {write_mb:.1f} МБ/с ({write_ops:.0f} IOPS)")
+
+
+def format_net_info(rates, limit=3):
+    """Самые загруженные интерфейсы: приём и передача"""
+    known = [(rate[0] + rate[1], name, rate[0], rate[1]) for name, rate in rates.items() if rate is not None]
+    if not known:
+        return "🌐 Сеть: ожидание данных..."
+    busiest = sorted(known, reverse=True)[:limit]
+    parts = [f"{name} ↓{format_speed(rx)} ↑{format_speed(tx)}" for _, name, rx, tx in busiest if rx or tx]
+    return "🌐 Сеть: " + (" | ".join(parts) if parts else "нет трафика")
@@ -0,0 +1,287 @@
+"""Потоковое чтение logcat: разбор threadtime, кольцевой буфер с индексами по тегу, PID и уровню"""
+import collections
+import heapq
+import re
+import subprocess
+import sys
+import threading
+
+# MM-DD HH:MM:SS.mmm  PID  TID L TAG: сообщение
+THREADTIME_LINE = re.compile(r'^(\d\d-\d\d \d\d:\d\d:\d\d\.\d+)\s+(\d+)\s+(\d+)\s+([VDIWEFS])\s+(.*?)\s*: (.*)$')
+
+# Уровни по возрастанию важности
+LEVELS = 'VDIWEF'
+LEVEL_RANK = {level: rank for rank, level in enumerate(LEVELS)}
+# Для самых частых уровней индекс не нужен: подходит почти каждая запись
+INDEXED_LEVELS = 'WEF'
+
+# Записей в буфере по умолчанию
+DEFAULT_CAPACITY = 100000
+
+# Поля записи (кортеж): номер, время, pid, tid, уровень, тег, сообщение
+SEQ, TIME, PID, TID, LEVEL, TAG, MESSAGE = range(7)
+
+
+def parse_threadtime(line, seq):
+    """Запись из строки `logcat -v threadtime` или None для служебных строк"""
+    match = THREADTIME_LINE.match(line)
+    if not match:
+        return None
+    time_str, pid, tid, level, tag, message = match.groups()
+    # Одинаковые теги повторяются тысячи раз: храним одну строку
+    return (seq, time_str, int(pid), int(tid), level, sys.intern(tag), message)
+
+
+class LogBuffer:
+    """Последние capacity записей и индексы номеров записей по тегу, PID и уровню.
+
+    Индексы - очереди номеров по возрастанию: номер вытесняемой записи всегда
+    в начале своей очереди, поэтому вытеснение стоит O(1), а память индексов
+    ограничена размером буфера.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.records = [None] * capacity
+        self.next_seq = 0
+        self.by_tag = {}
+        self.by_pid = {}
+        self.by_level = {level: collections.deque() for level in INDEXED_LEVELS}
+        self.lock = threading.Lock()
+
+    @property
+    def first_seq(self):
+        return max(0, self.next_seq - self.capacity)
+
+    def add_line(self, line):
+        with self.lock:
+            record = parse_threadtime(line, self.next_seq)
+            if record is None:
+                return None
+            self.add(record)
+            return record
+
+    def add(self, record):
+        seq = record[SEQ]
+        slot = seq % self.capacity
+        old = self.records[slot]
+        if old is not None:
+            # Номера в индексах растут, поэтому вытесняемая запись всегда первая
+            self._unindex(self.by_tag, old[TAG])
+            self._unindex(self.by_pid, old[PID])
+            if old[LEVEL] in self.by_level:
+                self.by_level[old[LEVEL]].popleft()
+        self.records[slot] = record
+        self.next_seq = seq + 1
+        self._index(self.by_tag, record[TAG], seq)
+        self._index(self.by_pid, record[PID], seq)
+        if record[LEVEL] in self.by_level:
+            self.by_level[record[LEVEL]].append(seq)
+
+    @staticmethod
+    def _index(index, key, seq):
+        entries = index.get(key)
+        if entries is None:
+            entries = index[key] = collections.deque()
+        entries.append(seq)
+
+    @staticmethod
+    def _unindex(index, key):
+        entries = index[key]
+        entries.popleft()
+        if not entries:
+            del index[key]
+
+    def get(self, seq):
+        if seq < self.first_seq or seq >= self.next_seq:
+            return None
+        return self.records[seq % self.capacity]
+
+    def last_records(self):
+        """Последние записи буфера с одинаковым временем (время последней записи), по порядку"""
+        with self.lock:
+            result = []
+            for seq in range(self.next_seq - 1, self.first_seq - 1, -1):
+                record = self.records[seq % self.capacity]
+                if result and record[TIME] != result[-1][TIME]:
+                    break
+                result.append(record)
+            result.reverse()
+            return result
+
+    def clear(self):
+        with self.lock:
+            self.records = [None] * self.capacity
+            self.next_seq = 0
+            self.by_tag.clear()
+            self.by_pid.clear()
+            for index in self.by_level.values():
+                index.clear()
+
+    @staticmethod
+    def _since(index, start):
+        """Номера индекса не меньше start: проход с конца, чтобы дозагрузка новых записей была дешёвой"""
+        result = []
+        for seq in reversed(index):
+            if seq < start:
+                break
+            result.append(seq)
+        result.reverse()
+        return result
+
+    def candidates(self, log_filter, start=0):
+        """Номера записей (по возрастанию, от start), среди которых ищутся подходящие под фильтр"""
+        start = max(start, self.first_seq)
+        if log_filter.tag is not None:
+            return self._since(self.by_tag.get(log_filter.tag, ()), start)
+        if log_filter.pid is not None:
+            return self._since(self.by_pid.get(log_filter.pid, ()), start)
+        if log_filter.min_level in INDEXED_LEVELS:
+            levels = [self._since(self.by_level[level], start) for level in INDEXED_LEVELS
+                      if LEVEL_RANK[level] >= LEVEL_RANK[log_filter.min_level]]
+            return list(heapq.merge(*levels))
+        return range(start, self.next_seq)
+
+    def query(self, log_filter, start=0):
+        """Номера подходящих записей начиная с start"""
+        with self.lock:
+            result = []
+            for seq in self.candidates(log_filter, start):
+                record = self.records[seq % self.capacity]
+                if log_filter.matches(record):
+                    result.append(seq)
+            return result, self.next_seq
+
+
+class LogFilter:
+    """Фильтр записей; пустые поля не ограничивают выборку"""
+
+    def __init__(self, tag=None, pid=None, min_level='V', text=None):
+        self.tag = tag or None
+        self.pid = pid
+        self.min_level = min_level if min_level in LEVEL_RANK else 'V'
+        self.text = text.lower() if text else None
+
+    def matches(self, record):
+        if self.tag is not None and record[TAG] != self.tag:
+            return False
+        if self.pid is not None and record[PID] != self.pid:
+            return False
+        if LEVEL_RANK.get(record[LEVEL], 0) < LEVEL_RANK[self.min_level]:
+            return False
+        if self.text is not None and self.text not in record[MESSAGE].lower() and self.text not in record[TAG].lower():
+            return False
+        return True
+
+
+class FilteredView:
+    """Номера записей под текущий фильтр; новые записи проверяются инкрементально"""
+
+    def __init__(self, buffer, log_filter=None):
+        self.buffer = buffer
+        self.matched = []
+        self.checked = 0
+        self.set_filter(log_filter or LogFilter())
+
+    def set_filter(self, log_filter):
+        """Смена фильтра: выборка строится заново по индексу"""
+        self.log_filter = log_filter
+        self.matched, self.checked = self.buffer.query(log_filter)
+
+    def refresh(self):
+        """Добавление новых подходящих записей и удаление вытесненных; True, если что-то изменилось"""
+        if self.checked > self.buffer.next_seq:
+            # Буфер очищен
+            self.set_filter(self.log_filter)
+            return True
+        changed = False
+        if self.checked < self.buffer.next_seq:
+            found, self.checked = self.buffer.query(self.log_filter, self.checked)
+            if found:
+                self.matched.extend(found)
+                changed = True
+        first = self.buffer.first_seq
+        if self.matched and self.matched[0] < first:
+            # Номера растут: вытесненные всегда в начале списка
+            drop = 0
+            while drop < len(self.matched) and self.matched[drop] < first:
+                drop += 1
+            del self.matched[:drop]
+            changed = True
+        return changed
+
+    def __len__(self):
+        return len(self.matched)
+
+    def window(self, start, count):
+        """Записи для видимых строк [start, start + count)"""
+        records = []
+        for seq in self.matched[start:start + count]:
+            record = self.buffer.get(seq)
+            if record is not None:
+                records.append(record)
+        return records
+
+
+class LogcatReader:
+    """`adb logcat -v threadtime` в фоне; строки попадают в буфер, on_lines() - после каждой записи.
+
+    Если в буфере уже есть записи (перезапуск чтения того же устройства),
+    чтение продолжается с времени последней записи, а не с хвоста из tail
+    строк; записи этого времени, которые уже есть в буфере, пропускаются.
+    """
+
+    def __init__(self, adb_path, serial, buffer, on_lines=None, tail=1000):
+        self.adb_path = adb_path
+        self.serial = serial
+        self.buffer = buffer
+        self.on_lines = on_lines
+        self.tail = tail
+        self.process = None
+        self.resume_time = None
+        self.seen = None
+
+    def start(self):
+        args = [self.adb_path]
+        if self.serial:
+            args += ['-s', self.serial]
+        last = self.buffer.last_records()
+        if last:
+            self.resume_time = last[-1][TIME]
+            self.seen = collections.Counter(record[TIME:] for record in last)
+            args += ['logcat', '-v', 'threadtime', '-T', self.resume_time]
+        else:
+            args += ['logcat', '-v', 'threadtime', '-T', str(self.tail)]
+        self.process = subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL)
+        threading.Thread(target=self._read, args=(self.process,), daemon=True).start()
+        return self
+
+    def _read(self, process):
+        seen = self.seen
+        for raw in iter(process.stdout.readline, b''):
+            line = raw.decode('utf-8', errors='replace').rstrip('\r\n')
+            if seen:
+                record = parse_threadtime(line, 0)
+                if record is not None:
+                    if record[TIME] != self.resume_time:
+                        # Записи с момента продолжения кончились: дальше всё новое
+                        seen = None
+                    elif seen[record[TIME:]] > 0:
+                        seen[record[TIME:]] -= 1
+                        continue
+            if self.buffer.add_line(line) and self.on_lines:
+                self.on_lines()
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self):
+        process = self.process
+        self.process = None
+        if process is not None and process.poll() is None:
+            try:
+                process.kill()
+                process.wait(timeout=5)
+            except Exception:
+                pass
@@ -0,0 +1,220 @@
+"""Профилировщик питания: ток, напряжение и заряд батареи из /sys/class/power_supply потоком
+с одного `adb shell`, интегрирование энергии и заряда за сессию, выгрузка трассы"""
+import csv
+import json
+import math
+import time
+from array import array
+
+from sampler import ShellStream, UptimeClock
+
+# Цикл на устройстве: файлы читаются встроенной командой read, процесс за итерацию
+# только один - sleep, поэтому сам замер почти не нагружает CPU. Строки вывода:
+#   B <имя источника>                                  - один раз
+#   P <uptime> <ток мкА> <напряжение мкВ> <заряд мкАч> <статус, может содержать пробелы>
+# Недоступное значение выводится как x.
+POWER_SCRIPT = '''exec 2>/dev/null
+p={period}; b=""
+for d in /sys/class/power_supply/*; do
+    t=""; read t < $d/type
+    if [ "$t" = Battery ] && [ -r $d/current_now ]; then b=$d; break; fi
+done
+[ -n "$b" ] || b=/sys/class/power_supply/battery
+echo "B ${{b##*/}}" || exit
+while :; do
+    read up _ < /proc/uptime
+    i=""; v=""; c=""; s=""
+    read i < $b/current_now; read v < $b/voltage_now
+    read c < $b/charge_counter; read s < $b/status
+    echo "P $up ${{i:-x}} ${{v:-x}} ${{c:-x}} ${{s:-x}}" || exit
+    sleep $p
+done
+'''
+
+# Допустимая частота выборок, Гц: контроллер заряда обновляет ток обычно не чаще
+MIN_RATE_HZ = 1
+MAX_RATE_HZ = 50
+
+# Пропуск в потоке длиннее этого не интегрируется (устройство засыпало, adb отставал), сек
+MAX_GAP = 5.0
+
+# Выборок в трассе сессии; интегрирование продолжается и после заполнения
+TRACE_LIMIT = 1000000
+
+# Колонки выгрузки трассы
+TRACE_FIELDS = ['uptime', 'current_ma', 'voltage_v', 'power_mw', 'charge_counter_mah']
+
+# Статусы, при которых ток идёт в батарею
+CHARGING_STATUSES = ('Charging', 'Full')
+
+
+def build_power_script(rate_hz):
+    rate_hz = min(max(rate_hz, MIN_RATE_HZ), MAX_RATE_HZ)
+    return POWER_SCRIPT.format(period=f"{1.0 / rate_hz:.4f}")
+
+
+def draw_current_ma(raw_ua, status):
+    """Ток разряда в мА: положительный - батарея отдаёт, отрицательный - заряжается.
+
+    Знак current_now у производителей разный, поэтому направление берётся из
+    статуса; без статуса - соглашение Android (отрицательный ток - разряд).
+    """
+    current = raw_ua / 1000.0
+    if status in CHARGING_STATUSES:
+        return -abs(current)
+    if status in ('Discharging', 'Not charging'):
+        return abs(current)
+    return -current
+
+
+class PowerStreamParser:
+    """Разбор строк профилировщика в записи {'ts', 'uptime', 'current_ma', 'voltage_v', 'power_mw', ...}"""
+
+    def __init__(self):
+        self.clock = UptimeClock()
+        self.source = None
+
+    def feed(self, line, received=None):
+        """Запись для строки P с известными током и напряжением, иначе None"""
+        parts = line.split()
+        if not parts:
+            return None
+        if parts[0] == 'B' and len(parts) > 1:
+            self.source = parts[1]
+            return None
+        if parts[0] != 'P' or len(parts) < 6 or 'x' in (parts[2], parts[3]):
+            return None
+        try:
+            uptime = float(parts[1])
+            status = ' '.join(parts[5:])
+            current_ma = draw_current_ma(int(parts[2]), status)
+            voltage_v = int(parts[3]) / 1000000.0
+            charge = int(parts[4]) / 1000.0 if parts[4] != 'x' else None
+        except ValueError:
+            return None
+        received = time.time() if received is None else received
+        return {
+            'ts': round(self.clock.host_time(uptime, received), 3),
+            'uptime': uptime,
+            'current_ma': current_ma,
+            'voltage_v': voltage_v,
+            'power_mw': current_ma * voltage_v,
+            'charge_counter_mah': charge,
+            'status': status,
+        }
+
+
+class PowerSession:
+    """Накопление сессии: энергия и заряд методом трапеций по uptime устройства,
+    средняя и пиковая мощность, трасса в колонках array"""
+
+    def __init__(self, trace_limit=TRACE_LIMIT):
+        self.trace_limit = trace_limit
+        self.trace = {field: array('d') for field in TRACE_FIELDS}
+        self.samples = 0
+        self.energy_mwh = 0.0
+        self.charge_mah = 0.0
+        self.duration = 0.0
+        self.peak_mw = None
+        self.min_mw = None
+        self.first_counter = None
+        self.last_counter = None
+        self.prev = None
+
+    def add(self, sample):
+        uptime = sample['uptime']
+        power = sample['power_mw']
+        current = sample['current_ma']
+        if self.prev is not None:
+            dt = uptime - self.prev[0]
+            if 0 < dt <= MAX_GAP:
+                self.energy_mwh += (power + self.prev[1]) / 2 * dt / 3600
+                self.charge_mah += (current + self.prev[2]) / 2 * dt / 3600
+                self.duration += dt
+        self.prev = (uptime, power, current)
+        self.samples += 1
+        if self.peak_mw is None or power > self.peak_mw:
+            self.peak_mw = power
+        if self.min_mw is None or power < self.min_mw:
+            self.min_mw = power
+        counter = sample.get('charge_counter_mah')
+        if counter is not None:
+            if self.first_counter is None:
+                self.first_counter = counter
+            self.last_counter = counter
+        if self.samples <= self.trace_limit:
+            trace = self.trace
+            trace['uptime'].append(uptime)
+            trace['current_ma'].append(current)
+            trace['voltage_v'].append(sample['voltage_v'])
+            trace['power_mw'].append(power)
+            trace['charge_counter_mah'].append(math.nan if counter is None else counter)
+
+    def summary(self):
+        """Итог сессии; gauge_mah - расход по счётчику заряда контроллера для сверки"""
+        result = {
+            'samples': self.samples,
+            'duration_s': self.duration,
+            'energy_mwh': self.energy_mwh,
+            'charge_mah': self.charge_mah,
+            'avg_mw': self.energy_mwh * 3600 / self.duration if self.duration > 0 else None,
+            'avg_ma': self.charge_mah * 3600 / self.duration if self.duration > 0 else None,
+            'peak_mw': self.peak_mw,
+            'min_mw': self.min_mw,
+            'truncated': self.samples > self.trace_limit,
+        }
+        if self.first_counter is not None:
+            result['gauge_mah'] = self.first_counter - self.last_counter
+        return result
+
+    def rows(self):
+        trace = self.trace
+        for i in range(len(trace['uptime'])):
+            row = {field: trace[field][i] for field in TRACE_FIELDS}
+            if math.isnan(row['charge_counter_mah']):
+                row['charge_counter_mah'] = None
+            yield row
+
+    def export(self, path):
+        """Трасса в CSV (по расширению .csv) или JSON Lines; число записанных выборок"""
+        count = 0
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            if path.lower().endswith('.csv'):
+                writer = csv.DictWriter(f, TRACE_FIELDS)
+                writer.writeheader()
+                for row in self.rows():
+                    writer.writerow(row)
+                    count += 1
+            else:
+                for row in self.rows():
+                    f.write(json.dumps(row) + '\n')
+                    count += 1
+        return count
+
+
+class PowerProfiler(ShellStream):
+    """Цикл профилировщика питания на устройстве и его сессия"""
+
+    def __init__(self, adb_path, serial, rate_hz=10, on_sample=None):
+        super().__init__(adb_path, serial, build_power_script(rate_hz), PowerStreamParser, on_sample)
+        self.rate_hz = rate_hz
+        self.session = PowerSession()
+
+    def handle(self, sample):
+        self.session.add(sample)
+
+    @property
+    def source(self):
+        return self.parser.source if self.parser else None
+
+
+def format_power_summary(summary, source=None):
+    if not summary['samples']:
+        return "🔋 Ожидание данных о токе батареи..."
+    avg = f"{summary['avg_mw']:.0f} мВт ({summary['avg_ma']:.0f} мА)" if summary['avg_mw'] is not None else "-"
+    text = (f"🔋 {source or 'battery'}: {summary['samples']} выборок за {summary['duration_s']:.0f} с\n"
+            f"⚡ Средняя: {avg} | пик {summary['peak_mw']:.0f} мВт | минимум {summary['min_mw']:.0f} мВт\n"
+            f"🔌 Израсходовано: {summary['energy_mwh']:.2f} мВт·ч, {summary['charge_mah']:.2f} мА·ч")
+    if 'gauge_mah' in summary:
+        text += f" (счётчик заряда: {summary['gauge_mah']:.2f} мА·ч)"
+    return text
@@ -0,0 +1,89 @@
+"""Монитор процессов: разбор /proc/[pid]/stat и statm всех процессов и загрузка CPU по разнице"""
+import heapq
+
+# Поля /proc/[pid]/stat после "(comm)": state - 0, utime - 11, stime - 12, starttime - 19
+STAT_STATE = 0
+STAT_UTIME = 11
+STAT_STIME = 12
+STAT_STARTTIME = 19
+
+# Размер страницы, если getconf недоступен
+DEFAULT_PAGE_SIZE = 4096
+
+
+def parse_process_line(line):
+    """(pid, имя, состояние, тики CPU, starttime, rss в страницах) из строки "stat rss" или None"""
+    # Имя процесса в скобках может содержать пробелы и скобки: ищем последнюю ")"
+    close = line.rfind(')')
+    open_ = line.find('(')
+    if open_ < 0 or close < open_:
+        return None
+    try:
+        pid = int(line[:open_])
+        fields = line[close + 2:].split()
+        ticks = int(fields[STAT_UTIME]) + int(fields[STAT_STIME])
+        return (pid, line[open_ + 1:close], fields[STAT_STATE], ticks,
+                int(fields[STAT_STARTTIME]), int(fields[-1]))
+    except (ValueError, IndexError):
+        return None
+
+
+def parse_processes_output(output):
+    """(счётчики CPU системы или None, размер страницы, [строки процессов])"""
+    total = None
+    page_size = DEFAULT_PAGE_SIZE
+    processes = []
+    for line in (output or "").split('\n'):
+        if line.startswith('T '):
+            try:
+                total = sum(int(x) for x in line.split()[1:])
+            except ValueError:
+                total = None
+        elif line.startswith('P '):
+            value = line[2:].strip()
+            if value.isdigit():
+                page_size = int(value)
+        elif line:
+            parsed = parse_process_line(line)
+            if parsed is not None:
+                processes.append(parsed)
+    return total, page_size, processes
+
+
+class ProcessTable:
+    """Прошлый снимок процессов одного устройства для расчёта загрузки.
+
+    Процесс определяется парой (pid, starttime): если pid переиспользован
+    новым процессом, у него другой starttime и прошлые тики не учитываются.
+    Завершившиеся процессы просто не попадают в новый снимок.
+    """
+
+    def __init__(self):
+        self.ticks = {}
+        self.total = None
+
+    def update(self, output):
+        """[(загрузка CPU % или None, pid, имя, состояние, rss в МБ)] и число процессов"""
+        total, page_size, processes = parse_processes_output(output)
+        total_diff = total - self.total if total is not None and self.total is not None else 0
+        prev = self.ticks
+        ticks = {}
+        rows = []
+        mb = page_size / (1024 * 1024)
+        for pid, name, state, cpu_ticks, starttime, rss in processes:
+            key = (pid, starttime)
+            ticks[key] = cpu_ticks
+            before = prev.get(key)
+            cpu = None
+            if before is not None and total_diff > 0:
+                cpu = 100 * (cpu_ticks - before) / total_diff
+            rows.append((cpu, pid, name, state, rss * mb))
+        self.ticks = ticks
+        if total is not None:
+            self.total = total
+        return rows, len(rows)
+
+
+def top_processes(rows, n=20):
+    """N процессов с наибольшей загрузкой CPU (без данных - в конце, по RSS)"""
+    return heapq.nlargest(n, rows, key=lambda row: (row[0] is not None, row[0] or 0.0, row[4]))
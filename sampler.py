@@ -0,0 +1,203 @@
+"""Высокочастотный сбор CPU/RAM/температур циклом на самом устройстве с потоковым разбором"""
+import subprocess
+import threading
+import time
+
+# Цикл на устройстве читает /proc встроенной командой read, без запуска процессов;
+# процесс за итерацию только один - sleep. Строки вывода:
+#   Z <тип зоны>...                       - один раз, типы термозон по порядку
+#   S <uptime> <8 счётчиков cpu> <MemTotal> <MemAvailable>
+#   T <uptime> <температура зоны>...      - раз в thermal_every выборок
+SAMPLER_SCRIPT = '''exec 2>/dev/null
+p={period}; k={thermal_every}; n=0
+zones=""; types=""
+for z in /sys/class/thermal/thermal_zone*; do
+    [ -r $z/temp ] || continue
+    ty=""; read ty < $z/type
+    zones="$zones $z/temp"; types="$types ${{ty:-${{z##*/}}}}"
+done
+echo "Z$types" || exit
+while :; do
+    read up _ < /proc/uptime
+    read _ u ni sy id io irq sirq st _ < /proc/stat
+    {{ read _ mt _; read _ mf _; read key ma _; }} < /proc/meminfo
+    [ "$key" = MemAvailable: ] || ma=$mf
+    echo "S $up $u $ni $sy $id $io $irq $sirq ${{st:-0}} $mt $ma" || exit
+    if [ $((n % k)) -eq 0 ] && [ -n "$zones" ]; then
+        t="T $up"
+        for z in $zones; do v=""; read v < $z; t="$t ${{v:-x}}"; done
+        echo "$t" || exit
+    fi
+    n=$((n + 1))
+    sleep $p
+done
+'''
+
+# Допустимая частота выборок, Гц
+MIN_RATE_HZ = 1
+MAX_RATE_HZ = 100
+
+
+def build_sampler_script(rate_hz, thermal_hz=1):
+    """Скрипт цикла для частоты rate_hz; термозоны читаются примерно с частотой thermal_hz"""
+    rate_hz = min(max(rate_hz, MIN_RATE_HZ), MAX_RATE_HZ)
+    thermal_every = max(int(round(rate_hz / thermal_hz)), 1) if thermal_hz else 1 << 30
+    return SAMPLER_SCRIPT.format(period=f"{1.0 / rate_hz:.4f}", thermal_every=thermal_every)
+
+
+def thermal_celsius(raw):
+    """Температура зоны: миллиградусы на большинстве ядер, градусы на некоторых старых"""
+    value = int(raw)
+    return value / 1000.0 if abs(value) >= 1000 else float(value)
+
+
+class UptimeClock:
+    """Перевод uptime устройства во время компьютера по наименьшему наблюдаемому сдвигу,
+    чтобы задержка доставки строк не искажала интервалы между выборками"""
+
+    def __init__(self):
+        self.offset = None
+
+    def host_time(self, uptime, received):
+        offset = received - uptime
+        if self.offset is None or offset < self.offset:
+            self.offset = offset
+        return uptime + self.offset
+
+
+class SampleStreamParser:
+    """Разбор строк сэмплера в записи {'ts', 'uptime', 'cpu', 'ram', ...}.
+
+    Загрузка CPU считается по разнице с прошлой строкой, время устройства
+    (uptime) переводится во время компьютера по наименьшему наблюдаемому
+    сдвигу, чтобы задержка доставки не искажала интервалы между выборками.
+    """
+
+    def __init__(self):
+        self.zone_types = []
+        self.prev_total = None
+        self.prev_idle = None
+        self.clock = UptimeClock()
+        self.temps = {}
+
+    def feed(self, line, received=None):
+        """Запись для строки S, иначе None (строки Z и T обновляют состояние)"""
+        parts = line.split()
+        if not parts:
+            return None
+        received = time.time() if received is None else received
+        try:
+            if parts[0] == 'Z':
+                self.zone_types = parts[1:]
+                return None
+            if parts[0] == 'T':
+                temps = {}
+                for zone, raw in zip(self.zone_types, parts[2:]):
+                    if raw != 'x':
+                        temps[zone] = thermal_celsius(raw)
+                self.temps = temps
+                return None
+            if parts[0] != 'S' or len(parts) < 12:
+                return None
+
+            uptime = float(parts[1])
+            counters = [int(x) for x in parts[2:10]]
+            mem_total, mem_available = int(parts[10]), int(parts[11])
+        except ValueError:
+            return None
+
+        # Как и в parse_cpu_usage: всего - первые 7 счётчиков, простой - idle
+        total = sum(counters[:7])
+        idle = counters[3]
+        cpu = None
+        if self.prev_total is not None and total > self.prev_total:
+            total_diff = total - self.prev_total
+            cpu = 100 * (total_diff - (idle - self.prev_idle)) / total_diff
+        self.prev_total = total
+        self.prev_idle = idle
+
+        sample = {
+            'ts': round(self.clock.host_time(uptime, received), 3),
+            'uptime': uptime,
+            'cpu': cpu,
+            'ram_used_mb': (mem_total - mem_available) // 1024,
+            'ram_total_mb': mem_total // 1024,
+            'ram': 100 * (mem_total - mem_available) / mem_total if mem_total else None,
+        }
+        if self.temps:
+            sample['thermal'] = self.temps
+        return sample
+
+
+class ShellStream:
+    """Один `adb shell` со скриптом-циклом script на устройстве: строки вывода разбирает
+    parser_factory().feed(), записи передаются в on_sample(serial, sample)"""
+
+    def __init__(self, adb_path, serial, script, parser_factory, on_sample=None):
+        self.adb_path = adb_path
+        self.serial = serial
+        self.script = script
+        self.parser_factory = parser_factory
+        self.on_sample = on_sample
+        self.process = None
+        self.parser = None
+        self.samples = 0
+        self.started_at = None
+
+    def handle(self, sample):
+        """Учёт выборки до передачи в on_sample (в потоке чтения)"""
+
+    def start(self):
+        args = [self.adb_path]
+        if self.serial:
+            args += ['-s', self.serial]
+        args += ['shell', self.script]
+        self.process = subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, bufsize=0)
+        self.started_at = time.monotonic()
+        threading.Thread(target=self._read, args=(self.process,), daemon=True).start()
+        return self
+
+    def _read(self, process):
+        parser = self.parser = self.parser_factory()
+        for raw in iter(process.stdout.readline, b''):
+            sample = parser.feed(raw.decode('utf-8', errors='ignore'))
+            if sample is None:
+                continue
+            self.samples += 1
+            self.handle(sample)
+            if self.on_sample:
+                try:
+                    self.on_sample(self.serial, sample)
+                except Exception:
+                    pass
+
+    def is_alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def achieved_rate(self):
+        """Фактическая частота выборок с момента запуска, Гц"""
+        if not self.started_at:
+            return 0.0
+        elapsed = time.monotonic() - self.started_at
+        return self.samples / elapsed if elapsed > 0 else 0.0
+
+    def stop(self):
+        """Закрытие adb shell; цикл на устройстве завершается на первой же записи в закрытый вывод"""
+        process = self.process
+        self.process = None
+        if process is not None and process.poll() is None:
+            try:
+                process.kill()
+                process.wait(timeout=5)
+            except Exception:
+                pass
+
+
+class DeviceSampler(ShellStream):
+    """Цикл сэмплера CPU/RAM/температур на устройстве"""
+
+    def __init__(self, adb_path, serial, rate_hz=20, on_sample=None, thermal_hz=1):
+        super().__init__(adb_path, serial, build_sampler_script(rate_hz, thermal_hz), SampleStreamParser, on_sample)
+        self.rate_hz = rate_hz
+        self.thermal_hz = thermal_hz
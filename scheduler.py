@@ -0,0 +1,112 @@
+"""Расписание опроса метрик: свой интервал у каждой метрики, отступ при ошибках"""
+import threading
+import time
+
+# Сглаживание измеренного интервала между опросами
+RATE_SMOOTHING = 0.2
+
+
+class MetricScheduler:
+    """Расписание метрик одного устройства.
+
+    Опоздавшая метрика выполняется один раз, пропущенные тики не копятся:
+    следующий срок сдвигается вперёд, а пропуск учитывается в статистике.
+    """
+
+    def __init__(self, intervals, backoff_base=1.0, backoff_max=30.0):
+        self.intervals = dict(intervals)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.next_due = {name: 0.0 for name in self.intervals}
+        self.last_run = {}
+        self.measured = {}
+        self.runs = {name: 0 for name in self.intervals}
+        self.skipped = {name: 0 for name in self.intervals}
+        # Метрики, которые сейчас не опрашиваются (выключены или идут из другого источника)
+        self.deferred = set()
+        self.failures = 0
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def due(self, now=None):
+        """Метрики, которые пора опросить"""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            if now < self.blocked_until:
+                return []
+            return [name for name, due_at in self.next_due.items() if due_at <= now]
+
+    def next_deadline(self):
+        """Ближайший момент, когда что-то станет нужно опросить"""
+        with self.lock:
+            return max(min(self.next_due.values(), default=0.0), self.blocked_until)
+
+    def completed(self, names, now=None):
+        """Успешный опрос метрик"""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            self.failures = 0
+            self.blocked_until = 0.0
+            for name in names:
+                self.deferred.discard(name)
+                interval = self.intervals[name]
+                due_at = self.next_due[name] + interval
+                if name not in self.last_run:
+                    due_at = now + interval
+                elif due_at <= now:
+                    # Опоздали больше чем на интервал: пропускаем тики, а не догоняем
+                    missed = int((now - due_at) // interval) + 1
+                    self.skipped[name] += missed
+                    due_at += missed * interval
+                self.next_due[name] = due_at
+
+                previous = self.last_run.get(name)
+                if previous is not None and now > previous:
+                    elapsed = now - previous
+                    smoothed = self.measured.get(name, elapsed)
+                    self.measured[name] = smoothed + RATE_SMOOTHING * (elapsed - smoothed)
+                self.last_run[name] = now
+                self.runs[name] += 1
+
+    def postpone(self, names, now=None):
+        """Метрики, которым подошёл срок, но которые не опрашивались: следующий срок через интервал,
+        без учёта в достигнутой частоте и пропусках; после возобновления частота меряется заново"""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            for name in names:
+                self.next_due[name] = now + self.intervals[name]
+                self.last_run.pop(name, None)
+                self.measured.pop(name, None)
+                self.deferred.add(name)
+
+    def failed(self, now=None):
+        """Устройство не ответило: экспоненциальный отступ"""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            delay = min(self.backoff_base * (2 ** self.failures), self.backoff_max)
+            self.failures += 1
+            self.blocked_until = now + delay
+            return delay
+
+    def report(self):
+        """{метрика: (целевая частота, достигнутая частота, пропуски)} в Гц; отложенные метрики не входят"""
+        with self.lock:
+            result = {}
+            for name, interval in self.intervals.items():
+                if name in self.deferred:
+                    continue
+                measured = self.measured.get(name)
+                achieved = 1.0 / measured if measured else 0.0
+                result[name] = (1.0 / interval, achieved, self.skipped[name])
+            return result
+
+
+def format_rate_report(report):
+    """Отчёт о частоте опроса одной строкой"""
+    parts = []
+    for name, (target, achieved, skipped) in report.items():
+        text = f"{name} {achieved:.2g}/{target:.2g} Гц"
+        if skipped:
+            text += f" (пропусков {skipped})"
+        parts.append(text)
+    return " | ".join(parts)
@@ -0,0 +1,265 @@
+"""Запись сырых команд ADB и их вывода в сжатый файл сессии и воспроизведение без устройства"""
+import collections
+import gzip
+import json
+import threading
+import time
+import zlib
+
+from adb_batch import SECTION_PREFIX, SECTION_SUFFIX, split_batch_output, parse_batch_metrics
+from adb_session import parse_shell_command
+
+# Версия формата записи; заголовок пишется в начале каждого запуска записи
+FORMAT = "adbmon-session"
+FORMAT_VERSION = 1
+
+# Как часто сбрасывать сжатый поток на диск, сек: после сбоя теряется не больше
+FLUSH_INTERVAL = 1.0
+
+# Ответ для команд, которых не было в записи
+NOT_RECORDED = "❌ Команда отсутствует в записи"
+FINISHED = "⏹️ Запись закончилась"
+
+# Сигнатура начала члена gzip (ID1, ID2, CM=deflate) и порция распаковки, байт
+GZIP_MAGIC = b'\x1f\x8b\x08'
+DECODE_CHUNK = 4096
+
+# После последней записи воспроизведение в реальном времени ещё столько секунд отдаёт последнее состояние
+FINISH_GRACE = 2.0
+
+
+class SessionRecorder:
+    """Дозапись команд в gzip: каждый запуск - отдельный член gzip-потока, файл только растёт.
+
+    Записи - строки JSON: t - время начала команды, d - длительность, s - устройство,
+    c - команда, o - вывод, e - ошибка. Если вывод совпал с прошлым выводом той же
+    команды на том же устройстве, вместо o пишется r: 1.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = gzip.open(path, 'ab', compresslevel=6)
+        self.lock = threading.Lock()
+        self.last_output = {}
+        self.last_flush = time.monotonic()
+        self.count = 0
+        self._write({'format': FORMAT, 'version': FORMAT_VERSION, 'started': round(time.time(), 3)})
+
+    def _write(self, entry):
+        self.file.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n')
+
+    def record(self, serial, cmd, output, error, started, duration):
+        entry = {'t': round(started, 4), 'd': round(duration, 4), 's': serial, 'c': cmd}
+        with self.lock:
+            if self.file is None:
+                return
+            key = (serial, cmd)
+            if error is not None:
+                entry['e'] = error
+            elif output is not None and self.last_output.get(key) == output:
+                entry['r'] = 1
+            else:
+                entry['o'] = output
+                self.last_output[key] = output
+            self._write(entry)
+            self.count += 1
+            now = time.monotonic()
+            if now - self.last_flush >= FLUSH_INTERVAL:
+                # Синхронизирующий сброс: записанное читается, даже если процесс упадёт
+                self.file.flush()
+                self.last_flush = now
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+def decode_member(data, pos):
+    """(распакованные байты, начало следующего члена или None) для члена gzip с позиции pos.
+
+    Член, который не был закрыт (процесс упал во время записи), отдаёт всё,
+    что успело попасть на диск: ошибочная порция повторяется по байту.
+    """
+    decoder = zlib.decompressobj(wbits=31)
+    parts = []
+    for start in range(pos, len(data), DECODE_CHUNK):
+        chunk = data[start:start + DECODE_CHUNK]
+        saved = decoder.copy()
+        try:
+            parts.append(decoder.decompress(chunk))
+        except zlib.error:
+            decoder = saved
+            for offset in range(len(chunk)):
+                try:
+                    parts.append(decoder.decompress(chunk[offset:offset + 1]))
+                except zlib.error:
+                    break
+            return b''.join(parts), None
+        if decoder.eof:
+            return b''.join(parts), start + len(chunk) - len(decoder.unused_data)
+    return b''.join(parts), None
+
+
+def find_member(data, start):
+    """Начало следующего запуска записи после оборванного члена: сигнатура gzip, распаковка которой
+    начинается с заголовка сессии (совпадение сигнатуры внутри сжатых данных отбрасывается)"""
+    while True:
+        pos = data.find(GZIP_MAGIC, start)
+        if pos < 0:
+            return None
+        try:
+            head = zlib.decompressobj(wbits=31).decompress(data[pos:pos + DECODE_CHUNK])
+        except zlib.error:
+            head = b''
+        if head.startswith(b'{"format":'):
+            return pos
+        start = pos + 1
+
+
+def read_session(path):
+    """Записи сессии по порядку с восстановленным выводом (o) для повторов.
+
+    Запуск, оборванный сбоем, читается до последнего сброса на диск, а
+    следующие запуски, дописанные после него, - полностью.
+    """
+    last_output = {}
+    with open(path, 'rb') as f:
+        data = f.read()
+    pos = 0
+    while pos is not None and pos < len(data):
+        text, next_pos = decode_member(data, pos)
+        if next_pos is None:
+            next_pos = find_member(data, pos + 1)
+        pos = next_pos
+        for raw in text.split(b'\n'):
+            if not raw:
+                continue
+            try:
+                entry = json.loads(raw)
+            except ValueError:
+                entry = None
+            if not isinstance(entry, dict) or 'c' not in entry:
+                # Заголовок запуска или недописанная строка в конце оборванного запуска
+                continue
+            key = (entry.get('s'), entry['c'])
+            if entry.pop('r', None):
+                entry['o'] = last_output.get(key)
+            elif 'o' in entry:
+                last_output[key] = entry['o']
+            yield entry
+
+
+def join_sections(sections):
+    """Вывод пакетного скрипта из секций {имя: текст}"""
+    return '\n'.join(f"{SECTION_PREFIX}{name}{SECTION_SUFFIX}\n{text}" for name, text in sections.items())
+
+
+class SessionReplay:
+    """Транспорт воспроизведения: ответы на команды берутся из записи.
+
+    Пакетные скрипты разбираются на секции, и ответ собирается по метрикам:
+    планировщик при воспроизведении может запросить другой набор метрик,
+    чем при записи. speed > 0 - воспроизведение в масштабе времени записи
+    (берётся последний ответ не позже часов воспроизведения, при опережении
+    команда ждёт), speed = 0 - по порядку записи без ожидания.
+    """
+
+    def __init__(self, path, speed=1.0):
+        self.path = path
+        self.speed = speed
+        self.commands = {}
+        self.sections = {}
+        self.batches = []
+        self.first_ts = None
+        self.last_ts = None
+        self.entries = 0
+        self.output_bytes = 0
+        for entry in read_session(path):
+            self._index(entry)
+        self.lock = threading.Lock()
+        self.started = None
+        self.served_ts = self.first_ts
+
+    def _index(self, entry):
+        t = entry['t']
+        self.entries += 1
+        self.output_bytes += len(entry.get('o') or "")
+        if self.first_ts is None:
+            self.first_ts = t
+        self.last_ts = t
+        shell_cmd = parse_shell_command(entry['c'])
+        metrics = parse_batch_metrics(shell_cmd) if shell_cmd else []
+        if metrics and 'e' not in entry:
+            sections = split_batch_output(entry.get('o') or "")
+            for name in metrics:
+                self.sections.setdefault((entry['s'], name), collections.deque()).append((t, sections.get(name, "")))
+            self.batches.append((entry['s'], metrics))
+        else:
+            self.commands.setdefault((entry['s'], entry['c']), collections.deque()).append(
+                (t, entry.get('o'), entry.get('e')))
+
+    def clock(self):
+        """Время записи, соответствующее текущему моменту воспроизведения"""
+        if self.started is None:
+            self.started = time.monotonic()
+        return self.first_ts + (time.monotonic() - self.started) * self.speed
+
+    def now(self):
+        if self.speed > 0 and self.first_ts is not None:
+            return self.clock()
+        return self.served_ts if self.served_ts is not None else time.time()
+
+    def finished(self):
+        if self.last_ts is None:
+            return True
+        if self.speed > 0:
+            return self.clock() > self.last_ts + FINISH_GRACE
+        return all(len(queue) <= 1 for queue in self.sections.values())
+
+    def _take(self, queue):
+        """(время, ответ) из очереди с учётом режима; последний ответ остаётся в очереди"""
+        if self.speed > 0:
+            target = self.clock()
+            while len(queue) > 1 and queue[1][0] <= target:
+                queue.popleft()
+            return queue[0]
+        return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def _wait(self, t):
+        if self.speed > 0:
+            delay = (t - self.first_ts) / self.speed - (time.monotonic() - self.started)
+            if delay > 0:
+                time.sleep(delay)
+
+    def command(self, cmd, serial=None):
+        """(output, error), как adb_command"""
+        if self.speed > 0 and self.finished():
+            return None, FINISHED
+        shell_cmd = parse_shell_command(cmd)
+        metrics = parse_batch_metrics(shell_cmd) if shell_cmd else []
+        with self.lock:
+            if metrics:
+                sections = {}
+                latest = None
+                for name in metrics:
+                    queue = self.sections.get((serial, name))
+                    if not queue:
+                        continue
+                    t, text = self._take(queue)
+                    sections[name] = text
+                    latest = t if latest is None else max(latest, t)
+                if latest is None:
+                    return None, NOT_RECORDED
+                result = (join_sections(sections), None)
+            else:
+                queue = self.commands.get((serial, cmd))
+                if not queue:
+                    return None, NOT_RECORDED
+                latest, output, error = self._take(queue)
+                result = (output, error)
+            if self.speed <= 0:
+                self.served_ts = latest
+        self._wait(latest)
+        return result
@@ -0,0 +1,12 @@
+"""Статистика серий замеров, общая для бенчмарков, кадров и оповещений"""
+
+
+def percentile(values, q):
+    """Перцентиль q (0-100) с линейной интерполяцией"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
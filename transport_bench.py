@@ -0,0 +1,198 @@
+"""Замер стоимости обращений к ADB: задержка команд, передача файлов, стоимость метрик"""
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import collectors
+from collectors import get_adb_path, run_shell, get_stats_via_adb, list_online_devices
+from adb_session import AdbSession
+from adb_protocol import AdbServerClient
+from adb_batch import collect_batch, TICK_METRICS
+from stats import percentile
+
+# Формат файла результатов; увеличивается при несовместимых изменениях
+RESULTS_FORMAT = 1
+
+# Тривиальная команда для замера задержки
+PING_COMMAND = "true"
+
+# Файл на устройстве для замера push/pull
+REMOTE_FILE = "/data/local/tmp/adbmon_xfer.bin"
+
+
+def latency_stats(samples):
+    """Сводка серии задержек в миллисекундах"""
+    if not samples:
+        return {'n': 0}
+    return {
+        'n': len(samples),
+        'min_ms': round(min(samples), 3),
+        'p50_ms': round(percentile(samples, 50), 3),
+        'p95_ms': round(percentile(samples, 95), 3),
+        'p99_ms': round(percentile(samples, 99), 3),
+        'max_ms': round(max(samples), 3),
+        'mean_ms': round(sum(samples) / len(samples), 3),
+    }
+
+
+def measure(call, repeats, warmup=2):
+    """Задержки call() в мс; call возвращает (output, error) как adb_command"""
+    samples = []
+    errors = 0
+    last_error = None
+    for i in range(warmup + repeats):
+        start = time.perf_counter()
+        try:
+            _, error = call()
+        except Exception as e:
+            error = str(e)
+        elapsed = (time.perf_counter() - start) * 1000
+        if error:
+            errors += 1
+            last_error = error
+        elif i >= warmup:
+            samples.append(elapsed)
+    result = latency_stats(samples)
+    if errors:
+        result['errors'] = errors
+        result['last_error'] = last_error
+    return result
+
+
+def spawn_shell(adb_path, serial, cmd):
+    """Новый процесс `adb shell` на каждую команду"""
+    result = subprocess.run([adb_path, '-s', serial, 'shell', cmd], capture_output=True, timeout=10)
+    if result.returncode != 0:
+        return None, result.stderr.decode('utf-8', errors='ignore').strip() or f"код {result.returncode}"
+    return result.stdout.decode('utf-8', errors='ignore'), None
+
+
+def server_shell(client, serial, cmd):
+    return client.shell(serial, cmd), None
+
+
+def bench_latency(adb_path, serial, repeats):
+    """Задержка тривиальной команды по каждому транспорту"""
+    results = {}
+    results['spawn'] = measure(lambda: spawn_shell(adb_path, serial, PING_COMMAND), repeats)
+
+    session = AdbSession(adb_path, serial)
+    try:
+        # Запуск сессии отдельно: это разовая цена, которую платит первый запрос
+        start = time.perf_counter()
+        _, error = session.run(PING_COMMAND, 10)
+        results['session_start_ms'] = None if error else round((time.perf_counter() - start) * 1000, 3)
+        results['session'] = measure(lambda: session.run(PING_COMMAND, 10), repeats)
+    finally:
+        session.close()
+
+    client = AdbServerClient(adb_path=adb_path)
+    results['server'] = measure(lambda: server_shell(client, serial, PING_COMMAND), repeats)
+
+    # Путь, которым реально ходит опрос (с учётом --transport)
+    results['adb_command'] = measure(lambda: run_shell(PING_COMMAND, 10, serial), repeats)
+    return results
+
+
+def bench_transfer(adb_path, serial, size_mb, repeats):
+    """Скорость push/pull файла size_mb МБ"""
+    results = {'size_mb': size_mb}
+    fd, local = tempfile.mkstemp(prefix='adbmon_xfer_')
+    pulled = local + '.pulled'
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            # Случайные данные, чтобы сжатие в adb не завышало скорость
+            f.write(os.urandom(size_mb * 1024 * 1024))
+        for direction, args in (('push', ['push', local, REMOTE_FILE]),
+                                ('pull', ['pull', REMOTE_FILE, pulled])):
+            speeds = []
+            error = None
+            for _ in range(repeats):
+                start = time.perf_counter()
+                result = subprocess.run([adb_path, '-s', serial] + args, capture_output=True, timeout=300)
+                elapsed = time.perf_counter() - start
+                if result.returncode != 0:
+                    error = result.stderr.decode('utf-8', errors='ignore').strip()
+                    break
+                speeds.append(size_mb / elapsed)
+            results[direction] = {
+                'n': len(speeds),
+                'median_mb_s': round(percentile(speeds, 50), 2) if speeds else None,
+                'min_mb_s': round(min(speeds), 2) if speeds else None,
+                'max_mb_s': round(max(speeds), 2) if speeds else None,
+            }
+            if error:
+                results[direction]['error'] = error
+    finally:
+        subprocess.run([adb_path, '-s', serial, 'shell', f'rm -f {REMOTE_FILE}'], capture_output=True, timeout=10)
+        for path in (local, pulled):
+            if os.path.exists(path):
+                os.remove(path)
+    return results
+
+
+def bench_collectors(serial, repeats):
+    """Стоимость каждой метрики отдельно, всего пакета и полного get_stats_via_adb"""
+    results = {}
+
+    def batch_call(names):
+        sections, error = collect_batch(lambda cmd, timeout: run_shell(cmd, timeout, serial), names)
+        return sections, error
+
+    for name in TICK_METRICS + ['getprop']:
+        results[name] = measure(lambda: batch_call([name]), repeats, warmup=1)
+    results['batch'] = measure(lambda: batch_call(TICK_METRICS), repeats, warmup=1)
+
+    def full_poll():
+        stats = get_stats_via_adb(serial)
+        return stats, stats[1] if stats[0] in (collectors.WAITING_STATS[0], "📱 Ошибка") else None
+
+    results['get_stats_via_adb'] = measure(full_poll, repeats, warmup=1)
+    return results
+
+
+def run_transport_bench(out=None, serials=None, repeats=50, transfer_mb=16):
+    """Все замеры по всем (или выбранным) устройствам с записью JSON в out"""
+    adb_path = get_adb_path()
+    if not adb_path:
+        print("❌ ADB не найден", file=sys.stderr)
+        return None
+
+    report = {
+        'format': RESULTS_FORMAT,
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'host': platform.node(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'transport': collectors.adb_transport,
+        'repeats': repeats,
+        'devices': {},
+    }
+    adb_version = subprocess.run([adb_path, 'version'], capture_output=True, text=True, timeout=10)
+    report['adb_version'] = adb_version.stdout.split('\n')[0].strip()
+
+    targets = list_online_devices()
+    if serials:
+        targets = [serial for serial in targets if serial in serials]
+    for serial in targets:
+        print(f"🔄 {serial}: задержка команд", file=sys.stderr)
+        device = {'latency': bench_latency(adb_path, serial, repeats)}
+        print(f"🔄 {serial}: стоимость метрик", file=sys.stderr)
+        device['collectors'] = bench_collectors(serial, max(repeats // 5, 5))
+        if transfer_mb:
+            print(f"🔄 {serial}: push/pull {transfer_mb} МБ", file=sys.stderr)
+            device['transfer'] = bench_transfer(adb_path, serial, transfer_mb, 3)
+        report['devices'][serial] = device
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if out in (None, '-'):
+        print(text)
+    else:
+        with open(out, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    return report
@@ -0,0 +1,56 @@
+"""Очередь обновлений интерфейса: фоновые потоки публикуют, главный поток Tk применяет"""
+import threading
+
+# Период применения обновлений (~30 кадров в секунду)
+FRAME_MS = 33
+
+
+class UiUpdates:
+    """Очередь обновлений с объединением по ключу.
+
+    Из нескольких обновлений одного ключа за кадр применяется только
+    последнее, поэтому всплеск результатов даёт не больше одной
+    перерисовки виджета за кадр. Ошибка одного обновления передаётся
+    в on_error(key, error) и не мешает применить остальные.
+    """
+
+    def __init__(self, on_error=None):
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.on_error = on_error
+
+    def post(self, key, callback, *args):
+        """Публикация обновления из любого потока"""
+        with self.lock:
+            # Переставляем ключ в конец, чтобы сохранить порядок публикаций
+            self.pending.pop(key, None)
+            self.pending[key] = (callback, args)
+
+    def drain(self):
+        """Применение накопленных обновлений (только из главного потока Tk)"""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        for key, (callback, args) in pending.items():
+            try:
+                callback(*args)
+            except Exception as e:
+                if self.on_error is None:
+                    raise
+                self.on_error(key, e)
+        return len(pending)
+
+
+class WidgetCache:
+    """Последние показанные значения: виджет меняется, только если значение другое"""
+
+    def __init__(self):
+        self.values = {}
+
+    def changed(self, key, value):
+        if self.values.get(key) == value:
+            return False
+        self.values[key] = value
+        return True
+
+    def forget(self, key):
+        self.values.pop(key, None)